@@ -1,3 +1,4 @@
+import sys
 import ply.lex as lex
 
 tokens = [
@@ -80,6 +81,29 @@ precedence = (
     ('right', 'UMINUS', 'NOT'), 
 )
 
+# reserved words, keyed by their lowercase spelling, used by the hand-written scanner backend
+reserved = {word.lower(): word for word in (
+    'AND', 'ANDTHEN', 'ARRAY', 'BEGIN', 'CONST', 'DIV', 'DO', 'DOWNTO', 'ELSE', 'END',
+    'FOR', 'FUNCTION', 'IF', 'IN', 'LABEL', 'MOD', 'NOT', 'OF', 'OR', 'ORELSE',
+    'PROCEDURE', 'PROGRAM', 'THEN', 'TO', 'UNTIL', 'VAR', 'WHILE', 'WITH',
+    'INTEGER', 'REAL', 'BOOLEAN', 'CHAR', 'BYTE', 'WORD', 'LONGINT', 'SHORTINT', 'SINGLE', 'DOUBLE',
+    'STRING', 'READ', 'READLN', 'WRITE', 'WRITELN', 'TRUE', 'FALSE',
+)}
+
+def intern_name(name, name_keys):
+    """Interns an identifier spelling and records its lookup key in name_keys, returning the interned spelling."""
+    name = sys.intern(name)
+    if name not in name_keys:
+        name_keys[name] = sys.intern(name.lower())
+    return name
+
+def name_key(name, name_keys):
+    """Returns the interned, case-insensitive lookup key of an identifier, recorded in name_keys."""
+    key = name_keys.get(name)
+    if key is None:
+        key = name_keys[intern_name(name, name_keys)]
+    return key
+
 t_PLUS = r'\+'
 t_MINUS = r'-'
 t_TIMES = r'\*'
@@ -319,6 +343,8 @@ def t_ID(t):
     val = t.value.upper()
     if val in tokens:
         t.type = val
+    if t.type == 'ID':
+        t.value = intern_name(t.value, t.lexer.name_keys)
     return t
 
 def t_newline(t):
@@ -331,6 +357,19 @@ def t_error(t):
     print("Illegal character '%s'" % t.value[0])
     t.lexer.skip(1)
 
-def build_lexer():
+def build_lexer(backend="ply"):
+    """
+    Builds a lexer for the given backend:
+    'ply' for the PLY rules above, 'scanner' for the hand-written single-pass scanner.
+    """
+    if backend == "scanner":
+        from scanner import Scanner
+        return Scanner()
+    if backend != "ply":
+        raise ValueError(f"Unknown lexer backend '{backend}'")
     lexer = lex.lex()
+    # identifier spellings seen by this lexer, each mapped to its interned lowercase key, so the
+    # scopes of its session compare names case-insensitively without lowercasing them on every
+    # lookup; the table lives as long as the lexer, not the process
+    lexer.name_keys = {}
     return lexer
\ No newline at end of file
@@ -19,11 +19,14 @@ def p_header(p):
         p[0] = ProgramHeader(name=p[2], id_list=[])
 
 # rule for id_list
+# list rules append to the list built by the left-recursive reduction instead of
+# copying it (p[1] + [p[3]]), which would make long lists quadratic to build
 def p_id_list(p):
     '''id_list : id_list COMMA ID
                | ID'''
     if len(p) == 4:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -47,7 +50,8 @@ def p_declarations(p):
        # declarations : declarations variable_declaration
        #              | declarations function_declaration
        #              | declarations procedure_declaration
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         # | empty
         p[0] = []
@@ -81,7 +85,8 @@ def p_variable_list(p):
                      | variable'''
     if len(p) == 4:
         # variable_list : variable_list SEMICOLON variable
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         # | variable
         p[0] = [p[1]]
@@ -121,7 +126,8 @@ def p_field_list(p):
                   | field'''
     if len(p) == 4:
         # field_list : field_list SEMICOLON field
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         # | field
         p[0] = [p[1]]
@@ -148,7 +154,8 @@ def p_parameter_section_list(p):
                               | parameter_section'''
     if len(p) == 4:
         # parameter_section_list : parameter_section_list SEMICOLON parameter_section
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         # | parameter_section
         p[0] = [p[1]]
@@ -175,7 +182,8 @@ def p_statement_list(p):
                       | statement'''
     if len(p) == 4:
         # statement_list : statement_list SEMICOLON statement
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         # | statement
         p[0] = [p[1]]
@@ -194,9 +202,19 @@ def p_statement(p):
 
 # rule for assignment statement
 def p_assignment_statement(p):
-    '''assignment_statement : ID ASSIGN expression'''
-    variable_node = Identifier(name=p[1], lineno=p.lineno(1))
-    p[0] = AssignmentStatement(variable=variable_node, expression=p[3], lineno=p.lineno(2)) # Pass lineno
+    '''assignment_statement : ID ASSIGN expression
+                            | factor LBRACKET expression RBRACKET ASSIGN expression'''
+    if len(p) == 4:
+        variable_node = Identifier(name=p[1], lineno=p.lineno(1))
+        p[0] = AssignmentStatement(variable=variable_node, expression=p[3], lineno=p.lineno(2)) # Pass lineno
+    else:
+        # | factor LBRACKET expression RBRACKET ASSIGN expression
+        # (starting from factor keeps the grammar free of conflicts with indexing in expressions)
+        if not isinstance(p[1], Identifier): # only an element of a named array can be assigned
+            p_error(p.slice[5])
+            raise SyntaxError
+        variable_node = ArrayAccess(array=p[1], index=p[3])
+        p[0] = AssignmentStatement(variable=variable_node, expression=p[6], lineno=p.lineno(5))
 
 # rule for expressions
 def p_expression(p):
@@ -290,7 +308,8 @@ def p_expression_list(p):
                        | expression
                        | empty'''
     if len(p) == 4: # expression_list COMMA expression
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     elif p[1] is None: # | empty
         p[0] = []
     else: # | expression
@@ -342,18 +361,11 @@ def p_error(p):
     else:
         print("Syntax error at EOF")
 
-def build_parser():
-    return yacc.yacc()
+def build_parser(**kwargs):
+    return yacc.yacc(**kwargs)
 
 def parse_program(input_text):
-    from analex import build_lexer
-
-    lexer = build_lexer()
-    parser = build_parser()
+    # the lexer and parser are built once and shared through the default session
+    from session import get_default_session
 
-    try:
-        ast = parser.parse(input_text, lexer=lexer)
-        return ast
-    except Exception as e:
-        print(f"Parse error: {e}")
-        return None
\ No newline at end of file
+    return get_default_session().parse(input_text)
\ No newline at end of file
@@ -1,8 +1,64 @@
+import sys
+import threading
+
+# Every node class declares its fields in __slots__, so nodes carry no per-instance
+# __dict__. The same names are listed in _fields for code that walks nodes generically,
+# and _child_fields lists the ones that can hold child nodes (or lists of them).
+
+# the depth of the __repr__ calls under way, kept per thread so that concurrent
+# compilations printing their trees do not share it
+_repr_state = threading.local()
+
+def _repr_items(items):
+    """Renders a list field, eliding the items past ASTNode.max_repr_items."""
+    if items is None or len(items) <= ASTNode.max_repr_items:
+        return repr(items)
+    shown = ", ".join(repr(item) for item in items[:ASTNode.max_repr_items])
+    return f"[{shown}, ... {len(items) - ASTNode.max_repr_items} more]"
+
 class ASTNode:
+    __slots__ = ('lineno',)
+    _fields = ()
+    _child_fields = ()
+
+    # bounds of __repr__: nested nodes past max_repr_depth are printed as ClassName(...),
+    # so printing a huge tree only renders its top levels
+    max_repr_depth = 8
+    max_repr_items = 20
+
     def __init__(self, lineno=None):
         self.lineno = lineno
 
+    def __repr__(self):
+        depth = getattr(_repr_state, 'depth', 0)
+        if depth >= ASTNode.max_repr_depth:
+            return f"{type(self).__name__}(...)"
+        _repr_state.depth = depth + 1
+        try:
+            return self._repr()
+        finally:
+            _repr_state.depth = depth
+
+    def _repr(self):
+        return f"{type(self).__name__}()"
+
+class Expression(ASTNode):
+    # annotations set by the typing done in semantic_check (not children, so not in _fields):
+    # the resolved type name, the resolved Symbol of names, and the error if it has no valid type
+    __slots__ = ('expr_type', 'symbol', 'type_error')
+
+    def __init__(self, lineno=None):
+        super().__init__(lineno)
+        self.expr_type = None
+        self.symbol = None
+        self.type_error = None
+
 class FunctionDeclaration(ASTNode):
+    _fields = ('name', 'parameter_list', 'return_type', 'block')
+    # annotations set by semantic_check: the routine's Symbol and the SymbolTable of its body
+    __slots__ = _fields + ('symbol', 'scope')
+    _child_fields = ('parameter_list', 'return_type', 'block')
+
     def __init__(self, name, parameter_list, return_type=None, block=None, lineno=None):
         """
         Represents a function declaration.
@@ -17,11 +73,18 @@ class FunctionDeclaration(ASTNode):
         self.parameter_list = parameter_list
         self.return_type = return_type
         self.block = block
+        self.symbol = None
+        self.scope = None
 
-    def __repr__(self):
-        return (f"FunctionDeclaration(name={self.name}, parameters={self.parameter_list}, "f"return_type={self.return_type}, block={self.block})")
+    def _repr(self):
+        return (f"FunctionDeclaration(name={self.name}, parameters={_repr_items(self.parameter_list)}, "f"return_type={self.return_type}, block={self.block})")
 
 class ProcedureDeclaration(ASTNode):
+    _fields = ('name', 'parameter_list', 'block')
+    # annotations set by semantic_check: the routine's Symbol and the SymbolTable of its body
+    __slots__ = _fields + ('symbol', 'scope')
+    _child_fields = ('parameter_list', 'block')
+
     def __init__(self, name, parameter_list, block, lineno=None):
         """
         Represents a procedure declaration.
@@ -34,70 +97,94 @@ class ProcedureDeclaration(ASTNode):
         self.name = name
         self.parameter_list = parameter_list
         self.block = block
+        self.symbol = None
+        self.scope = None
+
+    def _repr(self) -> str:
+        return (f"ProcedureDeclaration(name={self.name}, parameters={_repr_items(self.parameter_list)}, "f"block={self.block})")
 
-    def __repr__(self) -> str:
-        return (f"ProcedureDeclaration(name={self.name}, parameters={self.parameter_list}, "f"block={self.block})")
-    
 class Program(ASTNode):
+    _fields = ('header', 'block')
+    __slots__ = _fields + ('scope',) # the global SymbolTable, set by semantic_check
+    _child_fields = ('header', 'block')
+
     def __init__(self, header, block, lineno=None):
         """Represents a complete program."""
         super().__init__(lineno)
         self.header = header
         self.block = block
+        self.scope = None
 
-    def __repr__(self):
+    def _repr(self):
         return f"Program(header={self.header}, block={self.block})"
 
 class ProgramHeader(ASTNode):
+    __slots__ = _fields = ('name', 'id_list')
+
     def __init__(self, name, id_list=None, lineno=None):
         """Represents a program header (PROGRAM name (id_list);)."""
         super().__init__(lineno)
         self.name = name
         self.id_list = id_list or []
 
-    def __repr__(self):
-        return f"ProgramHeader(name={self.name}, id_list={self.id_list})"
+    def _repr(self):
+        return f"ProgramHeader(name={self.name}, id_list={_repr_items(self.id_list)})"
 
 class Block(ASTNode):
+    __slots__ = _fields = ('declarations', 'compound_statement')
+    _child_fields = ('declarations', 'compound_statement')
+
     def __init__(self, declarations, compound_statement, lineno=None):
         """Represents a block with declarations and statements."""
         super().__init__(lineno)
         self.declarations = declarations
         self.compound_statement = compound_statement
 
-    def __repr__(self):
-        return f"Block(declarations={self.declarations}, compound_statement={self.compound_statement})"
+    def _repr(self):
+        return f"Block(declarations={_repr_items(self.declarations)}, compound_statement={self.compound_statement})"
 
 class VariableDeclaration(ASTNode):
+    __slots__ = _fields = ('variable_list',)
+    _child_fields = ('variable_list',)
+
     def __init__(self, variable_list, lineno=None):
         """Represents a variable declaration section."""
         super().__init__(lineno)
         self.variable_list = variable_list
 
-    def __repr__(self):
-        return f"VariableDeclaration(variables={self.variable_list})"
+    def _repr(self):
+        return f"VariableDeclaration(variables={_repr_items(self.variable_list)})"
 
 class Variable(ASTNode):
+    __slots__ = _fields = ('id_list', 'var_type')
+    _child_fields = ('var_type',)
+
     def __init__(self, id_list, var_type, lineno=None):
         """Represents a variable with its type."""
         super().__init__(lineno)
         self.id_list = id_list
         self.var_type = var_type
 
-    def __repr__(self):
-        return f"Variable(ids={self.id_list}, type={self.var_type})"
+    def _repr(self):
+        return f"Variable(ids={_repr_items(self.id_list)}, type={self.var_type})"
 
 class ArrayType(ASTNode):
+    __slots__ = _fields = ('index_range', 'element_type')
+    _child_fields = ('index_range', 'element_type')
+
     def __init__(self, index_range, element_type, lineno=None):
         """Represents an array type."""
         super().__init__(lineno)
         self.index_range = index_range  # tuple (start, end)
         self.element_type = element_type
 
-    def __repr__(self):
+    def _repr(self):
         return f"ArrayType(range={self.index_range}, element_type={self.element_type})"
 
 class Parameter(ASTNode):
+    __slots__ = _fields = ('id_list', 'param_type', 'is_var')
+    _child_fields = ('param_type',)
+
     def __init__(self, id_list, param_type, is_var=False, lineno=None):
         """Represents a parameter in a function/procedure."""
         super().__init__(lineno)
@@ -105,29 +192,38 @@ class Parameter(ASTNode):
         self.param_type = param_type
         self.is_var = is_var  # for VAR parameters
 
-    def __repr__(self):
-        return f"Parameter(ids={self.id_list}, type={self.param_type}, is_var={self.is_var})"
+    def _repr(self):
+        return f"Parameter(ids={_repr_items(self.id_list)}, type={self.param_type}, is_var={self.is_var})"
 
 class CompoundStatement(ASTNode):
+    __slots__ = _fields = ('statement_list',)
+    _child_fields = ('statement_list',)
+
     def __init__(self, statement_list, lineno=None):
         """Represents a compound statement (BEGIN...END)."""
         super().__init__(lineno)
         self.statement_list = statement_list
 
-    def __repr__(self):
-        return f"CompoundStatement(statements={self.statement_list})"
+    def _repr(self):
+        return f"CompoundStatement(statements={_repr_items(self.statement_list)})"
 
 class AssignmentStatement(ASTNode):
+    __slots__ = _fields = ('variable', 'expression')
+    _child_fields = ('variable', 'expression')
+
     def __init__(self, variable, expression, lineno=None):
         """Represents an assignment statement."""
         super().__init__(lineno)
         self.variable = variable
         self.expression = expression
 
-    def __repr__(self):
+    def _repr(self):
         return f"AssignmentStatement(var={self.variable}, expr={self.expression})"
 
 class IfStatement(ASTNode):
+    __slots__ = _fields = ('condition', 'then_statement', 'else_statement')
+    _child_fields = ('condition', 'then_statement', 'else_statement')
+
     def __init__(self, condition, then_statement, else_statement=None, lineno=None):
         """Represents an if statement."""
         super().__init__(lineno)
@@ -135,20 +231,26 @@ class IfStatement(ASTNode):
         self.then_statement = then_statement
         self.else_statement = else_statement
 
-    def __repr__(self):
+    def _repr(self):
         return f"IfStatement(condition={self.condition}, then={self.then_statement}, else={self.else_statement})"
 
 class WhileStatement(ASTNode):
+    __slots__ = _fields = ('condition', 'statement')
+    _child_fields = ('condition', 'statement')
+
     def __init__(self, condition, statement, lineno=None):
         """Represents a while loop."""
         super().__init__(lineno)
         self.condition = condition
         self.statement = statement
 
-    def __repr__(self):
+    def _repr(self):
         return f"WhileStatement(condition={self.condition}, statement={self.statement})"
 
 class ForStatement(ASTNode):
+    __slots__ = _fields = ('control_variable', 'start_expression', 'end_expression', 'statement', 'downto')
+    _child_fields = ('control_variable', 'start_expression', 'end_expression', 'statement')
+
     def __init__(self, control_variable, start_expression, end_expression, statement, downto=False, lineno=None):
         """Represents a for loop."""
         super().__init__(lineno)
@@ -158,30 +260,54 @@ class ForStatement(ASTNode):
         self.statement = statement                # Statement node
         self.downto = downto                      # Boolean
 
-    def __repr__(self):
+    def _repr(self):
         return f"ForStatement(var={self.control_variable}, start={self.start_expression}, end={self.end_expression}, downto={self.downto}, statement={self.statement})"
 
-class FunctionCall(ASTNode):
+class FunctionCall(Expression):
+    __slots__ = _fields = ('name', 'arguments')
+    _child_fields = ('arguments',)
+
     def __init__(self, name, arguments=None, lineno=None):
         """Represents a function/procedure call."""
         super().__init__(lineno)
         self.name = name
         self.arguments = arguments or []
 
-    def __repr__(self):
-        return f"FunctionCall(name={self.name}, args={self.arguments})"
+    def _repr(self):
+        return f"FunctionCall(name={self.name}, args={_repr_items(self.arguments)})"
+
+class InlinedCall(Expression):
+    __slots__ = _fields = ('name', 'body', 'temporaries', 'result')
+    _child_fields = ('body',)
+
+    def __init__(self, name, body, temporaries, result=None, lineno=None):
+        """Represents a call replaced by a copy of its routine's body (see inliner.py)."""
+        super().__init__(lineno)
+        self.name = name
+        self.body = body                # CompoundStatement: the arguments, then the routine's statements
+        self.temporaries = temporaries  # Symbols of the frame temporaries the body uses
+        self.result = result            # Symbol of the temporary holding a function's result
+
+    def _repr(self):
+        return f"InlinedCall(name={self.name}, body={self.body})"
 
 class IOCall(ASTNode):
+    __slots__ = _fields = ('operation', 'arguments')
+    _child_fields = ('arguments',)
+
     def __init__(self, operation, arguments, lineno=None):
         """Represents an I/O operation (read, write, etc.)."""
         super().__init__(lineno)
         self.operation = operation  # 'read', 'readln', 'write', 'writeln'
         self.arguments = arguments
 
-    def __repr__(self):
-        return f"IOCall(op={self.operation}, args={self.arguments})"
+    def _repr(self):
+        return f"IOCall(op={self.operation}, args={_repr_items(self.arguments)})"
+
+class BinaryOperation(Expression):
+    __slots__ = _fields = ('left', 'operator', 'right')
+    _child_fields = ('left', 'right')
 
-class BinaryOperation(ASTNode):
     def __init__(self, left, operator, right, lineno=None):
         """Represents a binary operation."""
         super().__init__(lineno)
@@ -189,43 +315,93 @@ class BinaryOperation(ASTNode):
         self.operator = operator
         self.right = right
 
-    def __repr__(self):
+    def _repr(self):
         return f"BinaryOperation({self.left} {self.operator} {self.right})"
 
-class UnaryOperation(ASTNode):
+class UnaryOperation(Expression):
+    __slots__ = _fields = ('operator', 'operand')
+    _child_fields = ('operand',)
+
     def __init__(self, operator, operand, lineno=None):
         """Represents a unary operation."""
         super().__init__(lineno)
         self.operator = operator
         self.operand = operand
 
-    def __repr__(self):
+    def _repr(self):
         return f"UnaryOperation({self.operator} {self.operand})"
 
-class Literal(ASTNode):
+class Literal(Expression):
+    __slots__ = _fields = ('value', 'literal_type')
+
     def __init__(self, value, literal_type=None, lineno=None):
         """Represents a literal value."""
         super().__init__(lineno)
         self.value = value
         self.literal_type = literal_type  # 'number', 'string', 'boolean', etc.
 
-    def __repr__(self):
+    def _repr(self):
         return f"Literal(value={self.value}, type={self.literal_type})"
 
-class Identifier(ASTNode):
+class Identifier(Expression):
+    __slots__ = _fields = ('name',)
+
     def __init__(self, name, lineno=None):
         """Represents an identifier/variable reference."""
         super().__init__(lineno)
         self.name = name
 
-    def __repr__(self):
+    def _repr(self):
         return f"Identifier(name={self.name})"
 
-class ArrayAccess(ASTNode):
+class ArrayAccess(Expression):
+    __slots__ = _fields = ('array', 'index')
+    _child_fields = ('array', 'index')
+
     def __init__(self, array, index, lineno=None):
         self.array = array  # Identifier node for the array variable
         self.index = index  # Expression node for the index
         super().__init__(lineno)
 
-    def __repr__(self):
+    def _repr(self):
         return f"ArrayAccess(array={self.array}, index={self.index})"
+
+def iter_child_nodes(node):
+    """Yields the direct child nodes of node, in field order."""
+    for field in node._child_fields:
+        value = getattr(node, field)
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item
+
+def compact(root):
+    """
+    Optional compact storage mode for large, expression-heavy trees.
+
+    Converts every list field of the tree into a tuple (no over-allocation, smaller
+    header) and interns identifier and operator strings, so repeated names share one
+    string object. The tree is rewritten in place and returned. Passes that edit
+    a compacted tree must assign new sequences instead of mutating them.
+    """
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (list, tuple)):
+            pending.extend(node)
+            continue
+        if not isinstance(node, ASTNode):
+            continue
+        for field in node._fields:
+            value = getattr(node, field)
+            if isinstance(value, list):
+                value = tuple(sys.intern(item) if type(item) is str else item for item in value)
+                setattr(node, field, value)
+                pending.extend(value)
+            elif isinstance(value, str) and field in ('name', 'operator'):
+                setattr(node, field, sys.intern(value))
+            elif isinstance(value, (ASTNode, tuple)):
+                pending.append(value)
+    return root
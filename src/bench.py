@@ -0,0 +1,288 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+import ast_nodes
+from analex import build_lexer
+from constant_folding import fold_constants
+from inliner import INLINE_BUDGET, inline_calls
+from samples import (SAMPLE_INPUTS, array_loop_programs, checked_inputs, expression_chain_program,
+                     expression_heavy_program, helper_program, library_program, read_inputs, synthetic_program)
+from session import CompilerSession
+from vm_assembly import generation_context as ctx
+from vm_assembly import node_visitors, peephole
+from vm_assembly.generator import generate_blocks
+from vm_assembly.simulator import run
+
+def count_nodes(root):
+    count = 0
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    return count
+
+def best_time(function, repeat):
+    """Runs function repeat times and returns (result, best elapsed seconds)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+def count_tokens(lexer, source_code):
+    lexer.lineno = 1
+    lexer.input(source_code)
+    count = 0
+    for _ in iter(lexer.token, None):
+        count += 1
+    return count
+
+def bench_lexer(args):
+    """Tokens/sec of the PLY lexer against the hand-written scanner."""
+    lexers = {backend: build_lexer(backend) for backend in ("ply", "scanner")}
+    corpora = [("input/*.pas", "\n".join(source for _, source in read_inputs()))]
+    for size in args.sizes:
+        corpora.append((f"synthetic {size} stmts", synthetic_program(size)))
+
+    print(f"{'corpus':<24} {'tokens':>9} {'ply tok/s':>12} {'scanner tok/s':>14} {'speedup':>8}")
+    for name, source_code in corpora:
+        rates = {}
+        tokens = 0
+        for backend, lexer in lexers.items():
+            tokens, elapsed = best_time(lambda: count_tokens(lexer, source_code), args.repeat)
+            rates[backend] = tokens / elapsed
+        print(f"{name:<24} {tokens:>9} {rates['ply']:>12,.0f} {rates['scanner']:>14,.0f} {rates['scanner'] / rates['ply']:>7.2f}x")
+
+def bench_parser(args):
+    """Cold start and parse time of the LALR engine against the recursive-descent engine."""
+    engines = ("lalr", "rd")
+    sessions = {}
+    print(f"{'engine':<8} {'cold start':>12}")
+    for engine in engines:
+        sessions[engine], elapsed = best_time(lambda: CompilerSession(parser_engine=engine), args.repeat)
+        print(f"{engine:<8} {elapsed * 1000:>10.2f}ms")
+
+    corpora = [(name, source) for name, source in read_inputs() if not name.endswith("errors.pas")]
+    for size in args.sizes:
+        corpora.append((f"synthetic {size} stmts", synthetic_program(size)))
+
+    print(f"\n{'corpus':<24} {'lalr':>10} {'rd':>10} {'speedup':>8}")
+    for name, source_code in corpora:
+        times = {}
+        for engine in engines:
+            _, times[engine] = best_time(lambda: sessions[engine].parse(source_code), args.repeat)
+        print(f"{name:<24} {times['lalr'] * 1000:>8.2f}ms {times['rd'] * 1000:>8.2f}ms {times['lalr'] / times['rd']:>7.2f}x")
+
+def bench_memory(args):
+    """Bytes retained per AST node after parsing large generated programs."""
+    corpora = []
+    for size in args.sizes:
+        corpora.append((f"synthetic {size} stmts", synthetic_program(size)))
+        corpora.append((f"expressions {size} stmts", expression_heavy_program(size)))
+
+    print(f"{'corpus':<26} {'mode':<8} {'nodes':>10} {'retained':>12} {'bytes/node':>11}")
+    for name, source_code in corpora:
+        for compact_ast in (False, True):
+            session = CompilerSession(lexer_backend="scanner", compact_ast=compact_ast)
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            ast = session.parse(source_code)
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            nodes = count_nodes(ast)
+            mode = "compact" if compact_ast else "slots"
+            print(f"{name:<26} {mode:<8} {nodes:>10} {retained / 1e6:>10.1f}MB {retained / nodes:>11.1f}")
+            del ast
+
+def bench_codegen(args):
+    """Semantic check and code generation time of long expression chains, per operand."""
+    session = CompilerSession()
+    print(f"{'operands':>10} {'check':>10} {'generate':>10} {'us/operand':>11}")
+    for size in args.sizes:
+        ast = session.parse(expression_chain_program(size))
+        _, check_time = best_time(lambda: session.check(ast), args.repeat)
+        _, generate_time = best_time(lambda: session.generate(ast), args.repeat)
+        per_operand = (check_time + generate_time) / size * 1e6
+        print(f"{size:>10} {check_time * 1000:>8.1f}ms {generate_time * 1000:>8.1f}ms {per_operand:>11.2f}")
+
+def load_vm_code(text):
+    """
+    Loads .vm text the way the VM's loader does: drops comments and blank lines, records
+    the labels and splits every instruction into its opcode and operand.
+    """
+    labels = {}
+    instructions = []
+    for line in text.splitlines():
+        line = line.split("//", 1)[0].strip()
+        if not line:
+            continue
+        if line.endswith(":"):
+            labels[line[:-1]] = len(instructions)
+        else:
+            opcode, _, operand = line.partition(" ")
+            instructions.append((opcode, operand))
+    return instructions, labels
+
+def bench_output(args):
+    """Size and load time of the annotated and the compact .vm formats."""
+    session = CompilerSession()
+    programs = read_inputs()
+    programs += [(f"synthetic {size}", synthetic_program(size)) for size in args.sizes]
+    print(f"{'program':<22} {'annotated':>11} {'compact':>11} {'size':>6} {'load ann.':>10} {'load cmp.':>10} {'load':>6}")
+    for name, source_code in programs:
+        ast = session.parse(source_code)
+        try:
+            session.check(ast)
+        except Exception:
+            continue # the error examples
+        annotated = "\n".join(session.generate(ast)) + "\n"
+        compact = "\n".join(session.generate(ast, compact=True)) + "\n"
+        assert len(load_vm_code(annotated)[0]) == len(load_vm_code(compact)[0])
+        _, annotated_load = best_time(lambda: load_vm_code(annotated), args.repeat)
+        _, compact_load = best_time(lambda: load_vm_code(compact), args.repeat)
+        print(f"{name:<22} {len(annotated.encode()):>10}B {len(compact.encode()):>10}B "
+              f"{len(compact) / len(annotated):>6.0%} {annotated_load * 1000:>8.2f}ms {compact_load * 1000:>8.2f}ms "
+              f"{compact_load / annotated_load:>6.0%}")
+
+def bench_peephole(args):
+    """Instructions removed by the peephole pass on the input examples, and the hits of each rule."""
+    session = CompilerSession()
+    total_hits = peephole.Counter()
+    totals = [0, 0, 0, 0]
+    print(f"{'program':<18} {'code':>6} {'opt.':>6} {'executed':>9} {'opt.':>6}")
+    for name, ast in checked_inputs(session):
+        blocks = session.generate_blocks(ast)
+        output, executed = run(blocks, SAMPLE_INPUTS.get(name, ()))
+        size = peephole.instruction_count(blocks)
+        total_hits += peephole.optimize(blocks)
+        optimized_output, optimized_executed = run(blocks, SAMPLE_INPUTS.get(name, ()))
+        assert optimized_output == output, name
+        optimized_size = peephole.instruction_count(blocks)
+        row = [size, optimized_size, executed, optimized_executed]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{name:<18} {size:>6} {optimized_size:>6} {executed:>9} {optimized_executed:>6}")
+    size, optimized_size, executed, optimized_executed = totals
+    print(f"{'total':<18} {size:>6} {optimized_size:>6} {executed:>9} {optimized_executed:>6}"
+          f"   ({1 - optimized_size / size:.1%} smaller, {1 - optimized_executed / executed:.1%} fewer executed)")
+    print()
+    for name in peephole.rules:
+        print(f"{name:<24} {total_hits[name]:>5}   {peephole.rules[name].description}")
+
+def bench_deadcode(args):
+    """Size and load time of programs with a library of unused routines, without and with -O."""
+    session = CompilerSession()
+    print(f"{'routines':>9} {'code':>8} {'opt.':>8} {'size':>6} {'load':>9} {'opt.':>9}")
+    for size in args.sizes:
+        routine_count = max(size // 100, 10) # the default sizes give 100 and 1000 routines
+        source_code = library_program(routine_count)
+        texts = []
+        for optimize in (False, True):
+            ast = session.parse(source_code)
+            session.check(ast)
+            blocks = generate_blocks(ast, optimize=optimize)
+            texts.append("\n".join(ctx.render(blocks)) + "\n")
+        plain, optimized = texts
+        _, plain_load = best_time(lambda: load_vm_code(plain), args.repeat)
+        _, optimized_load = best_time(lambda: load_vm_code(optimized), args.repeat)
+        print(f"{routine_count:>9} {len(plain.encode()):>7}B {len(optimized.encode()):>7}B "
+              f"{len(optimized) / len(plain):>6.1%} {plain_load * 1000:>7.2f}ms {optimized_load * 1000:>7.2f}ms")
+
+def bench_licm(args):
+    """Instructions and executed instructions of the input examples, without and with loop-invariant code motion."""
+    session = CompilerSession()
+    totals = [0, 0, 0, 0]
+    print(f"{'program':<18} {'code':>6} {'licm':>6} {'executed':>9} {'licm':>6}")
+    for name, ast in checked_inputs(session):
+        blocks = session.generate_blocks(ast)
+        output, executed = run(blocks, SAMPLE_INPUTS.get(name, ()))
+        generator = ctx.CodeGenerator(hoist_invariants=True)
+        node_visitors.visit(ast, generator)
+        hoisted_output, hoisted_executed = run(generator.blocks, SAMPLE_INPUTS.get(name, ()))
+        assert hoisted_output == output, name
+        row = [peephole.instruction_count(blocks), peephole.instruction_count(generator.blocks), executed, hoisted_executed]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{name:<18} {row[0]:>6} {row[1]:>6} {row[2]:>9} {row[3]:>6}")
+    size, hoisted_size, executed, hoisted_executed = totals
+    print(f"{'total':<18} {size:>6} {hoisted_size:>6} {executed:>9} {hoisted_executed:>6}"
+          f"   ({hoisted_size / size - 1:+.1%} code, {1 - hoisted_executed / executed:.1%} fewer executed)")
+
+def bench_arrays(args):
+    """Instructions and executed instructions of loops over arrays, without and with the base addresses kept in temporaries."""
+    session = CompilerSession()
+    print(f"{'program':<18} {'elements':>9} {'code':>6} {'opt.':>6} {'executed':>9} {'opt.':>9} {'per elem.':>9} {'opt.':>6}")
+    for size in args.sizes:
+        element_count = max(size // 100, 10) # the default sizes give 100 and 1000 elements
+        for name, source_code in array_loop_programs(element_count):
+            ast = session.parse(source_code)
+            session.check(ast)
+            blocks = session.generate_blocks(ast)
+            output, executed = run(blocks)
+            generator = ctx.CodeGenerator(hoist_invariants=True)
+            node_visitors.visit(ast, generator)
+            hoisted_output, hoisted_executed = run(generator.blocks)
+            assert hoisted_output == output, name
+            print(f"{name:<18} {element_count:>9} {peephole.instruction_count(blocks):>6} "
+                  f"{peephole.instruction_count(generator.blocks):>6} {executed:>9} {hoisted_executed:>9} "
+                  f"{executed / element_count:>9.1f} {hoisted_executed / element_count:>6.1f}")
+
+def bench_inline(args):
+    """The call sites inlined in the input examples and a helper-heavy program, and the code and executed instructions at -O without and with inlining."""
+    session = CompilerSession()
+    programs = [(name, source_code) for name, source_code in read_inputs()]
+    programs.append(("helpers", helper_program(max(args.sizes[0] // 100, 10))))
+    sites = []
+    print(f"{'program':<18} {'sites':>5} {'code':>6} {'inlined':>7} {'executed':>9} {'inlined':>9}")
+    for name, source_code in programs:
+        ast = session.parse(source_code)
+        try:
+            session.check(ast)
+        except Exception:
+            continue # the error examples
+        fold_constants(ast)
+        program_sites = inline_calls(ast)
+        sites += [(name, site) for site in program_sites]
+        row = []
+        for budget in (0, INLINE_BUDGET):
+            ast = session.parse(source_code)
+            session.check(ast)
+            blocks = generate_blocks(ast, optimize=True, inline_budget=budget)
+            row.append((peephole.instruction_count(blocks), run(blocks, SAMPLE_INPUTS.get(name, ()))))
+        (size, (output, executed)), (inlined_size, (inlined_output, inlined_executed)) = row
+        assert inlined_output == output, name
+        print(f"{name:<18} {len(program_sites):>5} {size:>6} {inlined_size:>7} {executed:>9} {inlined_executed:>9}")
+    print()
+    for name, site in sites:
+        print(f"{name:<18} {site}")
+
+BENCHMARKS = {
+    "lexer": bench_lexer,
+    "parser": bench_parser,
+    "memory": bench_memory,
+    "codegen": bench_codegen,
+    "output": bench_output,
+    "peephole": bench_peephole,
+    "deadcode": bench_deadcode,
+    "licm": bench_licm,
+    "arrays": bench_arrays,
+    "inline": bench_inline,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiler benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS), help="benchmark to run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="statement counts of the synthetic programs")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best one is reported")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+"""
+Constant folding and propagation over a checked AST.
+
+Operators whose operands are all literals are replaced by a Literal holding their
+result, computed with the semantics of the generated code (div and mod truncate
+toward zero, booleans are compared as 0 and 1). The foldable builtins (abs, sqr,
+pred, succ, length, uppercase, lowercase) are evaluated the same way. Nothing that
+would fail at run time is folded: a division by zero, an integer result outside the
+VM's 32-bit range or a real result that is not finite stays in the code, to fail
+where the program would.
+
+Propagation follows the statements in order, remembering the scalar variables that
+were last assigned a literal; a later use of such a variable is replaced by the
+literal. A variable's value is forgotten when it is assigned anything else, read,
+passed to a VAR parameter or assigned in a loop, and every value is forgotten at a
+call to a user routine, which may change the globals. Each routine body starts
+with nothing known.
+
+The pass rewrites the tree in place; the new Literals carry the type the semantic
+check gave the expression they replace.
+"""
+import math
+from collections import Counter
+
+import ast_nodes
+from walker import Dispatcher, trampoline
+
+# integer results are only folded while they stay in the VM's 32-bit range
+INTEGER_LIMIT = 2 ** 31
+
+# the Python type of the literals of each scalar type
+LITERAL_TYPES = {"INTEGER": int, "REAL": float, "BOOLEAN": bool, "STRING": str}
+
+class FoldingState:
+    __slots__ = ('constants', 'counts')
+
+    def __init__(self):
+        self.constants = {} # Symbol -> the literal value the variable holds
+        self.counts = Counter() # 'folded' and 'propagated' replacements
+
+def integer_division(a, b):
+    """div and mod of the generated code: the quotient is truncated toward zero, the remainder has the dividend's sign."""
+    quotient = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        quotient = -quotient
+    return quotient, a - b * quotient
+
+def is_number(value):
+    return type(value) in (int, float)
+
+def valid_result(value):
+    """Whether the folded value can stand in for the operation: no integer overflow, no inf or nan."""
+    if type(value) is int:
+        return -INTEGER_LIMIT <= value < INTEGER_LIMIT
+    if type(value) is float:
+        return math.isfinite(value)
+    return True
+
+COMPARISONS = {
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+ARITHMETIC = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+}
+
+# the operation each logical operator computes
+LOGICAL = {"AND": "AND", "OR": "OR", "ANDTHEN": "AND", "ORELSE": "OR"}
+
+def evaluate_binary(operator, left, right):
+    """The value of `left operator right`, or None when it cannot be folded."""
+    if operator in ARITHMETIC:
+        # string + is left alone, the generated code has no concatenation
+        if is_number(left) and is_number(right):
+            return ARITHMETIC[operator](left, right)
+    elif operator == "/":
+        if is_number(left) and is_number(right) and right != 0:
+            return left / right
+    elif operator in ("DIV", "MOD"):
+        if type(left) is int and type(right) is int and right != 0:
+            return integer_division(left, right)[operator == "MOD"]
+    elif operator in COMPARISONS:
+        if is_number(left) and is_number(right) or type(left) is type(right) is bool:
+            return COMPARISONS[operator](left, right)
+        if type(left) is type(right) is str and operator in ("=", "<>"):
+            return COMPARISONS[operator](left, right)
+    elif operator in LOGICAL:
+        if type(left) is type(right) is bool:
+            return left and right if LOGICAL[operator] == "AND" else left or right
+    return None
+
+def evaluate_unary(operator, operand):
+    """The value of `operator operand`, or None when it cannot be folded."""
+    if operator == "NOT" and type(operand) is bool:
+        return not operand
+    if operator == "-" and is_number(operand):
+        return -operand
+    if operator == "+" and is_number(operand):
+        return operand
+    return None
+
+def ascii_case(value, upper):
+    """UpCase/LowerCase only map the ASCII letters."""
+    first, last, shift = ("a", "z", -32) if upper else ("A", "Z", 32)
+    return "".join(chr(ord(c) + shift) if first <= c <= last else c for c in value)
+
+BUILTINS = {
+    "BUILTIN_ABS": lambda value: abs(value) if is_number(value) else None,
+    "BUILTIN_SQR": lambda value: value * value if is_number(value) else None,
+    "BUILTIN_PRED": lambda value: value - 1 if type(value) is int else None,
+    "BUILTIN_SUCC": lambda value: value + 1 if type(value) is int else None,
+    "BUILTIN_LENGTH": lambda value: len(value) if type(value) is str else None,
+    "BUILTIN_UPPERCASE": lambda value: ascii_case(value, True) if type(value) is str else None,
+    "BUILTIN_LOWERCASE": lambda value: ascii_case(value, False) if type(value) is str else None,
+}
+
+def builtin_name(symbol):
+    name = symbol.address_or_offset if symbol is not None else None
+    return name if isinstance(name, str) and name.startswith("BUILTIN_") else None
+
+def literal_like(node, value):
+    """A Literal holding value, in place of the expression node."""
+    literal = ast_nodes.Literal(value, lineno=node.lineno)
+    literal.expr_type = node.expr_type
+    return literal
+
+def is_literal(node):
+    return isinstance(node, ast_nodes.Literal)
+
+def is_tracked(symbol):
+    """Scalar variables and value parameters, whose value only changes by assigning them."""
+    return (symbol is not None and symbol.kind in ('variable', 'parameter')
+            and not symbol.is_var_param and not symbol.is_array)
+
+def target_symbol(node):
+    """The Symbol of an assigned or read variable (None for an array element)."""
+    return node.symbol if isinstance(node, ast_nodes.Identifier) else None
+
+def forget(state, symbol):
+    """The variable symbol is changed to an unknown value."""
+    if symbol is not None and symbol.is_var_param:
+        state.constants.clear() # a VAR parameter may alias any variable
+    else:
+        state.constants.pop(symbol, None)
+
+def assigned_symbols(node):
+    """
+    The Symbols of the variables the subtree may change, and whether it calls a user
+    routine or writes through a VAR parameter (so it may change any variable).
+    """
+    symbols = set()
+    changes_all = False
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if node is None:
+            continue
+        if isinstance(node, ast_nodes.AssignmentStatement):
+            symbols.add(target_symbol(node.variable))
+        elif isinstance(node, ast_nodes.ForStatement):
+            symbols.add(node.control_variable.symbol)
+        elif isinstance(node, ast_nodes.IOCall) and node.operation.lower() in ("read", "readln"):
+            symbols.update(target_symbol(argument) for argument in node.arguments)
+        elif isinstance(node, ast_nodes.FunctionCall) and builtin_name(node.symbol) is None:
+            changes_all = True
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    symbols.discard(None)
+    if any(symbol.is_var_param for symbol in symbols):
+        changes_all = True
+    return symbols, changes_all
+
+def _fold_children(node, state):
+    # nodes without a handler of their own: fold every child in place
+    if node is None: # an empty statement
+        return None
+    for field in node._child_fields:
+        value = getattr(node, field)
+        if isinstance(value, ast_nodes.ASTNode):
+            setattr(node, field, (yield _fold(value, state)))
+        elif isinstance(value, (list, tuple)):
+            folded = []
+            for item in value:
+                folded.append((yield _fold(item, state)) if isinstance(item, ast_nodes.ASTNode) else item)
+            setattr(node, field, type(value)(folded)) # compact trees keep their tuples
+    return node
+
+_fold = Dispatcher(_fold_children)
+register_folder = _fold.register
+
+@register_folder(ast_nodes.FunctionDeclaration, ast_nodes.ProcedureDeclaration)
+def fold_routine(node, state):
+    outer_constants = state.constants
+    state.constants = {} # the body runs whenever the routine is called
+    node.block = yield _fold(node.block, state)
+    state.constants = outer_constants
+    return node
+
+@register_folder(ast_nodes.Literal, ast_nodes.VariableDeclaration, ast_nodes.ProgramHeader)
+def fold_leaf(node, state):
+    return node
+
+@register_folder(ast_nodes.Identifier)
+def fold_identifier(node, state):
+    symbol = node.symbol
+    if symbol in state.constants:
+        state.counts['propagated'] += 1
+        return literal_like(node, state.constants[symbol])
+    return node
+
+@register_folder(ast_nodes.BinaryOperation)
+def fold_binary(node, state):
+    node.left = yield _fold(node.left, state)
+    operator = node.operator.upper()
+    if operator in ("ANDTHEN", "ORELSE") and is_literal(node.left) and type(node.left.value) is bool:
+        # the right operand only runs when the left one does not decide: false andthen x, true orelse x
+        state.counts['folded'] += 1
+        if node.left.value == (operator == "ORELSE"):
+            return literal_like(node, node.left.value)
+        return (yield _fold(node.right, state))
+    node.right = yield _fold(node.right, state)
+    if is_literal(node.left) and is_literal(node.right):
+        value = evaluate_binary(operator, node.left.value, node.right.value)
+        if value is not None and valid_result(value):
+            state.counts['folded'] += 1
+            return literal_like(node, value)
+    return node
+
+@register_folder(ast_nodes.UnaryOperation)
+def fold_unary(node, state):
+    node.operand = yield _fold(node.operand, state)
+    if is_literal(node.operand):
+        value = evaluate_unary(node.operator.upper(), node.operand.value)
+        if value is not None and valid_result(value):
+            state.counts['folded'] += 1
+            return literal_like(node, value)
+    return node
+
+@register_folder(ast_nodes.ArrayAccess)
+def fold_array_access(node, state):
+    # the array itself is an address, only the index is an expression
+    node.index = yield _fold(node.index, state)
+    return node
+
+@register_folder(ast_nodes.FunctionCall)
+def fold_function_call(node, state):
+    symbol = node.symbol
+    builtin = builtin_name(symbol)
+    arguments = []
+    for i, argument in enumerate(node.arguments or ()):
+        is_var_argument = builtin is None and i < len(symbol.params_info) and symbol.params_info[i].is_var_param
+        if is_var_argument:
+            arguments.append(argument) # passed by address, it must stay a variable
+        else:
+            arguments.append((yield _fold(argument, state)))
+    if node.arguments:
+        node.arguments = type(node.arguments)(arguments)
+
+    if builtin is None:
+        state.constants.clear() # the routine may change any global or VAR argument
+    elif builtin in BUILTINS and len(arguments) == 1 and is_literal(arguments[0]):
+        value = BUILTINS[builtin](arguments[0].value)
+        if value is not None and valid_result(value):
+            state.counts['folded'] += 1
+            return literal_like(node, value)
+    return node
+
+@register_folder(ast_nodes.AssignmentStatement)
+def fold_assignment(node, state):
+    node.expression = yield _fold(node.expression, state)
+    if isinstance(node.variable, ast_nodes.ArrayAccess):
+        node.variable = yield _fold(node.variable, state)
+        return node
+    symbol = target_symbol(node.variable)
+    forget(state, symbol)
+    if is_tracked(symbol) and is_literal(node.expression):
+        # only a value of the variable's own type, the store does no conversion
+        if type(node.expression.value) is LITERAL_TYPES.get((symbol.sym_type or "").upper()):
+            state.constants[symbol] = node.expression.value
+    return node
+
+@register_folder(ast_nodes.IOCall)
+def fold_io_call(node, state):
+    if node.operation.lower() in ("read", "readln"):
+        for argument in node.arguments:
+            if isinstance(argument, ast_nodes.ArrayAccess):
+                yield _fold(argument, state)
+            else:
+                forget(state, target_symbol(argument))
+        return node
+    return (yield _fold_children(node, state))
+
+@register_folder(ast_nodes.IfStatement)
+def fold_if(node, state):
+    node.condition = yield _fold(node.condition, state)
+    before = state.constants
+    state.constants = dict(before)
+    node.then_statement = yield _fold(node.then_statement, state)
+    after_then = state.constants
+    state.constants = dict(before)
+    if node.else_statement is not None:
+        node.else_statement = yield _fold(node.else_statement, state)
+    # only the values both branches agree on are known after the if
+    state.constants = {symbol: value for symbol, value in state.constants.items()
+                       if symbol in after_then and type(after_then[symbol]) is type(value) and after_then[symbol] == value}
+    return node
+
+def forget_loop_assignments(state, loop):
+    """Forgets the variables the loop changes, as its condition and body see them from the second iteration on."""
+    symbols, changes_all = assigned_symbols(loop)
+    if changes_all:
+        state.constants.clear()
+    for symbol in symbols:
+        state.constants.pop(symbol, None)
+
+@register_folder(ast_nodes.WhileStatement)
+def fold_while(node, state):
+    forget_loop_assignments(state, node)
+    node.condition = yield _fold(node.condition, state)
+    before = state.constants
+    state.constants = dict(before)
+    node.statement = yield _fold(node.statement, state)
+    state.constants = before # the body may not run at all
+    return node
+
+@register_folder(ast_nodes.ForStatement)
+def fold_for(node, state):
+    node.start_expression = yield _fold(node.start_expression, state)
+    node.end_expression = yield _fold(node.end_expression, state)
+    forget_loop_assignments(state, node)
+    before = state.constants
+    state.constants = dict(before)
+    node.statement = yield _fold(node.statement, state)
+    state.constants = before
+    return node
+
+def fold_constants(program):
+    """
+    Folds and propagates the constants of a checked program in place. Returns the
+    number of expressions that were 'folded' and of variable uses 'propagated'.
+    """
+    state = FoldingState()
+    trampoline(_fold(program, state))
+    return state.counts
@@ -0,0 +1,154 @@
+"""
+Dead code elimination over a checked AST.
+
+Statements whose condition is a literal (as left by constant folding) are pruned:
+an if is replaced by the branch that runs, a while whose condition is false is
+dropped. The routines the program cannot reach are then removed from the
+declarations: the call graph links the main program and each routine to the
+routines its statements call or take the address of, and only the routines
+reachable from the main program are kept.
+
+The pass rewrites the tree in place.
+"""
+from collections import Counter
+
+import ast_nodes
+from walker import Dispatcher, trampoline
+
+ROUTINE_DECLARATIONS = (ast_nodes.FunctionDeclaration, ast_nodes.ProcedureDeclaration)
+
+def is_constant_condition(node, value):
+    return isinstance(node, ast_nodes.Literal) and type(node.value) is bool and node.value is value
+
+def empty_statement(node):
+    return ast_nodes.CompoundStatement([], lineno=node.lineno)
+
+def _prune_nothing(node, counts):
+    # expressions and declarations hold no statements
+    return node
+
+_prune = Dispatcher(_prune_nothing)
+register_pruner = _prune.register
+
+@register_pruner(ast_nodes.Program)
+def prune_program(node, counts):
+    node.block = yield _prune(node.block, counts)
+    return node
+
+@register_pruner(ast_nodes.Block)
+def prune_block(node, counts):
+    for declaration in node.declarations or ():
+        yield _prune(declaration, counts)
+    if node.compound_statement is not None:
+        node.compound_statement = yield _prune(node.compound_statement, counts)
+    return node
+
+@register_pruner(*ROUTINE_DECLARATIONS)
+def prune_routine(node, counts):
+    if node.block is not None:
+        node.block = yield _prune(node.block, counts)
+    return node
+
+@register_pruner(ast_nodes.CompoundStatement)
+def prune_compound(node, counts):
+    statements = []
+    for statement in node.statement_list:
+        statement = yield _prune(statement, counts)
+        if statement is not None:
+            statements.append(statement)
+    node.statement_list = type(node.statement_list)(statements) # compact trees keep their tuples
+    return node
+
+@register_pruner(ast_nodes.IfStatement)
+def prune_if(node, counts):
+    if isinstance(node.condition, ast_nodes.Literal) and type(node.condition.value) is bool:
+        counts['branches'] += 1
+        taken = node.then_statement if node.condition.value else node.else_statement
+        return (yield _prune(taken, counts)) # None when the if has no else
+    node.then_statement = (yield _prune(node.then_statement, counts)) or empty_statement(node)
+    if node.else_statement is not None:
+        node.else_statement = yield _prune(node.else_statement, counts)
+    return node
+
+@register_pruner(ast_nodes.WhileStatement)
+def prune_while(node, counts):
+    if is_constant_condition(node.condition, False):
+        counts['branches'] += 1
+        return None
+    node.statement = (yield _prune(node.statement, counts)) or empty_statement(node)
+    return node
+
+@register_pruner(ast_nodes.ForStatement)
+def prune_for(node, counts):
+    node.statement = (yield _prune(node.statement, counts)) or empty_statement(node)
+    return node
+
+def routine_declarations(block):
+    """Every routine declared in the block, including the ones nested in other routines."""
+    routines = []
+    pending = [block]
+    while pending:
+        block = pending.pop()
+        for declaration in block.declarations or ():
+            if isinstance(declaration, ROUTINE_DECLARATIONS):
+                routines.append(declaration)
+                if declaration.block is not None:
+                    pending.append(declaration.block)
+    return routines
+
+def referenced_routines(statement):
+    """The Symbols of the user routines the statement calls or takes the address of."""
+    symbols = set()
+    pending = [statement]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast_nodes.FunctionCall, ast_nodes.Identifier)):
+            symbol = node.symbol
+            if symbol is not None and symbol.kind in ('function', 'procedure'):
+                symbols.add(symbol)
+        if node is not None:
+            pending.extend(ast_nodes.iter_child_nodes(node))
+    return symbols
+
+def reachable_routines(program):
+    """The Symbols of the routines reachable from the main program through the call graph."""
+    call_graph = {}
+    for routine in routine_declarations(program.block):
+        body = routine.block.compound_statement if routine.block is not None else None
+        call_graph[routine.symbol] = referenced_routines(body)
+    reachable = set()
+    pending = list(referenced_routines(program.block.compound_statement))
+    while pending:
+        symbol = pending.pop()
+        if symbol not in reachable:
+            reachable.add(symbol)
+            pending.extend(call_graph.get(symbol, ()))
+    return reachable
+
+def remove_unreachable_routines(program, counts):
+    reachable = reachable_routines(program)
+    pending = [program.block]
+    while pending:
+        block = pending.pop()
+        if not block.declarations:
+            continue
+        kept = []
+        for declaration in block.declarations:
+            if isinstance(declaration, ROUTINE_DECLARATIONS):
+                if declaration.symbol not in reachable:
+                    counts['routines'] += 1
+                    continue
+                if declaration.block is not None:
+                    pending.append(declaration.block)
+            kept.append(declaration)
+        block.declarations = type(block.declarations)(kept)
+
+def eliminate_dead_code(program):
+    """
+    Prunes the constant branches of a checked program and removes its unreachable
+    routines, in place. Returns the number of 'branches' and 'routines' removed.
+    """
+    counts = Counter()
+    trampoline(_prune(program, counts))
+    remove_unreachable_routines(program, counts)
+    return counts
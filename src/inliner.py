@@ -0,0 +1,334 @@
+"""
+Inlining of small non-recursive routines over a checked AST.
+
+A call to a user routine is replaced by an InlinedCall holding a copy of the
+routine's body when the routine cannot reach itself on the call graph and its body
+has at most budget nodes. The routine must also declare no nested routines and no
+arrays other than VAR parameters, and read no variables of an enclosing routine. Procedures are inlined where they are called as
+statements, functions where they are called in expressions.
+
+In the copy, each value parameter and local variable of the routine, and a
+function's result, is a temporary: a Symbol of its own whose frame slot the code
+generator takes when it generates the call. The value parameters are assigned their
+arguments, in order, unless neither the parameter nor its argument, a literal or a
+variable, change in the body (and no argument has side effects): the argument is
+then used in place of the parameter. The locals and the result start at 0, as in
+the routine's frame, unless the body assigns them before anything else uses them.
+A VAR parameter is replaced by the caller's variable.
+
+The routines are rewritten callees first, so the body that is copied already holds
+its own calls inlined. The pass rewrites the tree in place.
+"""
+import ast_nodes
+from anasem import Symbol
+from constant_folding import assigned_symbols, is_tracked
+from dead_code import ROUTINE_DECLARATIONS, routine_declarations
+from walker import trampoline
+
+# the largest routine body, in AST nodes, copied to its call sites
+INLINE_BUDGET = 40
+
+# the fields holding statements, where procedure calls are inlined
+STATEMENT_FIELDS = {
+    ast_nodes.CompoundStatement: ('statement_list',),
+    ast_nodes.IfStatement: ('then_statement', 'else_statement'),
+    ast_nodes.WhileStatement: ('statement',),
+    ast_nodes.ForStatement: ('statement',),
+}
+
+class InlinedSite:
+    """A call to routine, made by caller (None for the main program), that was inlined."""
+    __slots__ = ('routine', 'caller', 'lineno')
+
+    def __init__(self, routine, caller, lineno):
+        self.routine = routine
+        self.caller = caller
+        self.lineno = lineno
+
+    def __repr__(self):
+        return f"InlinedSite({self.routine!r}, {self.caller!r}, {self.lineno})"
+
+    def __str__(self):
+        return f"{self.routine} inlined into {self.caller or 'the main program'} at line {self.lineno}"
+
+def body_of(routine):
+    return routine.block.compound_statement if routine.block is not None else None
+
+def node_count(root):
+    count = 0
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    return count
+
+def called_routines(body):
+    """
+    The Symbols of the user routines the body calls or takes the address of, leaving
+    out the function results it assigns.
+    """
+    symbols = set()
+    pending = [body]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast_nodes.AssignmentStatement) and isinstance(node.variable, ast_nodes.Identifier):
+            pending.append(node.expression)
+            continue
+        if isinstance(node, (ast_nodes.FunctionCall, ast_nodes.Identifier)):
+            symbol = node.symbol
+            if symbol is not None and symbol.kind in ('function', 'procedure'):
+                symbols.add(symbol)
+        if node is not None:
+            pending.extend(ast_nodes.iter_child_nodes(node))
+    return symbols
+
+def calls_itself(symbol, call_graph):
+    """Whether the routine can reach itself on the call graph."""
+    seen = set()
+    pending = list(call_graph.get(symbol, ()))
+    while pending:
+        callee = pending.pop()
+        if callee is symbol:
+            return True
+        if callee not in seen:
+            seen.add(callee)
+            pending.extend(call_graph.get(callee, ()))
+    return False
+
+def callees_first(routines, call_graph):
+    """The routines, each after the routines it calls (but in a cycle, where there is no such order)."""
+    by_symbol = {routine.symbol: routine for routine in routines}
+    ordered = []
+    done = set()
+    for routine in routines:
+        if routine.symbol in done:
+            continue
+        done.add(routine.symbol)
+        stack = [(routine.symbol, iter(call_graph.get(routine.symbol, ())))]
+        while stack:
+            symbol, callees = stack[-1]
+            for callee in callees:
+                if callee in by_symbol and callee not in done:
+                    done.add(callee)
+                    stack.append((callee, iter(call_graph.get(callee, ()))))
+                    break
+            else:
+                stack.pop()
+                ordered.append(by_symbol[symbol])
+    return ordered
+
+def can_inline(routine, call_graph, budget):
+    body = body_of(routine)
+    if body is None or calls_itself(routine.symbol, call_graph):
+        return False
+    if any(isinstance(declaration, ROUTINE_DECLARATIONS) for declaration in routine.block.declarations or ()):
+        return False
+    own = set(routine.scope.symbols.values())
+    if any(symbol.is_array and not symbol.is_var_param for symbol in own):
+        return False
+    if node_count(body) > budget:
+        return False
+    # besides its own variables, only the globals and the temporaries of the calls inlined into it
+    pending = [body]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast_nodes.InlinedCall):
+            own.update(node.temporaries)
+        elif isinstance(node, ast_nodes.Identifier):
+            symbol = node.symbol
+            if symbol is not None and symbol.kind in ('variable', 'parameter') and symbol.scope_level != 0 and symbol not in own:
+                return False
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    return True
+
+def temporary(routine_name, name, sym_type):
+    # addressed from FP like a local; the code generator sets its offset
+    return Symbol(f"{routine_name}.{name}", sym_type, 'variable', None, scope_level=1)
+
+def variable(symbol, lineno):
+    """An Identifier naming the Symbol symbol."""
+    identifier = ast_nodes.Identifier(symbol.name, lineno=lineno)
+    identifier.symbol = symbol
+    identifier.expr_type = symbol.sym_type.upper() if symbol.sym_type else None
+    return identifier
+
+def assignment(symbol, expression, lineno):
+    return ast_nodes.AssignmentStatement(variable(symbol, lineno), expression, lineno=lineno)
+
+def zero(lineno):
+    literal = ast_nodes.Literal(0, lineno=lineno)
+    literal.expr_type = 'INTEGER'
+    return literal
+
+def mentions(node, symbol):
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if getattr(node, 'symbol', None) is symbol:
+            return True
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    return False
+
+def assigned_before_use(symbol, statement):
+    """
+    Whether the statement assigns the variable on every path before using it: None when
+    the statement does not mention it at all.
+    """
+    if statement is None or not mentions(statement, symbol):
+        return None
+    if isinstance(statement, ast_nodes.AssignmentStatement) and isinstance(statement.variable, ast_nodes.Identifier) \
+            and statement.variable.symbol is symbol:
+        return not mentions(statement.expression, symbol)
+    if isinstance(statement, ast_nodes.ForStatement) and statement.control_variable.symbol is symbol:
+        return not mentions(statement.start_expression, symbol) and not mentions(statement.end_expression, symbol)
+    if isinstance(statement, ast_nodes.CompoundStatement):
+        return assigned_first(symbol, statement)
+    if isinstance(statement, ast_nodes.IfStatement) and not mentions(statement.condition, symbol):
+        branches = (assigned_before_use(symbol, statement.then_statement),
+                    assigned_before_use(symbol, statement.else_statement))
+        return branches == (True, True)
+    return False
+
+def assigned_first(symbol, body):
+    """Whether a statement of the body assigns the variable before any statement uses it."""
+    for statement in body.statement_list:
+        decided = assigned_before_use(symbol, statement)
+        if decided is not None:
+            return decided
+    return False
+
+_slots = {}
+
+def slots_of(cls):
+    if cls not in _slots:
+        _slots[cls] = [slot for klass in reversed(cls.__mro__) for slot in getattr(klass, '__slots__', ())]
+    return _slots[cls]
+
+def _copy(node, mapping):
+    # mapping: Symbol of the routine -> its temporary (a Symbol) or the caller's variable (an Identifier)
+    if isinstance(node, (list, tuple)):
+        items = []
+        for item in node:
+            items.append((yield _copy(item, mapping)))
+        return type(node)(items)
+    if not isinstance(node, ast_nodes.ASTNode):
+        return node
+    if isinstance(node, ast_nodes.Identifier) and node.symbol in mapping:
+        replacement = mapping[node.symbol]
+        if isinstance(replacement, ast_nodes.ASTNode):
+            return (yield _copy(replacement, {}))
+        return variable(replacement, node.lineno)
+    copy = object.__new__(type(node))
+    if isinstance(node, ast_nodes.InlinedCall):
+        # a call inlined into the routine gets temporaries of its own in each copy
+        for symbol in node.temporaries:
+            mapping[symbol] = Symbol(symbol.name, symbol.sym_type, 'variable', None, scope_level=1)
+        copy.temporaries = [mapping[symbol] for symbol in node.temporaries]
+        copy.result = mapping.get(node.result)
+    for slot in slots_of(type(node)):
+        if isinstance(node, ast_nodes.InlinedCall) and slot in ('temporaries', 'result'):
+            continue
+        value = getattr(node, slot, None)
+        if slot in node._child_fields:
+            value = yield _copy(value, mapping)
+        setattr(copy, slot, value)
+    return copy
+
+def is_unchanged(argument, assigned, changes_all):
+    """Whether the argument is a literal or a variable the body leaves as it is."""
+    if isinstance(argument, ast_nodes.Literal):
+        return True
+    return isinstance(argument, ast_nodes.Identifier) and is_tracked(argument.symbol) \
+        and argument.symbol not in assigned and not changes_all
+
+def inlined_copy(call, routine):
+    """The InlinedCall replacing call, a call to routine."""
+    body = body_of(routine)
+    lineno = call.lineno
+    mapping = {}
+    temporaries = []
+    statements = []
+    assigned, changes_all = assigned_symbols(body)
+    # an argument with side effects could change the variables passed before it
+    changes_all = changes_all or not all(
+        isinstance(argument, (ast_nodes.Literal, ast_nodes.Identifier)) for argument in call.arguments)
+    for param, argument in zip(call.symbol.params_info, call.arguments):
+        if param.is_var_param:
+            mapping[param] = argument
+        elif is_unchanged(argument, assigned, changes_all) and param not in assigned \
+                and argument.expr_type == variable(param, lineno).expr_type:
+            mapping[param] = argument # the body reads the argument itself
+        else:
+            mapping[param] = temporary(routine.name, param.name, param.sym_type)
+            temporaries.append(mapping[param])
+            statements.append(assignment(mapping[param], argument, lineno))
+    locals_ = [symbol for symbol in routine.scope.symbols.values() if symbol.kind == 'variable']
+    result = None
+    if isinstance(routine, ast_nodes.FunctionDeclaration):
+        result = temporary(routine.name, "result", routine.symbol.return_type)
+        mapping[routine.symbol] = result
+        temporaries.append(result)
+    for symbol in locals_:
+        mapping[symbol] = temporary(routine.name, symbol.name, symbol.sym_type)
+        temporaries.append(mapping[symbol])
+    for symbol in locals_ + ([routine.symbol] if result is not None else []):
+        if not assigned_first(symbol, body):
+            statements.append(assignment(mapping[symbol], zero(lineno), lineno))
+    statements.append(trampoline(_copy(body, mapping)))
+    inlined = ast_nodes.InlinedCall(call.name, ast_nodes.CompoundStatement(statements, lineno=lineno),
+                                    temporaries, result, lineno=lineno)
+    inlined.expr_type = call.expr_type
+    return inlined
+
+def inline_call(node, as_statement, inlinable, caller, sites):
+    if not isinstance(node, ast_nodes.FunctionCall) or node.symbol not in inlinable:
+        return node
+    routine = inlinable[node.symbol]
+    if isinstance(routine, ast_nodes.ProcedureDeclaration) != as_statement:
+        return node # a function whose result is dropped
+    params = node.symbol.params_info
+    if len(params) != len(node.arguments) or any(
+            param.is_var_param and not isinstance(argument, ast_nodes.Identifier)
+            for param, argument in zip(params, node.arguments)):
+        return node
+    sites.append(InlinedSite(routine.name, caller, node.lineno))
+    return inlined_copy(node, routine)
+
+def inline_sites(root, inlinable, caller, sites):
+    """Replaces the calls under root to the inlinable routines (declarations keyed by Symbol)."""
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        statement_fields = STATEMENT_FIELDS.get(type(node), ())
+        for field in node._child_fields:
+            value = getattr(node, field)
+            as_statement = field in statement_fields
+            if isinstance(value, (list, tuple)):
+                items = [inline_call(item, as_statement, inlinable, caller, sites) for item in value]
+                if any(item is not old for item, old in zip(items, value)):
+                    setattr(node, field, type(value)(items)) # compact trees keep their tuples
+                pending.extend(item for item in items if isinstance(item, ast_nodes.ASTNode))
+            elif isinstance(value, ast_nodes.ASTNode):
+                item = inline_call(value, as_statement, inlinable, caller, sites)
+                if item is not value:
+                    setattr(node, field, item)
+                pending.append(item)
+
+def inline_calls(program, budget=INLINE_BUDGET):
+    """
+    Inlines the calls to the small non-recursive routines of a checked program, in
+    place. Returns an InlinedSite for each call that was inlined.
+    """
+    sites = []
+    routines = routine_declarations(program.block)
+    call_graph = {routine.symbol: called_routines(body_of(routine)) for routine in routines}
+    inlinable = {}
+    for routine in callees_first(routines, call_graph):
+        if body_of(routine) is not None:
+            inline_sites(body_of(routine), inlinable, routine.name, sites)
+        if can_inline(routine, call_graph, budget):
+            inlinable[routine.symbol] = routine
+    inline_sites(program.block.compound_statement, inlinable, None, sites)
+    sites.sort(key=lambda site: site.lineno)
+    return sites
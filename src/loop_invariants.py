@@ -0,0 +1,83 @@
+"""
+Loop-invariant expressions of while and for loops.
+
+An expression of a loop is invariant when it only reads scalar variables the loop
+cannot change: the loop does not assign them, read into them or use them as a for
+control variable. A call to a user routine or a write through a VAR parameter may
+change any variable, so a loop with one has no invariant expressions.
+
+The code generator computes each invariant expression once, before the loop, even
+when the loop would not run or would not reach it, so only expressions that cannot
+fail at run time are reported: a div, mod or / needs a nonzero literal divisor,
+the builtins must be among the ones constant folding evaluates and array and string
+elements are left in place.
+"""
+import ast_nodes
+from constant_folding import BUILTINS, assigned_symbols, builtin_name, is_tracked
+
+OPERATIONS = (ast_nodes.BinaryOperation, ast_nodes.UnaryOperation, ast_nodes.FunctionCall)
+DIVISIONS = ('DIV', 'MOD', '/')
+
+def changed_symbols(loop):
+    """The Symbols of the variables the loop may change, or None when it may change any variable."""
+    symbols, changes_all = assigned_symbols(loop)
+    if changes_all:
+        return None
+    pending = [loop]
+    while pending:
+        node = pending.pop()
+        # an assigned element changes its array or string
+        if isinstance(node, ast_nodes.AssignmentStatement) and isinstance(node.variable, ast_nodes.ArrayAccess):
+            symbols.add(getattr(node.variable.array, 'symbol', None))
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    return symbols
+
+def is_invariant(node, changed):
+    """Whether the expression reads nothing in changed and cannot fail at run time."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast_nodes.Literal):
+            continue
+        if isinstance(node, ast_nodes.Identifier):
+            if not is_tracked(node.symbol) or node.symbol in changed:
+                return False
+        elif isinstance(node, ast_nodes.BinaryOperation):
+            if node.operator.upper() in DIVISIONS and not (
+                    isinstance(node.right, ast_nodes.Literal) and node.right.value not in (0, False)):
+                return False
+            pending.extend((node.left, node.right))
+        elif isinstance(node, ast_nodes.UnaryOperation):
+            pending.append(node.operand)
+        elif isinstance(node, ast_nodes.FunctionCall):
+            if builtin_name(node.symbol) not in BUILTINS:
+                return False
+            pending.extend(node.arguments or ())
+        else:
+            return False
+    return True
+
+def invariant_expressions(loop):
+    """
+    The largest invariant operations of the loop's condition and body, in the order
+    they appear. The start and end values of a for loop are left out, as they are
+    evaluated once anyway.
+    """
+    changed = changed_symbols(loop)
+    if changed is None:
+        return []
+    if isinstance(loop, ast_nodes.WhileStatement):
+        roots = [loop.condition, loop.statement]
+    else:
+        roots = [loop.statement]
+    expressions = []
+    pending = list(reversed(roots))
+    while pending:
+        node = pending.pop()
+        if node is None:
+            continue
+        if isinstance(node, OPERATIONS) and is_invariant(node, changed):
+            expressions.append(node)
+        else:
+            pending.extend(reversed(list(ast_nodes.iter_child_nodes(node))))
+    return expressions
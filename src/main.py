@@ -1,8 +1,10 @@
+import argparse
 import os
 import sys 
-from anasin import parse_program
-from anasem import semantic_check, SymbolTable
-from vm_assembly.generator import generate, reset_and_initialize_generator_state 
+import time
+from vm_assembly import generation_context
+from inliner import INLINE_BUDGET
+from session import CompilerSession, get_default_session
 
 # Get the directory where main.py is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -35,9 +37,18 @@ def get_output_filepath(input_filepath):
     output_filename = f"{file_name_without_ext}.vm"
     return os.path.join(OUTPUT_DIR, output_filename)
 
-def compile_pascal_file(file_path):
-    """Compiles a single Pascal file."""
-    print(f"\n--- Compiling: {file_path} ---")
+def compile_pascal_file(file_path, session=None, echo=False, quiet=False, compact=False):
+    """
+    Compiles a single Pascal file, reusing the given session's lexer, parser and builtins.
+    The code is streamed to the .vm file and only printed when echo is set; in quiet mode
+    the progress messages are left out and a single summary line is printed per file.
+    compact writes the comment-free format (short labels, no comments).
+    """
+    if session is None:
+        session = get_default_session()
+    say = (lambda message: None) if quiet else print # progress messages
+    start_time = time.perf_counter()
+    say(f"\n--- Compiling: {file_path} ---")
     try:
         with open(file_path, 'r') as f:
             source_code = f.read() # Renamed to avoid conflict with vm_generator.code
@@ -49,46 +60,53 @@ def compile_pascal_file(file_path):
         print(f"No code to compile in {file_path}.")
         return
 
-    # Reset the generator state before processing each file
-    reset_and_initialize_generator_state()
-
-    print("Parsing program...")
-    ast = parse_program(source_code)
+    say("Parsing program...")
+    ast = session.parse(source_code)
     if not ast:
-        print("Parsing failed.")
+        print(f"Parsing failed for {file_path}.")
         return
 
-    print("AST generated successfully.")
-    print("Performing semantic analysis...")
+    say("AST generated successfully.")
+    say("Performing semantic analysis...")
 
     try:
-        # Note: semantic_check might also need its own state management if it uses globals
-        # For now, assuming semantic_check is stateless or manages its own state per call.
-        global_scope_for_semantic_check = SymbolTable() # Create a fresh scope for semantic analysis
-        semantic_check(ast, global_scope_for_semantic_check)
-        print("Semantic check passed.")
+        session.check(ast) # Checks against a fresh global scope on top of the shared builtins
+        say("Semantic check passed.")
     except Exception as e:
         print(f"Semantic error in {file_path}: {e}")
         return
 
-    print("Generating VM code...")
+    say("Generating VM code...")
     try:
-        vm_code_output = generate(ast) # Renamed to avoid potential confusion
+        blocks = session.generate_blocks(ast)
 
         output_vm_filepath = get_output_filepath(file_path)
-        print(f"\n--- Generated VM Code for {os.path.basename(file_path)} ---")
-        for instruction in vm_code_output:
-            print(instruction)
-
+        if echo:
+            print(f"\n--- Generated VM Code for {os.path.basename(file_path)} ---")
         with open(output_vm_filepath, 'w') as f:
-            for instruction in vm_code_output:
-                f.write(instruction + "\n")
-        print(f"\nVM code saved to {output_vm_filepath}")
+            line_count = generation_context.write(blocks, f, echo=sys.stdout if echo else None, compact=compact)
+        if quiet:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(f"{file_path} -> {output_vm_filepath} ({line_count} lines, {elapsed_ms:.1f}ms)")
+        else:
+            print(f"\nVM code saved to {output_vm_filepath}")
     except Exception as e:
         print(f"Code generation error in {file_path}: {e}")
 
 def main():
-    user_path = read_input()
+    arg_parser = argparse.ArgumentParser(description="Standard Pascal to EWVM compiler")
+    arg_parser.add_argument("path", nargs="?", help="a .pas file or a folder of .pas files (asked for when omitted)")
+    arg_parser.add_argument("--echo", action="store_true", help="also print the generated code")
+    arg_parser.add_argument("--quiet", action="store_true", help="print only one summary line per file")
+    arg_parser.add_argument("--compact", action="store_true", help="write .vm files without comments and with short labels")
+    arg_parser.add_argument("-O", "--optimize", action="store_true", help="optimize the generated code")
+    arg_parser.add_argument("--short-circuit", action="store_true",
+                            help="also skip the right operand of and/or when it has no side effects (andthen/orelse always do)")
+    arg_parser.add_argument("--inline-budget", type=int, default=INLINE_BUDGET, metavar="N",
+                            help=f"with -O, inline the calls to routines of at most N AST nodes, 0 to inline none (default {INLINE_BUDGET})")
+    args = arg_parser.parse_args()
+
+    user_path = args.path.strip() if args.path else read_input()
 
     if not user_path:
         print("No input path provided. Exiting.")
@@ -97,6 +115,9 @@ def main():
     if not ensure_output_directory():
         return # Stop if output directory cannot be created
 
+    session = CompilerSession(optimize=args.optimize, short_circuit=args.short_circuit,
+                              inline_budget=args.inline_budget) # Built once, shared by every file compiled in this run
+
     if os.path.isdir(user_path):
         print(f"Processing folder: {user_path}")
         pas_files_found = False
@@ -104,12 +125,12 @@ def main():
             if item.lower().endswith(".pas"):
                 pas_files_found = True
                 full_file_path = os.path.join(user_path, item)
-                compile_pascal_file(full_file_path)
+                compile_pascal_file(full_file_path, session, args.echo, args.quiet, args.compact)
         if not pas_files_found:
             print(f"No .pas files found in folder: {user_path}")
     elif os.path.isfile(user_path):
         if user_path.lower().endswith(".pas"):
-            compile_pascal_file(user_path)
+            compile_pascal_file(user_path, session, args.echo, args.quiet, args.compact)
         else:
             print(f"Input file '{user_path}' is not a .pas file. Please provide a .pas file or a folder.")
     else:
@@ -0,0 +1,335 @@
+from ply.lex import LexToken
+from ast_nodes import *
+from anasin import p_error
+from walker import trampoline
+
+# binding powers of the binary operators, mirroring the expression levels of the anasin grammar
+binary_binding_power = {
+    'EQUALS': 1, 'NE': 1, 'LT': 1, 'GT': 1, 'LE': 1, 'GE': 1, 'IN': 1, # expression
+    'PLUS': 2, 'MINUS': 2, 'OR': 2, 'ORELSE': 2,                         # additive_expression
+    'TIMES': 3, 'DIVIDE': 3, 'DIV': 3, 'MOD': 3, 'AND': 3, 'ANDTHEN': 3, # multiplicative_expression
+}
+
+type_tokens = frozenset([
+    'ID', 'INTEGER', 'REAL', 'BOOLEAN', 'CHAR', 'BYTE', 'WORD',
+    'LONGINT', 'SHORTINT', 'SINGLE', 'DOUBLE', 'STRING',
+])
+
+io_tokens = frozenset(['WRITE', 'WRITELN', 'READ', 'READLN'])
+
+# tokens after which a statement can be empty
+empty_statement_follow = frozenset(['SEMICOLON', 'END', 'ELSE'])
+
+class ParseError(Exception):
+    def __init__(self, token):
+        super().__init__()
+        self.token = token
+
+class RecursiveDescentParser:
+    """
+    Hand-written recursive-descent parser for the anasin grammar.
+
+    Statements and declarations are parsed by one method per grammar rule, and
+    expressions by precedence climbing over binary_binding_power, building exactly
+    the same ast_nodes trees as the PLY LALR parser. Statements and expressions run on
+    walker.trampoline, so their nesting is not bounded by the recursion limit. It has the same parse(input, lexer)
+    interface, so CompilerSession can use either engine.
+    """
+
+    def parse(self, input_text, lexer):
+        lexer.input(input_text)
+        self.tokens = list(iter(lexer.token, None))
+        end_token = LexToken()
+        end_token.type = '$end'
+        end_token.value = None
+        end_token.lineno = lexer.lineno
+        end_token.lexpos = len(input_text)
+        self.tokens.append(end_token)
+        self.position = 0
+
+        try:
+            program = self.parse_program()
+            self.expect('$end')
+            return program
+        except ParseError as e:
+            p_error(e.token if e.token.type != '$end' else None)
+            return None
+        finally:
+            self.tokens = None # do not keep the token list alive alongside the tree
+
+    # --- token helpers ---
+    # the '$end' token closes the token list and advance never moves past it,
+    # so the current token is always self.tokens[self.position]
+    def peek(self, offset=0):
+        index = self.position + offset
+        if index >= len(self.tokens):
+            return self.tokens[-1]
+        return self.tokens[index]
+
+    def peek_type(self, offset=0):
+        if offset == 0:
+            return self.tokens[self.position].type
+        return self.peek(offset).type
+
+    def advance(self):
+        token = self.tokens[self.position]
+        if token.type != '$end':
+            self.position += 1
+        return token
+
+    def expect(self, token_type):
+        token = self.tokens[self.position]
+        if token.type != token_type:
+            raise ParseError(token)
+        if token_type != '$end':
+            self.position += 1
+        return token
+
+    def accept(self, token_type):
+        token = self.tokens[self.position]
+        if token.type == token_type:
+            self.position += 1 # never '$end', which is only ever expected
+            return token
+        return None
+
+    # --- program structure ---
+    def parse_program(self):
+        header = self.parse_header()
+        block = self.parse_block()
+        self.expect('DOT')
+        return Program(header=header, block=block)
+
+    def parse_header(self):
+        self.expect('PROGRAM')
+        name = self.expect('ID').value
+        id_list = []
+        if self.accept('LPAREN'):
+            id_list = self.parse_id_list()
+            self.expect('RPAREN')
+        self.expect('SEMICOLON')
+        return ProgramHeader(name=name, id_list=id_list)
+
+    def parse_id_list(self):
+        id_list = [self.expect('ID').value]
+        while self.accept('COMMA'):
+            id_list.append(self.expect('ID').value)
+        return id_list
+
+    def parse_block(self):
+        declarations = []
+        while True:
+            token_type = self.peek_type()
+            if token_type == 'VAR':
+                declarations.append(self.parse_variable_declaration())
+            elif token_type == 'FUNCTION':
+                declarations.append(self.parse_function_declaration())
+            elif token_type == 'PROCEDURE':
+                declarations.append(self.parse_procedure_declaration())
+            else:
+                break
+        compound_statement = trampoline(self.parse_compound_statement())
+        return Block(declarations=declarations, compound_statement=compound_statement)
+
+    def parse_variable_declaration(self):
+        self.expect('VAR')
+        variables = [self.parse_variable()]
+        self.expect('SEMICOLON')
+        while self.peek_type() == 'ID': # another "id_list : type" after the separating semicolon
+            variables.append(self.parse_variable())
+            self.expect('SEMICOLON')
+        return VariableDeclaration(variable_list=variables)
+
+    def parse_variable(self):
+        id_list = self.parse_id_list()
+        self.expect('COLON')
+        return Variable(id_list=id_list, var_type=self.parse_type())
+
+    def parse_type(self):
+        token = self.peek()
+        if token.type in type_tokens:
+            return self.advance().value
+        self.expect('ARRAY')
+        self.expect('LBRACKET')
+        lower_bound_literal = Literal(self.expect('NUMBER').value)
+        self.expect('DOT')
+        self.expect('DOT')
+        upper_bound_literal = Literal(self.expect('NUMBER').value)
+        self.expect('RBRACKET')
+        self.expect('OF')
+        element_type_val = self.parse_type()
+        return ArrayType(index_range=(lower_bound_literal, upper_bound_literal), element_type=element_type_val)
+
+    def parse_function_declaration(self):
+        self.expect('FUNCTION')
+        name = self.expect('ID').value
+        params_ast = self.parse_parameter_list()
+        self.expect('COLON')
+        return_type = self.parse_type()
+        self.expect('SEMICOLON')
+        block = self.parse_block()
+        self.expect('SEMICOLON')
+        return FunctionDeclaration(name=name, parameter_list=params_ast, return_type=return_type, block=block)
+
+    def parse_procedure_declaration(self):
+        self.expect('PROCEDURE')
+        name = self.expect('ID').value
+        params_ast = self.parse_parameter_list()
+        self.expect('SEMICOLON')
+        block = self.parse_block()
+        self.expect('SEMICOLON')
+        return ProcedureDeclaration(name=name, parameter_list=params_ast, block=block)
+
+    def parse_parameter_list(self):
+        params_ast = []
+        if not self.accept('LPAREN'):
+            return params_ast
+        while True:
+            is_var = self.accept('VAR') is not None
+            id_list = self.parse_id_list()
+            self.expect('COLON')
+            params_ast.append(Parameter(id_list=id_list, param_type=self.parse_type(), is_var=is_var))
+            if not self.accept('SEMICOLON'):
+                break
+        self.expect('RPAREN')
+        return params_ast
+
+    # --- statements ---
+    # Statements and expressions nest without bound, so their methods are generators run by
+    # walker.trampoline: a nested construct is parsed by yielding its method's generator,
+    # which keeps the nesting on an explicit stack instead of the Python call stack.
+    def parse_compound_statement(self):
+        self.expect('BEGIN')
+        statement_list = [(yield self.parse_statement())]
+        while self.accept('SEMICOLON'):
+            statement_list.append((yield self.parse_statement()))
+        self.expect('END')
+        return CompoundStatement(statement_list=statement_list)
+
+    def parse_statement(self):
+        token_type = self.peek_type()
+        if token_type == 'ID' and self.peek_type(1) == 'ASSIGN':
+            return (yield self.parse_assignment_statement())
+        if token_type == 'BEGIN':
+            return (yield self.parse_compound_statement())
+        if token_type in io_tokens:
+            return (yield self.parse_io_statement())
+        if token_type == 'IF':
+            return (yield self.parse_if_statement())
+        if token_type == 'WHILE':
+            return (yield self.parse_while_statement())
+        if token_type == 'FOR':
+            return (yield self.parse_for_statement())
+        if token_type in empty_statement_follow:
+            return None
+        expression = yield self.parse_expression()
+        if self.peek_type() == 'ASSIGN' and isinstance(expression, ArrayAccess) and self.tokens[self.position - 1].type == 'RBRACKET':
+            # factor LBRACKET expression RBRACKET ASSIGN expression
+            assign_token = self.advance()
+            if not isinstance(expression.array, Identifier): # only an element of a named array can be assigned
+                raise ParseError(assign_token)
+            return AssignmentStatement(variable=expression, expression=(yield self.parse_expression()), lineno=assign_token.lineno)
+        return expression
+
+    def parse_assignment_statement(self):
+        id_token = self.advance()
+        assign_token = self.advance()
+        variable_node = Identifier(name=id_token.value, lineno=id_token.lineno)
+        return AssignmentStatement(variable=variable_node, expression=(yield self.parse_expression()), lineno=assign_token.lineno)
+
+    def parse_io_statement(self):
+        operation = self.advance().value
+        self.expect('LPAREN')
+        arguments = yield self.parse_expression_list()
+        self.expect('RPAREN')
+        return IOCall(operation=operation.lower(), arguments=arguments)
+
+    def parse_if_statement(self):
+        self.expect('IF')
+        condition = yield self.parse_expression()
+        self.expect('THEN')
+        then_statement = yield self.parse_statement()
+        else_statement = None
+        if self.accept('ELSE'): # a dangling else binds to the nearest if
+            else_statement = yield self.parse_statement()
+        return IfStatement(condition=condition, then_statement=then_statement, else_statement=else_statement)
+
+    def parse_while_statement(self):
+        self.expect('WHILE')
+        condition = yield self.parse_expression()
+        self.expect('DO')
+        return WhileStatement(condition=condition, statement=(yield self.parse_statement()))
+
+    def parse_for_statement(self):
+        self.expect('FOR')
+        control_var_name = self.expect('ID').value
+        self.expect('ASSIGN')
+        start_expr = yield self.parse_expression()
+        direction = self.peek()
+        if direction.type not in ('TO', 'DOWNTO'):
+            raise ParseError(direction)
+        self.advance()
+        end_expr = yield self.parse_expression()
+        self.expect('DO')
+        loop_statement = yield self.parse_statement()
+        return ForStatement(control_variable=Identifier(name=control_var_name),
+                            start_expression=start_expr,
+                            end_expression=end_expr,
+                            statement=loop_statement,
+                            downto=(direction.type == 'DOWNTO'))
+
+    # --- expressions ---
+    def parse_expression(self, min_binding_power=1):
+        """Precedence climbing: every binary level is left associative, so the right operand binds one level tighter."""
+        left = yield self.parse_factor()
+        tokens = self.tokens
+        while True:
+            operator_token = tokens[self.position]
+            binding_power = binary_binding_power.get(operator_token.type)
+            if binding_power is None or binding_power < min_binding_power:
+                return left
+            self.position += 1
+            right = yield self.parse_expression(binding_power + 1)
+            left = BinaryOperation(left=left, operator=operator_token.value, right=right)
+
+    def parse_factor(self):
+        node = yield self.parse_prefixed_factor()
+        while self.accept('LBRACKET'):
+            index = yield self.parse_expression()
+            self.expect('RBRACKET')
+            node = ArrayAccess(array=node, index=index)
+        return node
+
+    def parse_prefixed_factor(self):
+        # "-" and "not" take precedence over indexing in the LALR tables, so -x[1] is (-x)[1]
+        token = self.advance()
+        token_type = token.type
+
+        if token_type == 'MINUS' or token_type == 'NOT':
+            return UnaryOperation(operator=token.value, operand=(yield self.parse_prefixed_factor()))
+        if token_type == 'NUMBER' or token_type == 'STRING':
+            return Literal(token.value)
+        if token_type == 'TRUE':
+            return Literal(True)
+        if token_type == 'FALSE':
+            return Literal(False)
+        if token_type == 'ID':
+            if self.accept('LPAREN'):
+                arguments = yield self.parse_expression_list()
+                self.expect('RPAREN')
+                return FunctionCall(name=token.value, arguments=arguments, lineno=token.lineno)
+            return Identifier(name=token.value, lineno=token.lineno)
+        if token_type == 'LPAREN':
+            node = yield self.parse_expression()
+            self.expect('RPAREN')
+            return node
+        raise ParseError(token)
+
+    def parse_expression_list(self):
+        if self.peek_type() == 'RPAREN':
+            return []
+        expressions = []
+        if self.peek_type() != 'COMMA': # the grammar allows the first expression to be empty
+            expressions.append((yield self.parse_expression()))
+        while self.accept('COMMA'):
+            expressions.append((yield self.parse_expression()))
+        return expressions
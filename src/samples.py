@@ -0,0 +1,156 @@
+"""
+Sample programs, and the helpers that compile them, shared by bench.py and the tests.
+"""
+import glob
+import os
+
+from session import CompilerSession
+
+# Get the directory where samples.py is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_DIR = os.path.join(SCRIPT_DIR, "..", "input")
+
+# what the input examples read, for running them on the simulator
+SAMPLE_INPUTS = {
+    "example2.pas": ["3", "9", "4"],
+    "example3.pas": ["5"],
+    "example4.pas": ["7"],
+    "example5.pas": ["3", "1", "2", "3", "4"],
+    "example6.pas": ["1011"],
+    "example7.pas": ["1011"],
+    "mock_pascal2.pas": ["5", "6"],
+    "mock_pascal3.pas": ["Ana"],
+}
+
+def read_inputs():
+    """Returns (name, source) for every .pas file in the input folder."""
+    sources = []
+    for path in sorted(glob.glob(os.path.join(INPUT_DIR, "*.pas"))):
+        with open(path) as f:
+            sources.append((os.path.basename(path), f.read()))
+    return sources
+
+def synthetic_program(statement_count, variable_count=100):
+    """Generates a large program mixing keywords, identifiers, numbers, strings and comments."""
+    variable_names = [f"value{i}" for i in range(variable_count)]
+    lines = ["program Synthetic;", "var", "    " + ", ".join(variable_names) + ": integer;", "begin"]
+    for i in range(statement_count):
+        target = variable_names[i % variable_count]
+        source = variable_names[(i * 7 + 1) % variable_count]
+        if i % 5 == 0:
+            lines.append(f"    {{ step {i} }} if {source} >= {i} then writeln('step {i}: ', {source}) else {target} := {source} div 2;")
+        else:
+            lines.append(f"    {target} := ({source} + {i}) * 3 mod 7; (* update *)")
+    lines.append("    writeln(value0)")
+    lines.append("end.")
+    return "\n".join(lines)
+
+def expression_heavy_program(statement_count, operand_count=12):
+    """Generates a program whose statements are long arithmetic expressions."""
+    lines = ["program Expressions;", "var", "    a, b, c, d: integer;", "begin"]
+    for i in range(statement_count):
+        terms = [("a", "b", "c", "d")[j % 4] if j % 3 else str(i + j) for j in range(operand_count)]
+        expression = terms[0]
+        for j, term in enumerate(terms[1:]):
+            expression += (" + ", " * ", " - ", " div ")[j % 4] + term
+        lines.append(f"    a := {expression};")
+    lines.append("    writeln(a)")
+    lines.append("end.")
+    return "\n".join(lines)
+
+def expression_chain_program(operand_count):
+    """Generates a program assigning one chain of operand_count operands."""
+    expression = " + ".join(("a", "1", "b", "2")[i % 4] for i in range(operand_count))
+    return f"program Chain; var a, b: integer; begin a := {expression}; writeln(a) end."
+
+def library_program(routine_count, used_count=5):
+    """Generates a program declaring routine_count small functions and calling only the first used_count."""
+    lines = ["program Library;"]
+    for i in range(routine_count):
+        lines += [f"function Step{i}(k: integer): integer;", "begin",
+                  f"    if k > {i} then Step{i} := k - {i} else Step{i} := k * 2 + {i}", "end;"]
+    lines += ["var n: integer;", "begin", "    n := 1;"]
+    lines += [f"    n := Step{i}(n);" for i in range(used_count)]
+    lines += ["    writeln(n)", "end."]
+    return "\n".join(lines)
+
+def array_loop_programs(element_count):
+    """Generates (name, source) for a fill, a sum and a differences loop over an array of element_count integers."""
+    header = [f"var a, d: array[1..{element_count}] of integer; i, total: integer;", "begin"]
+    fill = [f"    for i := 1 to {element_count} do a[i] := i * 2;"]
+    return [
+        ("array-fill", "\n".join(["program Fill;"] + header + fill + [f"    writeln(a[{element_count}])", "end."])),
+        ("array-sum", "\n".join(["program Sum;"] + header + fill + [
+            "    total := 0;", f"    for i := 1 to {element_count} do total := total + a[i];", "    writeln(total)", "end."])),
+        ("array-differences", "\n".join(["program Differences;"] + header + fill + [
+            f"    for i := 1 to {element_count - 1} do d[i] := a[i + 1] - a[i];", "    writeln(d[1])", "end."])),
+    ]
+
+def helper_program(iteration_count):
+    """Generates a program whose loop calls a small function and a procedure with a VAR parameter."""
+    return "\n".join([
+        "program Helpers;",
+        "var i, total, c: integer;",
+        "function Clamp(k, limit: integer): integer;",
+        "begin",
+        "    if k > limit then Clamp := limit else Clamp := k",
+        "end;",
+        "procedure Accumulate(var sum: integer; k: integer);",
+        "begin",
+        "    sum := sum + k",
+        "end;",
+        "begin",
+        "    total := 0;",
+        f"    for i := 1 to {iteration_count} do",
+        "    begin",
+        "        c := Clamp(i mod 7, 4);",
+        "        Accumulate(total, c)",
+        "    end;",
+        "    writeln(total)",
+        "end."])
+
+def checked_inputs(session):
+    """Returns (name, checked AST) for the input examples without semantic errors."""
+    programs = []
+    for name, source_code in read_inputs():
+        ast = session.parse(source_code)
+        try:
+            session.check(ast)
+        except Exception:
+            continue # the error examples
+        programs.append((name, ast))
+    return programs
+
+def checked(source_code):
+    """The AST of the source, parsed and checked by a new CompilerSession."""
+    session = CompilerSession()
+    ast = session.parse(source_code)
+    session.check(ast)
+    return ast
+
+def compile_blocks(source_code, rewrite=None, rewrite_blocks=None, **options):
+    """
+    The blocks of the source compiled by a CompilerSession with the options, after
+    rewrite(ast) when given, and then rewritten by rewrite_blocks(blocks) when given.
+    """
+    session = CompilerSession(**options)
+    ast = session.parse(source_code)
+    session.check(ast)
+    if rewrite is not None:
+        rewrite(ast)
+    blocks = session.generate_blocks(ast)
+    if rewrite_blocks is not None:
+        rewrite_blocks(blocks)
+    return blocks
+
+def opcodes(blocks):
+    return [i.opcode for block in blocks for i in block.instructions if i.opcode is not None]
+
+def instructions(blocks):
+    return [(i.opcode, i.operand) for block in blocks for i in block.instructions if i.opcode is not None]
+
+def checked_sources():
+    """(name, source) of the input examples without semantic errors, and of a program calling small helpers."""
+    names = {name for name, _ in checked_inputs(CompilerSession())}
+    sources = [(name, source_code) for name, source_code in read_inputs() if name in names]
+    return sources + [("helpers", helper_program(20))]
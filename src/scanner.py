@@ -0,0 +1,165 @@
+import re
+from ply.lex import LexToken
+from analex import reserved, intern_name
+
+# token types of the fixed symbols, longest spelling first where they share a prefix
+two_char_symbols = {
+    ':=': 'ASSIGN',
+    '<>': 'NE',
+    '<=': 'LE',
+    '>=': 'GE',
+}
+
+one_char_symbols = {
+    '+': 'PLUS',
+    '-': 'MINUS',
+    '*': 'TIMES',
+    '/': 'DIVIDE',
+    '(': 'LPAREN',
+    ')': 'RPAREN',
+    '[': 'LBRACKET',
+    ']': 'RBRACKET',
+    ',': 'COMMA',
+    ';': 'SEMICOLON',
+    ':': 'COLON',
+    '.': 'DOT',
+    '=': 'EQUALS',
+    '<': 'LT',
+    '>': 'GT',
+}
+
+identifier_start = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+digits = frozenset('0123456789')
+
+identifier_pattern = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+number_pattern = re.compile(r'\d+(\.\d+)?')
+string_pattern = re.compile(r'\'([^\\\n]|(\\.))*?\'')
+blank_pattern = re.compile(r'[ \t\r]+')
+
+class Scanner:
+    """
+    Hand-written single-pass scanner, a drop-in replacement for the PLY lexer built by analex.
+
+    Identifiers are classified against the reserved-word table case-insensitively,
+    so keywords never match a prefix of an identifier. Comments, strings and numbers
+    are handled in the same loop, and the tokens are PLY LexToken objects, so the
+    anasin parser can consume them unchanged.
+    """
+
+    def __init__(self):
+        self.lexdata = ""
+        self.lexpos = 0
+        self.lineno = 1
+        self._tokens = iter(())
+        self.name_keys = {} # identifier spelling -> interned lowercase key, as on the PLY lexer
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self._tokens = self._scan()
+
+    def token(self):
+        return next(self._tokens, None)
+
+    def clone(self):
+        return Scanner()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def _make_token(self, token_type, value, pos):
+        tok = LexToken()
+        tok.type = token_type
+        tok.value = value
+        tok.lineno = self.lineno
+        tok.lexpos = pos
+        tok.lexer = self
+        return tok
+
+    def _scan(self):
+        data = self.lexdata
+        length = len(data)
+        pos = self.lexpos
+
+        while pos < length:
+            char = data[pos]
+
+            if char == '\n':
+                self.lineno += 1
+                pos += 1
+
+            elif char in ' \t\r':
+                pos = blank_pattern.match(data, pos).end()
+
+            elif char in identifier_start:
+                end = identifier_pattern.match(data, pos).end()
+                text = data[pos:end]
+                token_type = reserved.get(text.lower(), 'ID')
+                if token_type == 'ID':
+                    text = intern_name(text, self.name_keys)
+                elif token_type == 'TRUE':
+                    text = True
+                elif token_type == 'FALSE':
+                    text = False
+                self.lexpos = end
+                yield self._make_token(token_type, text, pos)
+                pos = end
+
+            elif char in digits:
+                match = number_pattern.match(data, pos)
+                text = match.group()
+                end = match.end()
+                value = float(text) if match.group(1) else int(text)
+                self.lexpos = end
+                yield self._make_token('NUMBER', value, pos)
+                pos = end
+
+            elif char == '\'':
+                match = string_pattern.match(data, pos)
+                if match is None: # unterminated string, reported like any illegal character
+                    print("Illegal character '%s'" % char)
+                    pos += 1
+                    continue
+                end = match.end()
+                self.lexpos = end
+                yield self._make_token('STRING', data[pos + 1:end - 1], pos) # the quotes are not part of the value
+                pos = end
+
+            elif char == '{': # comments like this "{ ... }"
+                end = data.find('}', pos + 1)
+                if end < 0:
+                    print("Illegal character '%s'" % char)
+                    pos += 1
+                    continue
+                self.lineno += data.count('\n', pos, end)
+                pos = end + 1
+
+            else:
+                if char == '(' and data.startswith('*', pos + 1): # comments like this "(* ... *)"
+                    end = data.find('*)', pos + 2)
+                    if end >= 0:
+                        self.lineno += data.count('\n', pos, end)
+                        pos = end + 2
+                        continue
+                pair = data[pos:pos + 2]
+                token_type = two_char_symbols.get(pair)
+                if token_type is not None:
+                    self.lexpos = pos + 2
+                    yield self._make_token(token_type, pair, pos)
+                    pos += 2
+                    continue
+                token_type = one_char_symbols.get(char)
+                if token_type is not None:
+                    self.lexpos = pos + 1
+                    yield self._make_token(token_type, char, pos)
+                else:
+                    print("Illegal character '%s'" % char)
+                pos += 1
+
+        self.lexpos = pos
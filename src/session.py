@@ -0,0 +1,85 @@
+from anasin import build_parser
+from rdparser import RecursiveDescentParser
+from ast_nodes import compact
+from analex import build_lexer
+from anasem import SymbolTable, semantic_check, register_builtin_functions
+from inliner import INLINE_BUDGET
+from vm_assembly.generator import generate, generate_blocks
+
+class CompilerSession:
+    """
+    Long-lived compiler state shared by every compilation of a batch.
+
+    The lexer, the parser and the builtins scope are built once when the
+    session is created and reused for each source file, instead of being
+    rebuilt by every call to parse_program. The parser is either the PLY
+    LALR parser ('lalr') or the hand-written recursive-descent one ('rd').
+    """
+
+    def __init__(self, lexer_backend="ply", parser_engine="lalr", compact_ast=False, optimize=False, short_circuit=False,
+                 inline_budget=INLINE_BUDGET):
+        self.compact_ast = compact_ast # store parsed trees in the compact tuple-backed mode
+        self.optimize = optimize # run the optimization passes on the generated code
+        self.short_circuit = short_circuit # short-circuit plain and/or whose right operand has no side effects
+        self.inline_budget = inline_budget # the largest routine body (in AST nodes) optimize inlines
+        self.lexer = build_lexer(lexer_backend) # 'ply' or the hand-written 'scanner'
+        if parser_engine == "lalr":
+            # optimize skips the grammar validation and the parsetab signature check,
+            # the committed parsetab.py is always loaded as is
+            self.parser = build_parser(optimize=True, debug=False, write_tables=False)
+        elif parser_engine == "rd":
+            self.parser = RecursiveDescentParser()
+        else:
+            raise ValueError(f"Unknown parser engine '{parser_engine}'")
+        # the scopes share the lexer's spelling -> key table, which goes away with the session
+        self.builtins_scope = SymbolTable(scope_name="global_init_phase", name_keys=self.lexer.name_keys)
+        register_builtin_functions(self.builtins_scope)
+
+    def new_global_scope(self):
+        """Creates a fresh global scope on top of the shared builtins scope."""
+        return SymbolTable(parent=self.builtins_scope, scope_name="global")
+
+    def parse(self, source_code):
+        """Parses a source string, returning the AST or None on failure."""
+        self.lexer.lineno = 1 # the lexer is reused, so line numbers must restart for each file
+        try:
+            ast = self.parser.parse(source_code, lexer=self.lexer)
+        except Exception as e:
+            print(f"Parse error: {e}")
+            return None
+        if ast and self.compact_ast:
+            compact(ast)
+        return ast
+
+    def check(self, ast):
+        """Runs the semantic analysis, raising on the first semantic error."""
+        global_scope = self.new_global_scope()
+        semantic_check(ast, global_scope)
+        return global_scope
+
+    def generate(self, ast, compact=False):
+        """Generates the VM code from the frozen scopes check left on the AST (an unchecked AST is checked first)."""
+        return generate(ast, builtins_scope=self.builtins_scope, compact=compact, optimize=self.optimize, short_circuit=self.short_circuit,
+                        inline_budget=self.inline_budget)
+
+    def generate_blocks(self, ast):
+        """Generates the VM code as instruction blocks, to be rendered or streamed by the caller."""
+        return generate_blocks(ast, builtins_scope=self.builtins_scope, optimize=self.optimize, short_circuit=self.short_circuit,
+                               inline_budget=self.inline_budget)
+
+    def compile(self, source_code):
+        """Parses, checks and generates a source string, returning the VM code or None if parsing failed."""
+        ast = self.parse(source_code)
+        if not ast:
+            return None
+        self.check(ast)
+        return self.generate(ast)
+
+_default_session = None
+
+def get_default_session():
+    """Returns the process-wide session, creating it on first use."""
+    global _default_session
+    if _default_session is None:
+        _default_session = CompilerSession()
+    return _default_session
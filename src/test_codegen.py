@@ -0,0 +1,91 @@
+import io
+
+from samples import checked, instructions
+from vm_assembly import generation_context as ctx
+from vm_assembly.generator import generate, generate_blocks
+from vm_assembly.simulator import run
+
+SOURCE = """program Blocks;
+function Twice(n: integer): integer;
+begin
+    Twice := n * 2
+end;
+var s: string;
+begin
+    s := 'say "hi"';
+    writeln(s, Twice(21))
+end."""
+
+def test_code_is_generated_as_blocks_of_instructions():
+    ast = checked(SOURCE)
+    blocks = generate_blocks(ast)
+    assert [block.name for block in blocks] == ['global', 'twice', 'global']
+
+    twice = blocks[1].instructions
+    assert twice[0].label == 'funcTwice1' and twice[0].opcode is None
+    assert (twice[-1].opcode, twice[-1].operand) == ('RETURN', None)
+    push_string = next(i for i in blocks[2].instructions if i.opcode == 'PUSHS')
+    assert push_string.operand == 'say "hi"' # operands are kept unformatted
+
+    lines = ctx.render(blocks)
+    assert lines == generate(ast)
+    assert '    PUSHS "say \\"hi\\""' in lines
+    assert "    // Param 'n' at FP-1" in lines
+    assert "funcTwice1:" in lines
+
+def test_write_streams_the_rendered_lines():
+    ast = checked(SOURCE)
+    out, echo = io.StringIO(), io.StringIO()
+    line_count = ctx.write(generate_blocks(ast), out, echo=echo)
+    lines = generate(ast)
+    assert line_count == len(lines)
+    assert out.getvalue() == echo.getvalue() == "".join(f"{line}\n" for line in lines)
+
+def test_compact_output_has_no_comments_and_short_labels():
+    ast = checked(SOURCE)
+    annotated = generate(ast)
+    compact = generate(ast, compact=True)
+    instruction_lines = [line.split("//")[0].strip() for line in annotated if not line.lstrip().startswith("//")]
+    assert len(compact) == len(instruction_lines)
+    assert not any("//" in line or line != line.strip() for line in compact)
+    assert compact[compact.index("PUSHA L1") + 1] == "CALL" # funcTwice1 -> L1 (mainLabel0 -> L0)
+    assert "L0:" in compact and "L1:" in compact
+
+def test_array_elements_are_stored_without_temporaries():
+    ast = checked("""program Fill;
+var a: array[1..3] of integer; i: integer;
+begin
+    for i := 1 to 3 do a[i] := i * 10;
+    read(a[2]);
+    writeln(a[1] + a[2] + a[3])
+end.""")
+    blocks = generate_blocks(ast)
+    code = instructions(blocks[-1:])
+    store = code.index(("STOREN", None))
+    # the base address less the lower bound, the index as it is, then the value right below STOREN
+    assert code[store - 7:store + 1] == [("PUSHGP", None), ("PUSHI", -1), ("PADD", None), ("PUSHG", 3),
+                                          ("PUSHG", 3), ("PUSHI", 10), ("MUL", None), ("STOREN", None)]
+    assert [opcode for opcode, _ in code if opcode == "STOREL"] == ["STOREL"] # only the for loop's end value is spilled
+    assert run(blocks, ["7"])[0] == "47\n"
+
+def test_elements_with_a_literal_index_are_addressed_directly():
+    ast = checked("""program Direct;
+var g: array[1..3] of integer;
+procedure Fill(n: integer);
+var l: array[5..6] of integer;
+begin
+    l[5] := n; read(l[6]);
+    g[3] := l[5] + l[6];
+    writeln(g[3], g[4 - n])
+end;
+begin
+    g[1] := 1; g[2] := 2;
+    Fill(3)
+end.""")
+    blocks = generate_blocks(ast)
+    code = instructions(blocks)
+    # l is at FP+0 and g at GP+0: only g[4 - n] is left to LOADN
+    assert {("STOREL", 0), ("STOREL", 1), ("PUSHL", 0), ("PUSHL", 1), ("STOREG", 0), ("STOREG", 1), ("STOREG", 2), ("PUSHG", 2)} <= set(code)
+    assert [opcode for opcode, _ in code if opcode in ("LOADN", "STOREN", "SUB")] == ["SUB", "LOADN"]
+    assert run(blocks, ["4"])[0] == "71\n"
+
@@ -0,0 +1,59 @@
+import glob
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from session import CompilerSession
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+THREADS = 16
+ROUNDS = 8 # each file is compiled this many times, so compilations of every file overlap
+
+sessions = threading.local() # a session (lexer and parser) per thread
+
+def compile_input(path):
+    if not hasattr(sessions, "session"):
+        sessions.session = CompilerSession()
+    with open(path) as f:
+        source_code = f.read()
+    try:
+        return "\n".join(sessions.session.compile(source_code)) + "\n"
+    except Exception as e: # the error examples must fail the same way every time
+        return f"error: {e}"
+
+def test_compile_inputs_from_many_threads():
+    paths = sorted(glob.glob(os.path.join(INPUT_DIR, "*.pas")))
+    expected = {path: compile_input(path) for path in paths}
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # switch threads as often as possible
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            jobs = paths * ROUNDS
+            results = list(pool.map(compile_input, jobs))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    for path, output in zip(jobs, results):
+        assert output == expected[path], os.path.basename(path)
+
+def test_repr_trees_from_many_threads():
+    paths = [path for path in sorted(glob.glob(os.path.join(INPUT_DIR, "*.pas"))) if "errors" not in path]
+    session = CompilerSession()
+    trees = []
+    for path in paths:
+        with open(path) as f:
+            trees.append(session.parse(f.read()))
+    expected = [repr(tree) for tree in trees]
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(repr, trees * ROUNDS))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    # each thread bounds its own depth: the nodes elided are the same as in a single thread
+    assert results == expected * ROUNDS
@@ -0,0 +1,53 @@
+from samples import compile_blocks, opcodes
+from vm_assembly.simulator import run
+from vm_assembly.stack_check import check_stack
+
+CONDITIONS = """program Conditions;
+var a, b, i: integer; x: real; s: string; ok: boolean;
+begin
+    read(a); read(b); x := 1.5; s := 'abc';
+    if a <> b then writeln('differ') else writeln('same');
+    if not (a < b) then writeln('not less');
+    if not ((a > b) andthen (b <> 0)) then writeln('not both');
+    if not (a = b) orelse not (x <> 1.5) then writeln('either');
+    if not (s[2] = 'b') then writeln('no b') else writeln('b');
+    i := 0;
+    while not (i >= 3) do i := i + 1;
+    ok := not (a <= b);
+    writeln(i, ok)
+end."""
+
+def test_conditions_branch_without_computing_a_boolean():
+    blocks = compile_blocks(CONDITIONS)
+    assert run(blocks, ["5", "3"])[0] == "differ\nnot less\neither\nb\n31\n"
+    assert run(blocks, ["2", "2"])[0] == "same\nnot less\nnot both\neither\nb\n30\n"
+    code = opcodes(blocks)
+    # not (x <> 1.5) is x = 1.5 and an integer <> branches on the difference
+    assert "NOT" not in code and code.count("FEQUAL") == 1
+    assert check_stack(blocks) == []
+
+def test_not_of_a_comparison_is_the_inverse_comparison():
+    code = opcodes(compile_blocks("""program Inverse;
+var a, b: integer; ok: boolean;
+begin
+    read(a); read(b);
+    ok := not (a < b);
+    while not (a >= b) do a := a + 1
+end."""))
+    # the loop leaves when a >= b is false, that is when a < b is true
+    assert "NOT" not in code and code.count("SUPEQ") == 1 and code.count("INF") == 1
+
+def test_a_real_or_string_inequality_swaps_the_branches():
+    blocks = compile_blocks("""program Swapped;
+var x: real; s: string; ready: boolean;
+begin
+    read(x); s := 'abc'; ready := x > 1.0;
+    if x <> 1.5 then writeln('differ') else writeln('same');
+    if not (s = 'abc') then writeln('other') else writeln('abc');
+    if not ready then writeln('waiting') else writeln('ready');
+    while x <> 1.5 do x := 1.5
+end.""")
+    assert run(blocks, ["2.5"])[0] == "differ\nabc\nready\n"
+    assert run(blocks, ["1.5"])[0] == "same\nabc\nready\n"
+    # only the while, which has no else to swap with, still negates the FEQUAL
+    assert opcodes(blocks).count("NOT") == 1 and check_stack(blocks) == []
@@ -0,0 +1,65 @@
+from constant_folding import fold_constants
+from samples import checked, instructions
+from vm_assembly.generator import generate_blocks
+
+def folded(source_code):
+    ast = checked(source_code)
+    counts = fold_constants(ast)
+    return generate_blocks(ast), counts
+
+def test_literals_and_builtins_are_folded_with_vm_semantics():
+    blocks, counts = folded("""program Fold;
+begin
+    writeln(2 * 3 + 4, -7 div 2, -7 mod 2, not true, 'ab' = 'ab', 7 / 2);
+    writeln(abs(-5), sqr(6), pred(1), succ(1), length('four'), uppercase('MixEd 1'), lowercase('MixEd'))
+end.""")
+    pushes = [operand for opcode, operand in instructions(blocks) if opcode.startswith("PUSH") and opcode != "PUSHA"]
+    assert pushes == [10, -3, -1, 0, 1, 3.5, 5, 36, 0, 2, 4, "MIXED 1", "mixed"]
+    assert counts['folded'] == 17 # -7 and -5 are unary minus operations
+
+def test_what_would_fail_at_run_time_is_not_folded():
+    blocks, counts = folded("""program NoFold;
+begin
+    writeln(1 div 0, 1 mod 0, 1.0 / 0, 2147483647 + 1, 'a' + 'b')
+end.""")
+    assert not counts['folded']
+    assert ("DIV", None) in instructions(blocks) and ("MOD", None) in instructions(blocks) and ("FDIV", None) in instructions(blocks)
+
+def test_constants_are_propagated_until_the_variable_may_change():
+    blocks, counts = folded("""program Propagate;
+var n, m, i: integer;
+procedure Reset(k: integer);
+begin
+    n := k
+end;
+begin
+    n := 10;
+    m := n div 2;
+    if m > 3 then i := 1 else i := 1;
+    writeln(m, i);
+    while n > 0 do n := n - 1;
+    writeln(n);
+    n := 4;
+    Reset(0);
+    writeln(n)
+end.""")
+    main = instructions(blocks[2:])
+    # m := 10 div 2 and m > 3 are folded, i is known to be 1 after both branches
+    assert main[:5] == [("PUSHI", 10), ("STOREG", 0), ("PUSHI", 5), ("STOREG", 1), ("PUSHI", 1)]
+    first_write = main.index(("WRITEI", None))
+    assert main[first_write - 1:first_write + 3] == [("PUSHI", 5), ("WRITEI", None), ("PUSHI", 1), ("WRITEI", None)]
+    assert main.count(("PUSHG", 0)) == 4 # the loop and both writeln(n) read n
+    assert counts['propagated'] == 4
+
+def test_a_literal_left_operand_decides_andthen_and_orelse():
+    blocks, counts = folded("""program Decide;
+var d: integer; ok: boolean;
+begin
+    read(d);
+    ok := false andthen (10 div d > 1);
+    ok := true orelse (10 div d > 1);
+    ok := true andthen (d > 1)
+end.""")
+    code = instructions(blocks)
+    assert ("DIV", None) not in code and counts['folded'] == 3
+    assert code[-4:] == [("PUSHI", 1), ("SUP", None), ("STOREG", 1), ("STOP", None)]
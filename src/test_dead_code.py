@@ -0,0 +1,53 @@
+from dead_code import eliminate_dead_code
+from samples import checked, checked_sources, compile_blocks
+from test_peephole import block_of, lines_of
+from vm_assembly import peephole
+from vm_assembly.generator import generate_blocks
+from vm_assembly.simulator import run
+
+SOURCE = """program Library;
+var n: integer;
+function Fact(k: integer): integer;
+begin
+    if k <= 1 then Fact := 1 else Fact := k * Fact(k - 1)
+end;
+function Helper(k: integer): integer;
+begin
+    Helper := k
+end;
+function Unused(k: integer): integer;
+begin
+    Unused := Helper(k)
+end;
+procedure Debug(k: integer);
+begin
+    writeln(k)
+end;
+begin
+    n := 5;
+    if false then Debug(n);
+    while false do n := 0;
+    if true then writeln(Fact(n)) else writeln(Unused(n))
+end."""
+
+def test_constant_branches_and_unreachable_routines_are_removed():
+    ast = checked(SOURCE)
+    counts = eliminate_dead_code(ast)
+    assert counts == {'branches': 3, 'routines': 3}
+    assert [declaration.name for declaration in ast.block.declarations[1:]] == ['Fact'] # kept, it calls itself
+    blocks = generate_blocks(ast)
+    assert [block.name for block in blocks] == ['global', 'fact', 'global']
+    assert run(blocks)[0] == run(generate_blocks(checked(SOURCE)))[0]
+
+def test_unreachable_instructions_and_unused_labels_are_removed():
+    block = block_of("PUSHI 1", "JZ used", "JUMP end", "PUSHI 2", "WRITEI", "unused:", "PUSHI 3", "used:", "RETURN", "STOP", "end:", "STOP")
+    removed = peephole.remove_dead_code([block])
+    # once 'unused' is gone, the code it started is unreachable as well
+    assert lines_of(block) == ["PUSHI 1", "JZ used", "JUMP end", "used:", "RETURN", "end:", "STOP"]
+    assert removed == {'unreachable': 4, 'unused_label': 1}
+
+def test_dead_code_removal_never_grows_the_inputs():
+    for name, source_code in checked_sources():
+        size = peephole.instruction_count(compile_blocks(source_code))
+        blocks = compile_blocks(source_code, eliminate_dead_code, peephole.remove_dead_code)
+        assert peephole.instruction_count(blocks) <= size, name
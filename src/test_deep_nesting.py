@@ -0,0 +1,53 @@
+import sys
+
+import pytest
+
+from session import CompilerSession
+
+# Both parsers, the semantic checker and the code generator keep their nesting on an
+# explicit stack (walker.py), so these trees are far deeper than the default recursion
+# limit of ~1000.
+OPERAND_COUNT = 50_000
+NESTING_DEPTH = 5_000
+
+parser_engines = pytest.mark.parametrize("parser_engine", ["lalr", "rd"])
+
+def compile_source(source_code, parser_engine):
+    recursion_limit = sys.getrecursionlimit()
+    code = CompilerSession(parser_engine=parser_engine).compile(source_code)
+    assert sys.getrecursionlimit() == recursion_limit
+    assert code is not None
+    return [line.split()[0] for line in code if line.strip()] # opcodes and labels
+
+@parser_engines
+def test_long_operator_chain(parser_engine):
+    # a left-leaning chain of 50k BinaryOperation nodes
+    expression = " + ".join(["a", "1"] * (OPERAND_COUNT // 2))
+    source_code = f"program Chain; var a: integer; begin a := {expression}; writeln(a) end."
+    opcodes = compile_source(source_code, parser_engine)
+    assert opcodes.count("ADD") == OPERAND_COUNT - 1
+    assert "WRITEI" in opcodes
+
+@parser_engines
+def test_deeply_nested_statements(parser_engine):
+    ifs = "if a > 0 then " * NESTING_DEPTH
+    blocks = "begin " * NESTING_DEPTH + "a := a - 1" + " end" * NESTING_DEPTH
+    source_code = f"program Nested; var a: integer; begin a := 1; {ifs}{blocks} end."
+    opcodes = compile_source(source_code, parser_engine)
+    assert opcodes.count("JZ") == NESTING_DEPTH
+
+@parser_engines
+def test_deeply_nested_expression(parser_engine):
+    # right-nested parentheses: a * (a * (a * ... ))
+    expression = "a * (" * NESTING_DEPTH + "2.5" + ")" * NESTING_DEPTH
+    source_code = f"program Parens; var a: real; begin a := 1; a := {expression}; writeln(a) end."
+    opcodes = compile_source(source_code, parser_engine)
+    assert opcodes.count("FMUL") == NESTING_DEPTH
+    assert "WRITEF" in opcodes
+
+@parser_engines
+def test_error_deep_in_the_tree(parser_engine):
+    ifs = "if a > 0 then " * NESTING_DEPTH
+    source_code = f"program Nested; var a: integer; begin {ifs}b := 1 end."
+    with pytest.raises(Exception, match="Identifier 'b' not declared"):
+        CompilerSession(parser_engine=parser_engine).compile(source_code)
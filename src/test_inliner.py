@@ -0,0 +1,74 @@
+from inliner import inline_calls
+from samples import checked, compile_blocks, opcodes
+from vm_assembly.simulator import run
+from vm_assembly.stack_check import check_stack
+
+def inlined_sites(source_code, **options):
+    return [str(site) for site in inline_calls(checked(source_code), **options)]
+
+def test_small_routines_are_inlined_callees_first():
+    source_code = """program Nested;
+var n, total, counter, stepped: integer;
+function Twice(k: integer): integer;
+begin
+    Twice := k * 2
+end;
+function Step(k: integer): integer;
+var doubled: integer;
+begin
+    doubled := Twice(k);
+    if doubled > 4 then Step := doubled - 4 else Step := doubled
+end;
+procedure Bump(var cell: integer; var sum: integer; k: integer);
+begin
+    cell := cell + k;
+    sum := sum + cell
+end;
+begin
+    total := 0;
+    counter := 0;
+    for n := 1 to 3 do
+    begin
+        stepped := Step(n);
+        total := total + stepped;
+        Bump(counter, total, n)
+    end;
+    writeln(counter, ' ', total)
+end."""
+    assert inlined_sites(source_code) == [
+        "Twice inlined into Step at line 10", "Step inlined into the main program at line 23",
+        "Bump inlined into the main program at line 25"]
+    plain = compile_blocks(source_code, optimize=True, inline_budget=0)
+    inlined = compile_blocks(source_code, optimize=True)
+    assert "CALL" not in opcodes(inlined) and not check_stack(inlined)
+    output, steps = run(inlined)
+    assert output == run(plain)[0] == "6 18\n"
+    assert steps < run(plain)[1]
+
+def test_recursive_and_large_routines_are_not_inlined():
+    source_code = """program Limits;
+var n: integer;
+procedure Countdown(k: integer);
+begin
+    if k > 0 then
+    begin
+        write(k);
+        Countdown(k - 1)
+    end
+end;
+function Big(k: integer): integer;
+var m: integer;
+begin
+    m := k + 1; m := m + 2; m := m + 3; m := m + 4;
+    Big := m
+end;
+begin
+    Countdown(3);
+    writeln('');
+    n := Big(120);
+    writeln(n)
+end."""
+    assert inlined_sites(source_code) == ["Big inlined into the main program at line 20"]
+    assert inlined_sites(source_code, budget=10) == []
+    blocks = compile_blocks(source_code, optimize=True)
+    assert run(blocks)[0] == "321\n130\n" and check_stack(blocks) == []
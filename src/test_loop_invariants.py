@@ -0,0 +1,113 @@
+import ast_nodes
+from loop_invariants import invariant_expressions
+from samples import checked
+from vm_assembly import generation_context as ctx
+from vm_assembly import node_visitors, peephole
+from vm_assembly.generator import generate_blocks
+from vm_assembly.simulator import run
+from vm_assembly.stack_check import check_stack
+
+PRIMES = """program Primes;
+var num, i, count, limit: integer; primo: boolean;
+begin
+    read(limit);
+    count := 0;
+    num := 2;
+    while num <= limit * 10 do
+    begin
+        primo := true;
+        i := 2;
+        while (i <= (num div 2)) and primo do
+        begin
+            if (num mod i) = 0 then primo := false;
+            i := i + 1
+        end;
+        if primo then count := count + 1;
+        num := num + 1
+    end;
+    writeln(count)
+end."""
+
+def loops(ast):
+    pending = [ast]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast_nodes.WhileStatement, ast_nodes.ForStatement)):
+            yield node
+        pending.extend(ast_nodes.iter_child_nodes(node))
+
+def test_invariant_expressions_are_computed_once_before_the_loop():
+    plain = generate_blocks(checked(PRIMES))
+    hoisted = generate_blocks(checked(PRIMES), optimize=True)
+    output, steps = run(hoisted, ["10"])
+    assert output == run(plain, ["10"])[0] == "25\n"
+    # limit * 10 leaves the outer loop, num div 2 the inner one (but not the outer, which changes num)
+    assert steps < run(plain, ["10"])[1]
+    assert check_stack(hoisted) == []
+    code = [i for block in hoisted for i in block.instructions]
+    outer_start = next(index for index, i in enumerate(code) if i.label and i.label.startswith("whilestart"))
+    assert [i.opcode for i in code[:outer_start]].count("MUL") == 1
+
+def test_hoisting_trades_code_size_for_executed_instructions():
+    ast = checked(PRIMES)
+    hoisted_count = sum(len(invariant_expressions(loop)) for loop in loops(ast))
+    plain, hoisted = ctx.CodeGenerator(), ctx.CodeGenerator(hoist_invariants=True)
+    node_visitors.visit(ast, plain)
+    node_visitors.visit(ast, hoisted)
+    # each expression adds a STOREL before its loop and a PUSHL in it, and one PUSHN reserves their slots
+    assert hoisted_count == 2
+    assert peephole.instruction_count(hoisted.blocks) == peephole.instruction_count(plain.blocks) + 2 * hoisted_count + 1
+    assert run(hoisted.blocks, ["10"])[1] < run(plain.blocks, ["10"])[1]
+
+def test_what_may_change_or_fail_is_not_hoisted():
+    ast = checked("""program Kept;
+var n, d, i, total: integer; s: string; a: array[1..3] of integer;
+procedure Bump(k: integer);
+begin
+    total := total + k
+end;
+begin
+    read(n); read(d); s := 'abc';
+    for i := 1 to 3 do total := total + n div d + a[n] + length(s) * 2 + i * n;
+    while n > 0 do begin n := n - 1; total := total + d * 2 end;
+    while d > 0 do begin d := d - 1; Bump(n * 2) end;
+    writeln(total)
+end.""")
+    found = {}
+    for loop in loops(ast):
+        key = loop.condition.left.name if isinstance(loop, ast_nodes.WhileStatement) else 'for'
+        found[key] = invariant_expressions(loop)
+    # a division by a variable may fail, a[n] may be out of range, i changes and Bump may change anything
+    (for_expression,) = found['for']
+    assert isinstance(for_expression.left, ast_nodes.FunctionCall) and for_expression.right.value == 2
+    (while_expression,) = found['n']
+    assert while_expression.left.name == 'd' and while_expression.operator == '*'
+    assert found['d'] == []
+
+def test_for_loops_keep_array_base_addresses_in_temporaries():
+    source_code = """program Shift;
+var a: array[1..5] of integer; i: integer;
+procedure Smooth(var v: array[1..5] of integer);
+var k: integer;
+begin
+    for k := 1 to 4 do v[k] := v[k] + v[k + 1]
+end;
+begin
+    for i := 1 to 5 do a[i] := i * i;
+    Smooth(a);
+    for i := 2 to 5 do a[i - 1] := a[i] - a[i - 1];
+    writeln(a[1], ' ', a[4], ' ', a[5])
+end."""
+    plain = generate_blocks(checked(source_code))
+    hoisted = generate_blocks(checked(source_code), optimize=True)
+    assert run(hoisted)[0] == run(plain)[0] == "8 -16 25\n"
+    assert run(hoisted)[1] < run(plain)[1] and check_stack(hoisted) == []
+    for block in hoisted:
+        code = block.instructions
+        labels = [index for index, i in enumerate(code) if i.label and i.label.startswith("forcheck")]
+        for start in labels:
+            end = next(index for index, i in enumerate(code) if index > start and i.opcode == "JUMP")
+            # every element is addressed from a temporary and the plain index, with no arithmetic on it
+            body = [i.opcode for i in code[start:end] if i.opcode]
+            assert "PADD" not in body and "PUSHGP" not in body
+            assert sum(1 for a, b in zip(body, body[1:]) if a == "PUSHI" and b in ("ADD", "SUB")) == 1 # the update of the control variable
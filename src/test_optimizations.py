@@ -0,0 +1,27 @@
+import pytest
+
+from constant_folding import fold_constants
+from dead_code import eliminate_dead_code
+from samples import SAMPLE_INPUTS, checked_sources, compile_blocks
+from vm_assembly import peephole
+from vm_assembly.simulator import run
+from vm_assembly.stack_check import check_stack
+
+# each optimization against the code it improves on: the compile_blocks options of both,
+# which may rewrite the checked tree or the generated blocks of the optimized code
+@pytest.mark.parametrize("plain_options, optimized_options", [
+    pytest.param({}, {"rewrite": fold_constants}, id="constant-folding"),
+    pytest.param({}, {"rewrite": eliminate_dead_code}, id="dead-code"),
+    pytest.param({}, {"rewrite_blocks": peephole.optimize}, id="peephole"),
+    pytest.param({}, {"short_circuit": True}, id="short-circuit"),
+    pytest.param({"optimize": True, "inline_budget": 0}, {"optimize": True}, id="inlining"),
+    pytest.param({}, {"optimize": True}, id="all"),
+])
+def test_optimized_output_equals_plain_output(plain_options, optimized_options):
+    for name, source_code in checked_sources():
+        plain_output, plain_steps = run(compile_blocks(source_code, **plain_options), SAMPLE_INPUTS.get(name, ()))
+        optimized = compile_blocks(source_code, **optimized_options)
+        output, steps = run(optimized, SAMPLE_INPUTS.get(name, ()))
+        assert output == plain_output, name
+        assert steps <= plain_steps, name
+        assert check_stack(optimized) == [], name
@@ -0,0 +1,80 @@
+import glob
+import io
+import os
+from contextlib import redirect_stdout
+
+import ast_nodes
+from session import CompilerSession
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+
+def assert_same_tree(expected, actual, path="root"):
+    """Compares two ASTs field by field, including line numbers and operator spellings."""
+    pending = [(expected, actual, path)]
+    while pending:
+        expected, actual, path = pending.pop()
+        assert type(expected) is type(actual), f"{path}: {type(expected).__name__} != {type(actual).__name__}"
+        if isinstance(expected, ast_nodes.ASTNode):
+            for field in ('lineno',) + expected._fields:
+                pending.append((getattr(expected, field), getattr(actual, field), f"{path}.{field}"))
+        elif isinstance(expected, (list, tuple)):
+            assert len(expected) == len(actual), f"{path}: {len(expected)} != {len(actual)} items"
+            for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+                pending.append((expected_item, actual_item, f"{path}[{i}]"))
+        else:
+            assert expected == actual, f"{path}: {expected!r} != {actual!r}"
+
+def parse_with(session, source_code):
+    output = io.StringIO()
+    with redirect_stdout(output):
+        ast = session.parse(source_code)
+    return ast, output.getvalue()
+
+def test_engines_build_the_same_ast_for_every_input():
+    lalr_session = CompilerSession(parser_engine="lalr")
+    rd_session = CompilerSession(parser_engine="rd")
+    paths = sorted(glob.glob(os.path.join(INPUT_DIR, "*.pas")))
+    assert paths
+    for path in paths:
+        with open(path) as f:
+            source_code = f.read()
+        lalr_ast, lalr_output = parse_with(lalr_session, source_code)
+        rd_ast, rd_output = parse_with(rd_session, source_code)
+        assert rd_output == lalr_output, path
+        assert_same_tree(lalr_ast, rd_ast, os.path.basename(path))
+
+def test_engines_agree_on_grammar_corner_cases():
+    source_code = """
+    program Corners(input, output);
+    var a, b: integer; c: array[1..3] of real;
+    procedure P(x: integer; var y: integer); begin y := -x[1] * 2 end;
+    begin
+        a := b + 1 - 2 * a div 3 mod 4 = 5 <> 6;
+        if not a and b orelse c andthen a then if a then b := 1 else b := 2;
+        while (a < b) do begin end;
+        for a := 10 downto 1 do P(a, b);
+        writeln(, a, 'x'); readln();
+        P(c[1][2], f());
+        c[a + 1] := c[1] * 2; (c)[2] := 0
+    end.
+    """
+    lalr_ast, _ = parse_with(CompilerSession(parser_engine="lalr"), source_code)
+    rd_ast, _ = parse_with(CompilerSession(parser_engine="rd"), source_code)
+    assert lalr_ast is not None
+    assert_same_tree(lalr_ast, rd_ast)
+
+def test_engines_report_the_same_syntax_errors():
+    broken_sources = [
+        "program P; begin x := 1 + end.",
+        "program P; var a integer; begin end.",
+        "program P; begin writeln('a') ",
+        "program P; begin -a[1] := 2 end.",
+        "program P; begin (a[1]) := 2 end.",
+    ]
+    lalr_session = CompilerSession(parser_engine="lalr")
+    rd_session = CompilerSession(parser_engine="rd")
+    for source_code in broken_sources:
+        lalr_ast, lalr_output = parse_with(lalr_session, source_code)
+        rd_ast, rd_output = parse_with(rd_session, source_code)
+        assert lalr_ast is None and rd_ast is None
+        assert rd_output.splitlines()[0] == lalr_output.splitlines()[0], source_code
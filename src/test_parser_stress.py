@@ -0,0 +1,40 @@
+import time
+
+from session import CompilerSession
+
+def generate_program(statement_count, variable_count):
+    """Builds a machine-generated style program with one huge begin ... end body."""
+    variable_names = [f"v{i}" for i in range(variable_count)]
+    lines = ["program Stress;", "var"]
+    lines.append("    " + ", ".join(variable_names) + ": integer;")
+    lines.append("begin")
+    for i in range(statement_count):
+        target = variable_names[i % variable_count]
+        source = variable_names[(i * 7 + 1) % variable_count]
+        lines.append(f"    {target} := {source} + {i};")
+    lines.append("    writeln(v0)")
+    lines.append("end.")
+    return "\n".join(lines)
+
+def timed_parse(session, source_code):
+    start = time.perf_counter()
+    ast = session.parse(source_code)
+    elapsed = time.perf_counter() - start
+    assert ast is not None
+    return ast, elapsed
+
+def test_huge_program_parses_in_linear_time():
+    session = CompilerSession()
+    small_source = generate_program(10_000, 1_000)
+    large_source = generate_program(100_000, 10_000)
+
+    timed_parse(session, small_source) # warm-up
+    _, small_time = timed_parse(session, small_source)
+    large_ast, large_time = timed_parse(session, large_source)
+
+    statements = large_ast.block.compound_statement.statement_list
+    assert len(statements) == 100_001
+    assert len(large_ast.block.declarations[0].variable_list[0].id_list) == 10_000
+
+    # 10x the input must cost roughly 10x the time, a quadratic build is ~100x
+    assert large_time < small_time * 30, f"parse time not linear: {small_time:.3f}s -> {large_time:.3f}s"
@@ -0,0 +1,38 @@
+from samples import checked_sources, compile_blocks
+from vm_assembly import peephole
+from vm_assembly.generation_context import Block, Instruction
+
+def block_of(*lines):
+    instructions = []
+    for line in lines:
+        if line.endswith(":"):
+            instructions.append(Instruction(label=line[:-1]))
+        else:
+            opcode, _, operand = line.partition(" ")
+            instructions.append(Instruction(opcode, int(operand) if operand.lstrip("-").isdigit() else operand or None))
+    return Block("test", instructions)
+
+def lines_of(block):
+    return [f"{i.label}:" if i.opcode is None else " ".join(str(part) for part in (i.opcode, i.operand) if part is not None)
+            for i in block.instructions]
+
+def test_rules_run_to_a_fixed_point():
+    block = block_of("PUSHI 2", "PUSHI 0", "SWAP", "SUB", "STOREG 0", "PUSHG 0", "WRITEI", "JUMP end", "end:", "STOP")
+    hits = peephole.optimize([block])
+    # 0 - 2 becomes 2 * -1 and is then folded
+    assert lines_of(block) == ["PUSHI -2", "DUP 1", "STOREG 0", "WRITEI", "end:", "STOP"]
+    assert hits == {"negate": 1, "fold_mul": 1, "store_reload_global": 1, "jump_to_next": 1}
+
+def test_rules_can_be_disabled_and_do_not_cross_labels():
+    block = block_of("STOREG 0", "PUSHG 0", "STOREL 1", "loop:", "PUSHL 1")
+    hits = peephole.optimize([block], enabled=["jump_to_next"])
+    assert not hits and lines_of(block)[:2] == ["STOREG 0", "PUSHG 0"]
+    hits = peephole.optimize([block])
+    assert hits == {"store_reload_global": 1} # STOREL 1 / PUSHL 1 are split by a jump target
+
+def test_peephole_never_grows_the_inputs():
+    # the output and the executed instructions are compared in test_optimizations
+    for name, source_code in checked_sources():
+        size = peephole.instruction_count(compile_blocks(source_code))
+        blocks = compile_blocks(source_code, rewrite_blocks=peephole.optimize)
+        assert peephole.instruction_count(blocks) <= size, name
@@ -0,0 +1,45 @@
+import glob
+import os
+
+from analex import build_lexer
+from session import CompilerSession
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+
+def token_stream(lexer, source_code):
+    lexer.lineno = 1
+    lexer.input(source_code)
+    tokens = []
+    for tok in iter(lexer.token, None):
+        value = tok.value
+        if tok.type in ('TRUE', 'FALSE'): # PLY keeps the spelling of lowercase booleans as the value
+            value = tok.type == 'TRUE'
+        tokens.append((tok.type, value, tok.lineno, tok.lexpos))
+    return tokens
+
+def test_scanner_matches_ply_lexer_on_inputs():
+    ply_lexer = build_lexer("ply")
+    scanner = build_lexer("scanner")
+    for path in sorted(glob.glob(os.path.join(INPUT_DIR, "*.pas"))):
+        with open(path) as f:
+            source_code = f.read()
+        assert token_stream(scanner, source_code) == token_stream(ply_lexer, source_code), path
+
+def test_scanner_keywords_are_case_insensitive_and_whole_words():
+    scanner = build_lexer("scanner")
+    types = [tok[0] for tok in token_stream(scanner, "Begin ENDING end BeginX writeLn")]
+    assert types == ['BEGIN', 'ID', 'END', 'ID', 'WRITELN']
+
+def test_scanner_skips_comments_and_counts_lines():
+    scanner = build_lexer("scanner")
+    tokens = token_stream(scanner, "a { one\ntwo } b (* three\nfour *) c 'x{y}'")
+    assert [(tok[0], tok[1], tok[2]) for tok in tokens] == [
+        ('ID', 'a', 1), ('ID', 'b', 2), ('ID', 'c', 3), ('STRING', 'x{y}', 3),
+    ]
+
+def test_parser_runs_unchanged_on_scanner_tokens():
+    ply_session = CompilerSession()
+    scanner_session = CompilerSession(lexer_backend="scanner")
+    with open(os.path.join(INPUT_DIR, "example7.pas")) as f:
+        source_code = f.read()
+    assert repr(scanner_session.parse(source_code)) == repr(ply_session.parse(source_code))
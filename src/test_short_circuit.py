@@ -0,0 +1,58 @@
+from samples import compile_blocks, opcodes
+from vm_assembly.simulator import run
+from vm_assembly.stack_check import check_stack
+
+GUARDED = """program Guarded;
+var d, calls: integer; ok: boolean;
+function Count: boolean;
+begin
+    calls := calls + 1;
+    Count := true
+end;
+begin
+    d := 0; calls := 0;
+    if (d <> 0) andthen (10 div d > 1) then writeln('big') else writeln('skipped');
+    ok := (d = 0) orelse (10 div d > 1);
+    writeln(ok);
+    while (d < 3) and Count() do d := d + 1;
+    if (d > 0) or (d > 1) then writeln(calls)
+end."""
+
+def test_andthen_and_orelse_skip_the_right_operand():
+    blocks = compile_blocks(GUARDED)
+    # 10 div 0 is never evaluated, in a condition or as a value; plain and calls Count on every check
+    assert run(blocks)[0] == "skipped\n1\n4\n"
+    assert opcodes(blocks).count("DIV") == 2
+    assert check_stack(blocks) == []
+
+def test_plain_and_or_short_circuit_only_when_asked_and_free_of_side_effects():
+    plain = opcodes(compile_blocks(GUARDED))
+    assert plain.count("AND") == 1 and plain.count("OR") == 1
+    blocks = compile_blocks(GUARDED, short_circuit=True)
+    short = opcodes(blocks)
+    # (d > 0) or (d > 1) becomes jumps, the and with a call to Count keeps evaluating both sides
+    assert short.count("AND") == 1 and short.count("OR") == 0
+    assert run(blocks)[0] == "skipped\n1\n4\n"
+
+def test_a_skipped_call_with_arguments_keeps_the_stack_balanced():
+    blocks = compile_blocks("""program Arguments;
+var d, calls: integer; ok: boolean;
+function Positive(k: integer): boolean;
+begin
+    calls := calls + 1;
+    Positive := k > 1
+end;
+begin
+    calls := 0;
+    for d := 0 to 3 do
+    begin
+        ok := (d > 0) andthen Positive(d);
+        write(ok);
+        ok := (d = 0) orelse Positive(d);
+        write(ok)
+    end;
+    writeln(' ', calls)
+end.""")
+    # both paths of the DUP/JZ/POP sequence reach the loop's next check with the same depth
+    assert run(blocks)[0] == "01001111 6\n"
+    assert check_stack(blocks) == []
@@ -0,0 +1,81 @@
+from samples import checked_sources, compile_blocks, instructions
+from test_peephole import block_of
+from vm_assembly.simulator import run
+from vm_assembly.stack_check import check_stack
+
+NESTED_LOOPS = """program Nested;
+var i, j, total: integer;
+procedure Grid(n: integer);
+var r, c: integer;
+begin
+    for r := 1 to n do
+        for c := 1 to n do
+            total := total + 1
+end;
+begin
+    total := 0;
+    for i := 1 to 3 do
+        for j := 1 to 4 do
+            total := total + i * j;
+    for i := 1 to 2 do
+        total := total + 1;
+    Grid(5);
+    writeln(total)
+end."""
+
+def test_temps_are_reserved_once_and_slots_are_reused():
+    blocks = compile_blocks(NESTED_LOOPS)
+    main, grid = instructions([blocks[0], blocks[2]]), instructions([blocks[1]])
+    # two nested loops need two slots, the third loop reuses the first one
+    assert main[main.index(("START", None)) + 1] == ("PUSHN", 2)
+    assert {operand for opcode, operand in main if opcode == "STOREL"} == {0, 1}
+    assert grid[:3] == [("PUSHI", 0), ("PUSHI", 0), ("PUSHN", 2)] # after the locals r and c
+    assert {operand for opcode, operand in grid if opcode == "STOREL"} == {0, 1, 2, 3}
+    assert check_stack(blocks) == []
+    assert run(blocks)[0] == "87\n"
+
+def test_unbalanced_loops_are_reported():
+    block = block_of("START", "loop:", "PUSHI 0", "PUSHI 1", "JZ end", "JUMP loop", "end:", "STOP")
+    [imbalance] = check_stack([block])
+    assert (imbalance.label, imbalance.depth, imbalance.other_depth) == ("loop", 0, 1)
+
+def test_generated_code_is_balanced():
+    # the optimized code is checked in test_optimizations
+    for name, source_code in checked_sources():
+        assert check_stack(compile_blocks(source_code)) == [], name
+
+def test_calls_leave_only_a_function_result():
+    # without -O, so the calls are not inlined: the element's address is pushed before Dbl(i)
+    blocks = compile_blocks("""program Calls;
+var a: array[1..3] of integer; i, n: integer;
+function Dbl(k: integer): integer;
+begin
+    Dbl := k * 2
+end;
+function Fact(k: integer): integer;
+var m: integer;
+begin
+    m := k;
+    if m <= 1 then Fact := 1 else Fact := m * Fact(m - 1)
+end;
+function Three: integer;
+begin
+    Three := 3
+end;
+procedure Show(k: integer; var total: integer);
+var doubled: integer;
+begin
+    doubled := Dbl(k);
+    total := total + doubled
+end;
+begin
+    n := 0;
+    for i := 1 to 3 do
+    begin
+        a[i] := Dbl(i);
+        Show(a[i], n)
+    end;
+    writeln(a[1], ' ', a[2], ' ', a[3], ' ', n, ' ', Fact(Three()) + Dbl(1))
+end.""")
+    assert run(blocks)[0] == "2 4 6 24 8\n"
+    assert check_stack(blocks) == []
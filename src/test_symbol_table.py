@@ -0,0 +1,85 @@
+import pytest
+
+from analex import build_lexer, name_key
+from anasem import Symbol, SymbolTable
+from session import CompilerSession
+
+def variable(name, scope):
+    return Symbol(name, 'INTEGER', 'variable', scope.get_local_var_offset(), scope_level=scope.scope_level)
+
+def test_resolve_is_case_insensitive_and_scoped():
+    global_scope = SymbolTable()
+    total = variable('Total', global_scope)
+    global_scope.define(total)
+
+    local_scope = SymbolTable(parent=global_scope, scope_name='f')
+    shadowing = variable('total', local_scope)
+    local_scope.define(shadowing)
+    late = variable('Late', global_scope)
+    global_scope.define(late) # defined after the local scope was opened
+
+    assert global_scope.resolve('TOTAL') is total
+    assert local_scope.resolve('Total') is shadowing
+    assert local_scope.resolve('late') is late
+    assert local_scope.resolve('missing') is None
+    assert not hasattr(total, '__dict__')
+
+def test_lexers_intern_identifiers():
+    for backend in ('ply', 'scanner'):
+        lexer = build_lexer(backend)
+        lexer.input("Counter counter COUNTER")
+        names = [token.value for token in iter(lexer.token, None)]
+        assert names[0] is not names[1]
+        assert name_key(names[0], lexer.name_keys) is name_key(names[1], lexer.name_keys)
+        assert name_key(names[1], lexer.name_keys) is name_key(names[2], lexer.name_keys)
+
+def test_sessions_keep_their_own_name_keys():
+    first, second = CompilerSession(), CompilerSession(lexer_backend="scanner")
+    first.check(first.parse("program OnlyHere; var Seen: integer; begin Seen := 1 end."))
+    assert first.lexer.name_keys["Seen"] == "seen"
+    assert first.builtins_scope.name_keys is first.lexer.name_keys
+    assert "Seen" not in second.lexer.name_keys and "Seen" not in second.builtins_scope.name_keys
+
+def test_mixed_case_names_compile():
+    source_code = """program Cases;
+var Amount: integer;
+function Twice(Value: integer): integer;
+begin
+    twice := VALUE * 2
+end;
+begin
+    AMOUNT := twice(21);
+    writeln(amount)
+end."""
+    code = CompilerSession().compile(source_code)
+    assert "    STOREG 0 // Store to global variable 'AMOUNT'" in code
+    assert "    PUSHA funcTwice1 // Push address of twice" in code # labels keep the declared spelling
+
+def test_codegen_reads_the_checked_scopes():
+    source_code = """program Shadow;
+function Soma(a: integer; b: integer): integer;
+var Valor: integer;
+begin
+    Valor := a + b;
+    Soma := Valor
+end;
+var Valor: integer; Tabela: array[1..3] of integer;
+begin
+    Valor := Soma(1, 2);
+    writeln(Valor)
+end."""
+    session = CompilerSession()
+    ast = session.parse(source_code)
+    global_scope = session.check(ast)
+    function = ast.block.declarations[0]
+    assert ast.scope is global_scope and function.scope.parent is global_scope
+    assert global_scope.resolve('tabela').address_or_offset == 1
+    assert global_scope.resolve('tabela').array_element_count == 3
+    assert [param.address_or_offset for param in function.symbol.params_info] == [-2, -1]
+    assert function.scope.resolve('valor').address_or_offset == 0 # a local of its own, not the global
+    with pytest.raises(Exception, match="frozen"):
+        function.scope.define(Symbol('late', 'INTEGER', 'variable', 1))
+
+    code = session.generate(ast)
+    assert "    STOREL 0 // Store to local/value_param 'Valor'" in code
+    assert "    STOREG 0 // Store to global variable 'Valor'" in code
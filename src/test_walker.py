@@ -0,0 +1,54 @@
+import pytest
+
+import ast_nodes
+from walker import trampoline, Dispatcher
+
+def test_trampoline_returns_child_results_and_propagates_errors():
+    def depth(n):
+        if n == 0:
+            return 0 # plain values are sent straight back
+        return (yield depth(n - 1)) + 1
+
+    def failing(n):
+        if n == 0:
+            raise ValueError("bottom")
+        try:
+            yield failing(n - 1)
+        except ValueError as e:
+            raise ValueError(f"{e} <- {n}")
+
+    assert trampoline(depth(100_000)) == 100_000
+    assert trampoline(depth(0)) == 0
+    with pytest.raises(ValueError, match="bottom <- 1 <- 2 <- 3"):
+        trampoline(failing(3))
+
+def test_dispatcher_uses_nearest_registered_base_class():
+    dispatch = Dispatcher(fallback=lambda node: "fallback")
+
+    @dispatch.register(ast_nodes.Expression)
+    def expression(node):
+        return "expression"
+
+    @dispatch.register(ast_nodes.Literal, ast_nodes.Identifier)
+    def leaf(node):
+        return "leaf"
+
+    assert dispatch(ast_nodes.Literal(1)) == "leaf"
+    assert dispatch(ast_nodes.Identifier("a")) == "leaf"
+    assert dispatch(ast_nodes.BinaryOperation(ast_nodes.Literal(1), '+', ast_nodes.Literal(2))) == "expression"
+    assert dispatch(ast_nodes.CompoundStatement([])) == "fallback"
+
+def test_child_fields_are_node_fields():
+    node_classes = [cls for cls in vars(ast_nodes).values() if isinstance(cls, type) and issubclass(cls, ast_nodes.ASTNode)]
+    for node_class in node_classes:
+        assert set(node_class._child_fields) <= set(node_class._fields), node_class.__name__
+
+def test_iter_child_nodes_in_field_order():
+    condition = ast_nodes.Identifier("flag")
+    then_statement = ast_nodes.CompoundStatement([])
+    node = ast_nodes.IfStatement(condition, then_statement)
+    assert list(ast_nodes.iter_child_nodes(node)) == [condition, then_statement]
+
+    arguments = [ast_nodes.Literal(1), ast_nodes.Identifier("a")]
+    call = ast_nodes.FunctionCall("f", tuple(arguments))
+    assert list(ast_nodes.iter_child_nodes(call)) == arguments
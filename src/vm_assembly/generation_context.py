@@ -1,66 +1,217 @@
-from anasem import SymbolTable
-
-# --- Global-like state for code generation ---
-code = []  # List to hold generated VM code
-label_count = 0  # Counter for unique label generation
-current_scope = None # Initialized by the main generator
-globals_handled_pre_start = set()  # To track globals processed before START
-temp_var_count = 0 # Counter for temporary variable offsets (though new_temp_var_offset uses scope)
-
-def reset_context():
-    """Resets all shared generation state."""
-    global code, label_count, current_scope, globals_handled_pre_start, temp_var_count
-    code.clear()
-    label_count = 0
-    current_scope = None # Will be re-initialized by the main generator
-    globals_handled_pre_start.clear()
-    temp_var_count = 0 # Reset if used directly, though new_temp_var_offset relies on scope
-
-# --- Core functions to manipulate state ---
-def emit(instruction, comment=None):
-    """Emits a VM instruction with an optional comment."""
-    global code
-    indent = "    "
-    if comment:
-        code.append(f"{indent}{instruction} // {comment}")
-    else:
-        code.append(f"{indent}{instruction}")
-
-def emit_label(label):
-    """Emits a label for jumps."""
-    global code
-    code.append(f"{label}:")
-
-def new_label(prefix="L"):
-    """Generates a new unique label."""
-    global label_count
-    label_count += 1
-    return f"{prefix}{label_count - 1}"
-
-def push_scope(scope_name="local"):
-    """Pushes a new scope onto the stack."""
-    global current_scope
-    if current_scope is None:
-        raise Exception("Cannot push_scope: current_scope is not initialized.")
-    new_scope = SymbolTable(parent=current_scope, scope_name=scope_name)
-    current_scope = new_scope
-
-def pop_scope():
-    """Pops the current scope, returning to the parent scope."""
-    global current_scope
-    if current_scope is None:
-        raise Exception("Cannot pop_scope: current_scope is not initialized.")
-    if current_scope.parent:
-        # Ensure we don't pop past the main global scope established after builtins
-        if current_scope.parent.scope_name == "global_init_phase": # Special name for the pre-global scope
-            # If the parent is the 'global_init_phase', it means the current scope is 'global'.
-            # Popping 'global' should ideally not happen or be handled carefully.
-            # For simplicity, we allow popping back to 'global_init_phase' if it's the direct parent.
-            # The main generator logic should prevent popping beyond the true 'global' scope during execution.
-            current_scope = current_scope.parent
-        elif current_scope.parent is not None: # General case
-            current_scope = current_scope.parent
-        else:
-            print("Warning: Attempting to pop beyond the initial scope.") # Should not happen
-    else:
-        print("Warning: Popping global scope (or uninitialized scope).")
\ No newline at end of file
+# --- Instruction IR ---
+# Code is generated as Instruction records grouped into Blocks and only rendered to text
+# at the end, so later passes can work on opcodes and operands instead of parsing lines.
+
+class Instruction:
+    """
+    One line of VM code: an instruction (opcode and optional operand), a label definition
+    (label set, no opcode) or a comment line (neither opcode nor label).
+    """
+    __slots__ = ('opcode', 'operand', 'label', 'comment')
+
+    def __init__(self, opcode=None, operand=None, label=None, comment=None):
+        self.opcode = opcode
+        self.operand = operand
+        self.label = label
+        self.comment = comment
+
+    def __repr__(self):
+        return f"Instruction({self.opcode!r}, {self.operand!r}, label={self.label!r}, comment={self.comment!r})"
+
+class Block:
+    """
+    The instructions of one routine (or of the main program), in emission order. A routine's
+    code continues in a new block after each nested routine emitted inside it.
+    """
+    __slots__ = ('name', 'instructions')
+
+    def __init__(self, name, instructions=None):
+        self.name = name
+        self.instructions = [] if instructions is None else instructions
+
+    def __repr__(self):
+        return f"Block({self.name!r}, {len(self.instructions)} instructions)"
+
+# --- Generation state ---
+class TempSlots:
+    """
+    The frame slots for temporaries of the routine being generated. They sit after the
+    declared locals (from FP+0 in the main program, whose globals are below FP) and are
+    reserved once, by a PUSHN in the routine's prologue, so the body only stores and
+    loads them. A slot is taken for the lifetime of one temporary and handed out again
+    once it is released, so temporaries that are never live at the same time share it.
+    """
+    __slots__ = ('base', 'in_use', 'count', 'prologue')
+
+    def __init__(self, base):
+        self.base = base # frame offset of the first slot
+        self.in_use = 0 # slots taken by live temporaries
+        self.count = 0 # slots the routine needs (most ever live at once)
+        self.prologue = None # (instruction list, index) where the PUSHN goes
+
+class CodeGenerator:
+    """
+    The state of one code generation, passed to every visitor. Each compilation uses its
+    own CodeGenerator, so several programs can be generated at once from different threads.
+    """
+
+    def __init__(self, short_circuit=False, hoist_invariants=False):
+        self.short_circuit = short_circuit # Plain and/or also skip a right operand without side effects
+        self.hoist_invariants = hoist_invariants # Loop-invariant expressions are computed once, before the loop
+        self.invariants = {} # Temp slot holding each hoisted expression, keyed by the id of its node
+        self.array_bases = {} # Temp slot holding an array's base address in a for loop, keyed by (Symbol, shift)
+        self.blocks = [] # Blocks of the program being generated, in layout order
+        self.code = [] # Instructions of the current block
+        self.label_count = 0 # Counter for unique label generation
+        self.current_scope = None # Frozen SymbolTable (from the semantic check) of the routine being generated
+        self.temps = None # TempSlots of the routine being generated
+        self.temps_stack = [] # TempSlots of the enclosing routines
+        self.routine_labels = {} # Label of each user routine, keyed by its Symbol
+        self.result_offsets = {} # Frame slot holding each user function's result, keyed by its Symbol
+
+    def begin_block(self, name):
+        """Starts a new block; the following instructions are emitted into it."""
+        block = Block(name)
+        self.blocks.append(block)
+        self.code = block.instructions
+
+    def emit(self, opcode, operand=None, comment=None):
+        """Emits a VM instruction with an optional operand and comment."""
+        self.code.append(Instruction(opcode, operand, None, comment))
+
+    def emit_label(self, label):
+        """Emits a label for jumps."""
+        self.code.append(Instruction(label=label))
+
+    def emit_comment(self, comment):
+        """Emits a comment line (e.g. where a parameter sits in the frame)."""
+        self.code.append(Instruction(comment=comment))
+
+    def new_label(self, prefix="L"):
+        """Generates a new unique label."""
+        self.label_count += 1
+        return f"{prefix}{self.label_count - 1}"
+
+    def push_scope(self, scope):
+        """Enters a scope built by the semantic check (the global scope or a routine's local one)."""
+        self.temps_stack.append(self.temps)
+        self.current_scope = scope
+        self.temps = TempSlots(scope.current_local_offset if scope.scope_level > 0 else 0)
+        self.begin_block(scope.scope_name)
+
+    def pop_scope(self):
+        """Returns to the enclosing scope."""
+        if self.current_scope is None:
+            raise Exception("Cannot pop_scope: current_scope is not initialized.")
+        self.reserve_temps()
+        self.current_scope = self.current_scope.parent
+        self.temps = self.temps_stack.pop()
+        if self.temps_stack: # back in the enclosing routine, whose code continues in a new block
+            self.begin_block(self.current_scope.scope_name)
+
+    def mark_prologue(self):
+        """Marks the end of the current routine's prologue, where its temporaries are reserved."""
+        self.temps.prologue = (self.code, len(self.code))
+
+    def reserve_temps(self):
+        # the routine is complete, so the number of slots it needs is known
+        temps = self.temps
+        if temps.count and temps.prologue is not None:
+            code, index = temps.prologue
+            slots = f"FP+{temps.base}" if temps.count == 1 else f"FP+{temps.base}..FP+{temps.base + temps.count - 1}"
+            code.insert(index, Instruction("PUSHN", temps.count, comment=f"Reserve temp slots at {slots}"))
+
+    def new_temp_offset(self):
+        """Takes a frame slot for a temporary of the current routine until release_temp_offset."""
+        temps = self.temps
+        offset = temps.base + temps.in_use
+        temps.in_use += 1
+        temps.count = max(temps.count, temps.in_use)
+        return offset
+
+    def release_temp_offset(self, offset):
+        """Hands a temporary's slot back; temporaries are released in the reverse order they were taken."""
+        temps = self.temps
+        if offset != temps.base + temps.in_use - 1:
+            raise Exception(f"Temp slot FP+{offset} is released out of order.")
+        temps.in_use -= 1
+
+# --- Rendering ---
+def render_operand(opcode, operand):
+    if opcode == "PUSHS":
+        escaped_value = operand.replace('"', '\\"') # Basic escaping for quotes in string
+        return f'"{escaped_value}"'
+    return str(operand)
+
+def render_instruction(instruction):
+    """Renders one Instruction as a line of the annotated .vm format."""
+    if instruction.opcode is None:
+        if instruction.label is not None:
+            return f"{instruction.label}:"
+        return f"    // {instruction.comment}"
+    text = instruction.opcode
+    if instruction.operand is not None:
+        text = f"{text} {render_operand(text, instruction.operand)}"
+    if instruction.comment:
+        return f"    {text} // {instruction.comment}"
+    return f"    {text}"
+
+# opcodes whose operand is a label
+LABEL_OPCODES = frozenset(("JUMP", "JZ", "PUSHA"))
+
+def render_compact_instruction(instruction, short_labels):
+    """
+    Renders one Instruction for the compact .vm format: no comments, no indentation and
+    labels renamed to short ids (short_labels maps each label to its id as it is met).
+    Comment lines render as None.
+    """
+    if instruction.opcode is None:
+        if instruction.label is None:
+            return None
+        return f"{short_label(instruction.label, short_labels)}:"
+    if instruction.operand is None:
+        return instruction.opcode
+    if instruction.opcode in LABEL_OPCODES:
+        return f"{instruction.opcode} {short_label(instruction.operand, short_labels)}"
+    return f"{instruction.opcode} {render_operand(instruction.opcode, instruction.operand)}"
+
+def short_label(label, short_labels):
+    short = short_labels.get(label)
+    if short is None:
+        short = short_labels[label] = f"L{len(short_labels)}"
+    return short
+
+def iter_lines(program_blocks, compact=False):
+    """
+    Renders the blocks of a program lazily, one line of its .vm file at a time, in the
+    annotated format or, when compact is set, in the compact one.
+    """
+    if compact:
+        short_labels = {}
+        for block in program_blocks:
+            for instruction in block.instructions:
+                line = render_compact_instruction(instruction, short_labels)
+                if line is not None:
+                    yield line
+        return
+    for block in program_blocks:
+        for instruction in block.instructions:
+            yield render_instruction(instruction)
+
+def render(program_blocks, compact=False):
+    """Renders the blocks of a program as the lines of its .vm file."""
+    return list(iter_lines(program_blocks, compact))
+
+def write(program_blocks, out, echo=None, compact=False):
+    """
+    Streams the rendered program to the text file out, also echoing it to echo when
+    given, without building the whole text first. Returns the number of lines written.
+    """
+    line_count = 0
+    for line in iter_lines(program_blocks, compact):
+        line = f"{line}\n"
+        out.write(line)
+        if echo is not None:
+            echo.write(line)
+        line_count += 1
+    return line_count
@@ -1,33 +1,58 @@
 import ast_nodes # Keep if generate() takes an ASTNode directly
-from anasem import SymbolTable, register_builtin_functions # For initializing scope
+from anasem import SymbolTable, register_builtin_functions, semantic_check # For checking unchecked programs
+from constant_folding import fold_constants
+from dead_code import eliminate_dead_code
+from inliner import INLINE_BUDGET, inline_calls
 
 # MODIFIED: Use relative imports for modules within the same package
-from . import generation_context as ctx # For accessing shared state and functions
+from . import generation_context as ctx # CodeGenerator and the rendering of its blocks
 from . import node_visitors # For the visit function
+from . import peephole
 # type_helpers is used by node_visitors, so direct import here might not be needed unless used otherwise
 
-def reset_and_initialize_generator_state():
-    """Resets and initializes the generator's context and symbol table."""
-    ctx.reset_context() # Reset all variables in generation_context
-
-    # Initialize current_scope and register built-ins
-    # Create the initial phase scope for built-ins
-    init_phase_scope = SymbolTable(scope_name="global_init_phase") # Removed scope_level argument
-    register_builtin_functions(init_phase_scope)
-    
-    # Create the main global scope, parented by the init_phase_scope
-    # Note: main_global_scope.scope_level will be 1 with current SymbolTable logic
-    main_global_scope = SymbolTable(parent=init_phase_scope, scope_name="global") # Removed scope_level argument
-    
-    ctx.current_scope = main_global_scope # Set the active scope in the context
-
-def generate(node: ast_nodes.ASTNode):
+def generate(node: ast_nodes.ASTNode, builtins_scope=None, compact=False, optimize=False, short_circuit=False,
+             inline_budget=INLINE_BUDGET):
     """
     Generates VM code for the given AST node.
+    The code is generated from the symbols and frozen scopes the semantic check left on
+    the tree; a program that was not checked yet is checked first, on top of
+    builtins_scope (or of a fresh builtins scope). compact selects the comment-free format,
+    optimize runs the optimization passes and short_circuit lets plain and/or skip a right
+    operand without side effects, as andthen/orelse always do. inline_budget is the
+    largest routine body (in AST nodes) optimize inlines, 0 to inline none.
+    """
+    return ctx.render(generate_blocks(node, builtins_scope, optimize, short_circuit, inline_budget), compact)
+
+def generate_blocks(node: ast_nodes.ASTNode, builtins_scope=None, optimize=False, short_circuit=False,
+                    inline_budget=INLINE_BUDGET):
+    """
+    Generates the code of the given AST node as instruction Blocks, without rendering it.
+    With optimize, the constants of the tree are folded, the calls to small routines
+    inlined and its dead code removed in place before the code is generated, the loop-invariant expressions are computed
+    before their loops, and the peephole rules and the removal of unreachable
+    instructions are run over the blocks.
     """
-    reset_and_initialize_generator_state()
+    if isinstance(node, ast_nodes.Program) and node.scope is None:
+        if builtins_scope is None:
+            builtins_scope = SymbolTable(scope_name="global_init_phase")
+            register_builtin_functions(builtins_scope)
+        semantic_check(node, SymbolTable(parent=builtins_scope, scope_name="global"))
+
+    if optimize:
+        fold_constants(node)
+        if isinstance(node, ast_nodes.Program): # the call graph starts at the main program
+            inline_calls(node, inline_budget)
+            eliminate_dead_code(node)
+
+    generator = ctx.CodeGenerator(short_circuit, hoist_invariants=optimize) # All the state of this generation
     
     # Start visiting from the root node
-    node_visitors.visit(node)
+    node_visitors.visit(node, generator)
+
+    if optimize:
+        # each pass can expose work for the other (a jump to the next line once the code
+        # in between is gone, a label left unused by a dropped jump)
+        while peephole.optimize(generator.blocks) + peephole.remove_dead_code(generator.blocks):
+            pass
     
-    return list(ctx.code) # Return a copy of the generated code
\ No newline at end of file
+    return generator.blocks
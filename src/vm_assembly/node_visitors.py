@@ -1,78 +1,62 @@
 import ast_nodes
-from anasem import Symbol # SymbolTable is not directly used here, but Symbol is
-# MODIFIED: Use relative import for generation_context
-from . import generation_context as ctx # Alias for brevity
+from loop_invariants import invariant_expressions
 from . import type_helpers as th
+from walker import trampoline, Dispatcher
 
-# Visitor dispatcher
-_visitors = {}
+def visit(node, ctx):
+    """Generates the code of node into ctx, the CodeGenerator of this compilation."""
+    return trampoline(_visit(node, ctx))
 
-def visit(node):
+# Visitors that have children are generators: they visit a child with `yield _visit(child, ctx)`,
+# which runs it on the trampoline's explicit stack (see walker.py) and sends back its result.
+def _visit(node, ctx):
     if node is None:
-        return
-    method_name = f'visit_{type(node).__name__}'
-    visitor = _visitors.get(method_name, generic_visit)
-    return visitor(node)
+        return None
+    if ctx.invariants and id(node) in ctx.invariants:
+        ctx.emit("PUSHL", ctx.invariants[id(node)], "Load loop-invariant value")
+        return None
+    return _visitors(node, ctx)
 
-def generic_visit(node):
+def generic_visit(node, ctx):
     print(f"Warning: No visitor method for {type(node).__name__}")
-    if hasattr(node, '__dict__'):
-        for _, value in node.__dict__.items():
-            if isinstance(value, list):
-                for item in value:
-                    if hasattr(item, '__class__') and isinstance(item, ast_nodes.ASTNode): # Check if it's an ASTNode
-                        visit(item)
-            elif hasattr(value, '__class__') and isinstance(value, ast_nodes.ASTNode): # Check if it's an ASTNode
-                visit(value)
+    if isinstance(node, ast_nodes.ASTNode):
+        for child in ast_nodes.iter_child_nodes(node):
+            yield _visit(child, ctx)
+
+# Visitor dispatcher, keyed by node class
+_visitors = Dispatcher(fallback=generic_visit)
 
 # Helper to register visitor methods
-def register_visitor(node_type_name):
-    def decorator(func):
-        _visitors[f'visit_{node_type_name}'] = func
-        return func
-    return decorator
-
-# Generates a new temporary variable offset
-def new_temp_var_offset():
-    offset = ctx.current_scope.get_local_var_offset()
-    ctx.emit(f"PUSHI 0", f"Allocate temp var at FP+{offset}")
-    return offset
-
-@register_visitor("Program")
-def visit_Program(node):
-    if node.block and node.block.declarations:
-        for decl in node.block.declarations:
-            if isinstance(decl, ast_nodes.VariableDeclaration):
-                for var_info in decl.variable_list:
-                    var_type_for_symbol_str = th.type_node_to_string(var_info.var_type)
-                    is_array_type, array_size, lower_bound, actual_element_type_str = th.process_array_type(var_info.var_type)
-                    for var_id_str in var_info.id_list:
-                        offset = ctx.current_scope.get_local_var_offset(count=array_size)
-                        sym = Symbol(var_id_str,
-                                    var_type_for_symbol_str,
-                                    'variable',
-                                    offset,
-                                    scope_level=0,
-                                    is_array=is_array_type,
-                                    array_lower_bound=lower_bound if is_array_type else None,
-                                    array_element_count=array_size if is_array_type else None,
-                                    element_type=actual_element_type_str if is_array_type else None)
-                        ctx.current_scope.define(sym)
-                        ctx.globals_handled_pre_start.add(var_id_str)
-                        if is_array_type:
-                            ctx.emit(f"PUSHN {array_size}", f"Reserve space for global array '{var_id_str}' (gp[{offset}..])")
-                        else:
-                            ctx.emit(f"PUSHI 0", f"Initial stack value for global '{var_id_str}' (gp[{offset}])")
-    ctx.emit("START", "Initialize Frame Pointer = Stack Pointer")
-    visit(node.block)
-    ctx.emit("STOP", "End of program")
-
-@register_visitor("ProgramHeader")
-def visit_ProgramHeader(node):
+register_visitor = _visitors.register
+
+# The symbols, offsets and scopes all come from the semantic check (Program.scope and the
+# annotations on declarations and names); the visitors only read them.
+@register_visitor(ast_nodes.Program)
+def visit_Program(node, ctx):
+    ctx.push_scope(node.scope)
+    # Globals are allocated before START, so they sit at gp[offset]
+    for decl in node.block.declarations:
+        if isinstance(decl, ast_nodes.VariableDeclaration):
+            for var_info in decl.variable_list:
+                for var_id_str in var_info.id_list:
+                    sym = node.scope.resolve(var_id_str)
+                    offset = sym.address_or_offset
+                    if sym.is_array:
+                        ctx.emit("PUSHN", sym.array_element_count, f"Reserve space for global array '{var_id_str}' (gp[{offset}..])")
+                    else:
+                        ctx.emit("PUSHI", 0, f"Initial stack value for global '{var_id_str}' (gp[{offset}])")
+    ctx.emit("START", comment="Initialize Frame Pointer = Stack Pointer")
+    ctx.mark_prologue() # the temporaries of the main program are reserved right after START
+    yield _visit(node.block, ctx)
+    ctx.emit("STOP", comment="End of program")
+    ctx.pop_scope()
+
+@register_visitor(ast_nodes.ProgramHeader)
+def visit_ProgramHeader(node, ctx):
     pass
 
-@register_visitor("Block")
-def visit_Block(node):
+@register_visitor(ast_nodes.Block)
+def visit_Block(node, ctx):
     function_procedure_nodes = []
     declarations_for_this_block_pass = []
     if node.declarations:
@@ -82,236 +66,463 @@ def visit_Block(node):
             else:
                 declarations_for_this_block_pass.append(decl)
     for decl_node in declarations_for_this_block_pass:
-        visit(decl_node)
+        yield _visit(decl_node, ctx)
     main_code_label = None
     if function_procedure_nodes:
         main_code_label = ctx.new_label("mainLabel")
-        ctx.emit(f"JUMP {main_code_label}", "Jump over nested function/proc definitions")
+        ctx.emit("JUMP", main_code_label, "Jump over nested function/proc definitions")
     for fp_node in function_procedure_nodes:
-        visit(fp_node)
+        yield _visit(fp_node, ctx)
     if main_code_label:
         ctx.emit_label(main_code_label)
     if node.compound_statement:
-        visit(node.compound_statement)
+        yield _visit(node.compound_statement, ctx)
 
-@register_visitor("VariableDeclaration")
-def visit_VariableDeclaration(node):
+@register_visitor(ast_nodes.VariableDeclaration)
+def visit_VariableDeclaration(node, ctx):
+    if ctx.current_scope.scope_level == 0:
+        return # Globals were already allocated by visit_Program
     for var_info in node.variable_list:
-        var_type_for_symbol_str = th.type_node_to_string(var_info.var_type)
-        is_array_type, array_size, lower_bound, actual_element_type_str = th.process_array_type(var_info.var_type)
         for var_id_str in var_info.id_list:
-            if var_id_str in ctx.globals_handled_pre_start:
-                continue
-            if ctx.current_scope.parent is None or ctx.current_scope.parent.scope_name == "global_init_phase":
-                offset = ctx.current_scope.get_local_var_offset(count=array_size)
-                sym_check = ctx.current_scope.resolve(var_id_str)
-                if not sym_check: # Define only if not somehow already defined (e.g. forward decl)
-                    sym = Symbol(var_id_str,
-                                var_type_for_symbol_str,
-                                'variable',
-                                offset,
-                                scope_level=0,
-                                is_array=is_array_type,
-                                array_lower_bound=lower_bound if is_array_type else None,
-                                array_element_count=array_size if is_array_type else None,
-                                element_type=actual_element_type_str if is_array_type else None)
-                    ctx.current_scope.define(sym)
-                if is_array_type:
-                    ctx.emit(f"// Global array '{var_id_str}' (gp[{offset}..]) defined (post-START init)", "")
-                    ctx.emit(f"// Warning: Post-START global array declaration for {var_id_str} - review allocation")
-                else:
-                    ctx.emit(f"PUSHI 0", f"Default value for global '{var_id_str}'")
-                    ctx.emit(f"STOREG {offset}", f"Initialize global '{var_id_str}' to 0")
-            else: # Local variable
-                offset = ctx.current_scope.get_local_var_offset(count=array_size)
-                sym = Symbol(var_id_str,
-                            var_type_for_symbol_str,
-                            'variable',
-                            offset,
-                            scope_level=ctx.current_scope.scope_level, # Use dynamic scope level
-                            is_array=is_array_type,
-                            array_lower_bound=lower_bound if is_array_type else None,
-                            array_element_count=array_size if is_array_type else None,
-                            element_type=actual_element_type_str if is_array_type else None)
-                ctx.current_scope.define(sym)
-                if is_array_type:
-                    ctx.emit(f"PUSHN {array_size}", f"Allocate {array_size} slots for local array '{var_id_str}' at FP+{offset}")
-                else:
-                    ctx.emit(f"PUSHI 0", f"Allocate space for local var '{var_id_str}' at FP+{offset}")
-
-@register_visitor("FunctionDeclaration")
-def visit_FunctionDeclaration(node):
-    func_label = ctx.new_label(f"func{node.name}")
-    return_type_str = th.type_node_to_string(node.return_type) if node.return_type else "VOID"
-    param_symbols_for_signature = []
-    if node.parameter_list:
-        for param_group in node.parameter_list:
-            param_type_str = th.type_node_to_string(param_group.param_type)
-            for pid in param_group.id_list:
-                param_symbols_for_signature.append(
-                    Symbol(pid, param_type_str, 'parameter', 0, is_var_param=param_group.is_var)
-                )
-    func_sym = Symbol(node.name, return_type_str, 'function', func_label,
-                        params_info=param_symbols_for_signature, return_type=return_type_str)
-    ctx.current_scope.define(func_sym)
-    ctx.emit_label(func_label)
-    ctx.push_scope(scope_name=f"func_{node.name}")
-    if node.parameter_list:
-        for param_group in reversed(node.parameter_list): # Process in reverse for correct offset calculation
-            param_type_str = th.type_node_to_string(param_group.param_type)
-            for param_id_str in reversed(param_group.id_list):
-                offset = ctx.current_scope.get_param_offset()
-                param_sym = Symbol(param_id_str, param_type_str, 'parameter', offset,
-                                    scope_level=ctx.current_scope.scope_level, is_var_param=param_group.is_var)
-                ctx.current_scope.define(param_sym)
-                ctx.emit(f"// Param '{param_id_str}' at FP{offset}", "")
-    # Allocate space for local variables by visiting their declarations
-    if node.block and node.block.declarations:
-        for decl in node.block.declarations:
-            if isinstance(decl, ast_nodes.VariableDeclaration):
-                visit(decl) # This will emit PUSHN/PUSHI for locals
-    if node.block:
-        visit(node.block.compound_statement) # Visit the function body
-
-    # Handle return value 
-    ctx.emit("RETURN", f"Return from function {node.name}")
-    ctx.pop_scope()
+            sym = ctx.current_scope.resolve(var_id_str)
+            offset = sym.address_or_offset
+            if sym.is_array:
+                ctx.emit("PUSHN", sym.array_element_count, f"Allocate {sym.array_element_count} slots for local array '{var_id_str}' at FP+{offset}")
+            else:
+                ctx.emit("PUSHI", 0, f"Allocate space for local var '{var_id_str}' at FP+{offset}")
 
-@register_visitor("ProcedureDeclaration")
-def visit_ProcedureDeclaration(node):
-    proc_label = ctx.new_label(f"proc{node.name}")
-    param_symbols_for_signature = []
-    if node.parameter_list:
-        for param_group in node.parameter_list:
-            param_type_str = th.type_node_to_string(param_group.param_type)
-            for pid in param_group.id_list:
-                param_symbols_for_signature.append(
-                    Symbol(pid, param_type_str, 'parameter', 0, is_var_param=param_group.is_var)
-                )
-    proc_sym = Symbol(node.name, "VOID", 'procedure', proc_label, params_info=param_symbols_for_signature)
-    ctx.current_scope.define(proc_sym)
-    ctx.emit_label(proc_label)
-    ctx.push_scope(scope_name=f"proc_{node.name}")
+def visit_routine(node, ctx, label, kind_display):
+    ctx.routine_labels[node.symbol] = label
+    ctx.push_scope(node.scope) # starts the routine's block
+    ctx.emit_label(label)
     if node.parameter_list:
         for param_group in reversed(node.parameter_list):
-            param_type_str = th.type_node_to_string(param_group.param_type)
             for param_id_str in reversed(param_group.id_list):
-                offset = ctx.current_scope.get_param_offset()
-                param_sym = Symbol(param_id_str, param_type_str, 'parameter', offset,
-                                    scope_level=ctx.current_scope.scope_level, is_var_param=param_group.is_var)
-                ctx.current_scope.define(param_sym)
-                ctx.emit(f"// Param '{param_id_str}' at FP{offset}", "")
+                offset = node.scope.resolve(param_id_str).address_or_offset
+                ctx.emit_comment(f"Param '{param_id_str}' at FP{offset}")
+    # Allocate space for local variables by visiting their declarations
     if node.block and node.block.declarations:
         for decl in node.block.declarations:
             if isinstance(decl, ast_nodes.VariableDeclaration):
-                visit(decl)
+                yield _visit(decl, ctx) # This will emit PUSHN/PUSHI for locals
+    ctx.mark_prologue() # followed by the routine's temporaries
+    is_function = isinstance(node, ast_nodes.FunctionDeclaration)
+    if is_function: # the assignments to the function's name store its result here
+        ctx.result_offsets[node.symbol] = ctx.new_temp_offset()
     if node.block:
-        visit(node.block.compound_statement)
-    ctx.emit("RETURN", f"Return from procedure {node.name}")
+        yield _visit(node.block.compound_statement, ctx) # Visit the routine body
+    emit_epilogue(node, ctx, is_function)
+    ctx.emit("RETURN", comment=f"Return from {kind_display} {node.name}")
     ctx.pop_scope()
 
-@register_visitor("CompoundStatement")
-def visit_CompoundStatement(node):
+def emit_epilogue(node, ctx, is_function):
+    # RETURN only restores pc and fp, so the routine drops its frame and its arguments
+    # itself and a function leaves just its result, where its first argument was
+    param_count = len(node.symbol.params_info)
+    frame_size = ctx.temps.base + ctx.temps.count # the locals, then the temporaries
+    drop_count = frame_size + param_count
+    if is_function:
+        result_offset = ctx.result_offsets[node.symbol]
+        target_offset = -param_count if param_count else 0
+        if target_offset != result_offset:
+            ctx.emit("PUSHL", result_offset, f"Push the result of {node.name}")
+            ctx.emit("STOREL", target_offset, "Store it below the frame and the arguments")
+        drop_count -= 1
+    if drop_count:
+        ctx.emit("POP", drop_count, f"Drop the frame and the arguments of {node.name}")
+
+@register_visitor(ast_nodes.FunctionDeclaration)
+def visit_FunctionDeclaration(node, ctx):
+    yield visit_routine(node, ctx, ctx.new_label(f"func{node.name}"), "function")
+
+@register_visitor(ast_nodes.ProcedureDeclaration)
+def visit_ProcedureDeclaration(node, ctx):
+    yield visit_routine(node, ctx, ctx.new_label(f"proc{node.name}"), "procedure")
+
+@register_visitor(ast_nodes.CompoundStatement)
+def visit_CompoundStatement(node, ctx):
     for stmt in node.statement_list:
-        visit(stmt)
+        yield _visit(stmt, ctx)
 
-@register_visitor("AssignmentStatement")
-def visit_AssignmentStatement(node):
+@register_visitor(ast_nodes.AssignmentStatement)
+def visit_AssignmentStatement(node, ctx):
     if isinstance(node.variable, ast_nodes.ArrayAccess):
-        # RHS first, store temporarily
-        visit(node.expression)
-        temp_rhs_offset = new_temp_var_offset()
-        ctx.emit(f"STOREL {temp_rhs_offset}", "Store RHS temporarily for array assignment")
-
-        # Base address of array
-        array_node_for_addr = node.variable.array
-        if not isinstance(array_node_for_addr, ast_nodes.Identifier):
-            raise NotImplementedError("Assignment to non-identifier array base not implemented")
-        array_name = array_node_for_addr.name
-        sym_array = ctx.current_scope.resolve(array_name)
-        if not sym_array or not sym_array.is_array:
-            # Check if it's a VAR parameter that's an array
-            if sym_array and sym_array.is_var_param: # It's an address
-                ctx.emit(f"PUSHL {sym_array.address_or_offset}", f"Load address from VAR param array '{array_name}'")
-            else:
-                raise ValueError(f"'{array_name}' is not a defined array or VAR param array for assignment.")
-        elif sym_array.scope_level == 0:
-            ctx.emit("PUSHGP", f"Push GP for global array '{array_name}' base")
-            ctx.emit(f"PUSHI {sym_array.address_or_offset}", f"Offset of global array '{array_name}'")
-            ctx.emit("PADD", f"Calculate base address of global array '{array_name}'")
-        else: # Local array
-            ctx.emit("PUSHFP", f"Push FP for local array '{array_name}' base")
-            ctx.emit(f"PUSHI {sym_array.address_or_offset}", f"Offset of local array '{array_name}'")
-            ctx.emit("PADD", f"Calculate base address of local array '{array_name}'")
-        
-        # Index
-        visit(node.variable.index)
-        if sym_array and sym_array.is_array and sym_array.array_lower_bound is not None and sym_array.array_lower_bound != 0:
-            ctx.emit(f"PUSHI {sym_array.array_lower_bound}", f"Push array lower bound {sym_array.array_lower_bound}")
-            ctx.emit("SUB", "Adjust index to be 0-based for VM")
-        
-        # Reload RHS
-        ctx.emit(f"PUSHL {temp_rhs_offset}", "Reload RHS for array assignment")
-        ctx.emit("STOREN", "Store to array element")
+        array_name = node.variable.array.name
+        slot = constant_element_slot(node.variable)
+        if slot is not None:
+            yield _visit(node.expression, ctx)
+            emit_element_store(slot, node.variable, ctx, "Store to array element")
+            return
+        # The element's address first, so the value is computed right on top of it for STOREN
+        yield visit_array_element_address(node.variable, ctx)
+        yield _visit(node.expression, ctx)
+        ctx.emit("STOREN", comment=f"Store to array element {array_name}[index]")
 
     elif isinstance(node.variable, ast_nodes.Identifier):
-        visit(node.expression) # Value to be assigned is on TOS
+        yield _visit(node.expression, ctx) # Value to be assigned is on TOS
         var_name = node.variable.name
-        sym = ctx.current_scope.resolve(var_name)
+        sym = node.variable.symbol
         if not sym:
             raise ValueError(f"Undefined variable '{var_name}' in assignment.")
 
         is_function_return_assignment = False
-        if sym.kind == 'function' and ctx.current_scope.scope_name == f"func_{sym.name}":
+        if sym.kind == 'function' and ctx.current_scope.scope_name == sym.name: # the function's own scope
             is_function_return_assignment = True
         
         if is_function_return_assignment:
-            # Value is on TOS, will be picked up by RETURN or handled by VM convention
-            ctx.emit(f"// Assignment to function name '{var_name}', value on TOS for return", "")
-            # Depending on VM, might need STOREL to a dedicated return value slot if not implicit
+            ctx.emit("STOREL", ctx.result_offsets[sym], f"Store the result of function '{var_name}'")
         elif sym.is_var_param:
-            ctx.emit(f"PUSHL {sym.address_or_offset}", f"Load address from VAR param '{var_name}'")
+            ctx.emit("PUSHL", sym.address_or_offset, f"Load address from VAR param '{var_name}'")
             ctx.emit("SWAP") # value, address -> address, value
-            ctx.emit(f"STORE 0", f"Store value into address pointed by VAR param '{var_name}'")
+            ctx.emit("STORE", 0, f"Store value into address pointed by VAR param '{var_name}'")
         elif sym.scope_level == 0:
-            ctx.emit(f"STOREG {sym.address_or_offset}", f"Store to global variable '{var_name}'")
+            ctx.emit("STOREG", sym.address_or_offset, f"Store to global variable '{var_name}'")
         else:
-            ctx.emit(f"STOREL {sym.address_or_offset}", f"Store to local/value_param '{var_name}'")
+            ctx.emit("STOREL", sym.address_or_offset, f"Store to local/value_param '{var_name}'")
     else:
-        ctx.emit(f"// Assignment to {type(node.variable).__name__} not implemented", "")
-
+        ctx.emit_comment(f"Assignment to {type(node.variable).__name__} not implemented")
+
+
+def array_lower_bound(sym_array):
+    return (sym_array.array_lower_bound or 0) if sym_array.is_array else 0
+
+def constant_element_slot(node):
+    """
+    The slot of the element of the ArrayAccess node when its index is a literal within
+    the array's bounds: (is_global, offset) for PUSHG/STOREG or PUSHL/STOREL, else None.
+    """
+    sym_array = node.array.symbol if isinstance(node.array, ast_nodes.Identifier) else None
+    if not sym_array or not sym_array.is_array or sym_array.is_var_param or sym_array.array_element_count is None:
+        return None
+    index = node.index.value if isinstance(node.index, ast_nodes.Literal) else None
+    lower_bound = array_lower_bound(sym_array)
+    if type(index) is not int or not lower_bound <= index < lower_bound + sym_array.array_element_count:
+        return None
+    return sym_array.scope_level == 0, sym_array.address_or_offset + index - lower_bound
+
+def emit_element_store(slot, node, ctx, comment):
+    is_global, offset = slot
+    ctx.emit("STOREG" if is_global else "STOREL", offset, f"{comment} {node.array.name}[{node.index.value}]")
+
+def split_index(index, ctx):
+    """
+    (expression, shift) such that the index is expression + shift: a literal added to
+    or subtracted from the index is moved into the base address.
+    """
+    if isinstance(index, ast_nodes.BinaryOperation) and index.operator in ('+', '-') and id(index) not in ctx.invariants:
+        right, left = index.right, index.left
+        if isinstance(right, ast_nodes.Literal) and type(right.value) is int:
+            return left, right.value if index.operator == '+' else -right.value
+        if index.operator == '+' and isinstance(left, ast_nodes.Literal) and type(left.value) is int:
+            return right, left.value
+    return index, 0
+
+def emit_array_base(sym_array, array_name, displacement, ctx):
+    """Pushes the address of the array plus displacement elements."""
+    displaced = f", displaced by {displacement}" if displacement else ""
+    if sym_array.is_var_param: # The parameter holds the array's address
+        ctx.emit("PUSHL", sym_array.address_or_offset, f"Load address from VAR param array '{array_name}'")
+        if displacement:
+            ctx.emit("PUSHI", displacement, f"Base of VAR param array '{array_name}'{displaced}")
+            ctx.emit("PADD", comment=f"Calculate base address of VAR param array '{array_name}'")
+    elif sym_array.scope_level == 0:
+        ctx.emit("PUSHGP", comment=f"Push GP for global array '{array_name}' base")
+        ctx.emit("PUSHI", sym_array.address_or_offset + displacement, f"Offset of global array '{array_name}'{displaced}")
+        ctx.emit("PADD", comment=f"Calculate base address of global array '{array_name}'")
+    else: # Local array
+        ctx.emit("PUSHFP", comment=f"Push FP for local array '{array_name}' base")
+        ctx.emit("PUSHI", sym_array.address_or_offset + displacement, f"Offset of local array '{array_name}'{displaced}")
+        ctx.emit("PADD", comment=f"Calculate base address of local array '{array_name}'")
+
+def visit_array_element_address(node, ctx):
+    """
+    Pushes the address and the index of the element of the ArrayAccess node, the
+    operands LOADN and STOREN expect. The array's lower bound and a literal added to
+    the index are taken from its offset at compile time, so what is left of the index
+    is used as it is. In a for loop the base address is loaded from a temporary.
+    """
+    array_node = node.array
+    if not isinstance(array_node, ast_nodes.Identifier):
+        raise NotImplementedError("Access to a non-identifier array base not implemented")
+    array_name = array_node.name
+    sym_array = array_node.symbol
+    if not sym_array or not (sym_array.is_array or sym_array.is_var_param):
+        raise ValueError(f"'{array_name}' is not a defined array or VAR param array.")
+
+    lower_bound = array_lower_bound(sym_array)
+    index, shift = split_index(node.index, ctx)
+    base_offset = ctx.array_bases.get((sym_array, shift))
+    if base_offset is not None:
+        ctx.emit("PUSHL", base_offset, f"Load base address of '{array_name}' computed before the loop")
+        yield _visit(index, ctx)
+    elif sym_array.is_var_param and shift != lower_bound: # only known once the address is loaded
+        emit_array_base(sym_array, array_name, 0, ctx)
+        yield _visit(node.index, ctx)
+        if lower_bound != 0:
+            ctx.emit("PUSHI", lower_bound, f"Push array lower bound {lower_bound}")
+            ctx.emit("SUB", comment="Adjust index to be 0-based for VM")
+    else:
+        emit_array_base(sym_array, array_name, shift - lower_bound, ctx)
+        yield _visit(index, ctx)
+
+def hoist_array_bases(loop, ctx):
+    """
+    Computes the base address of the arrays the for loop's body indexes into
+    temporaries, before the loop, one for each array and literal shift of the index.
+    Returns their keys, for release_hoisted.
+    """
+    hoisted = []
+    if not ctx.hoist_invariants:
+        return hoisted
+    pending = [loop.statement]
+    while pending:
+        node = pending.pop()
+        if node is None:
+            continue
+        pending.extend(reversed(list(ast_nodes.iter_child_nodes(node))))
+        if not isinstance(node, ast_nodes.ArrayAccess) or not isinstance(node.array, ast_nodes.Identifier):
+            continue
+        sym_array = node.array.symbol
+        if not sym_array or not sym_array.is_array or constant_element_slot(node) is not None:
+            continue # strings, and elements addressed directly
+        _, shift = split_index(node.index, ctx)
+        displacement = shift - array_lower_bound(sym_array)
+        if (sym_array, shift) in ctx.array_bases or (sym_array.is_var_param and not displacement):
+            continue # already hoisted, or a single PUSHL
+        emit_array_base(sym_array, node.array.name, displacement, ctx)
+        offset = ctx.new_temp_offset()
+        ctx.emit("STOREL", offset, f"Store base address of '{node.array.name}' for the loop")
+        ctx.array_bases[(sym_array, shift)] = offset
+        hoisted.append((sym_array, shift))
+    return hoisted
+
+# Short-circuit operators: the VM operation each one computes, evaluating the right
+# operand only when the left one does not decide the result
+SHORT_CIRCUIT_OPERATORS = {'ANDTHEN': 'AND', 'ORELSE': 'OR'}
+
+def has_side_effects(node):
+    """Whether evaluating the expression may call a user routine (the builtins have no side effects)."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast_nodes.InlinedCall):
+            return True
+        if isinstance(node, ast_nodes.FunctionCall):
+            address = node.symbol.address_or_offset if node.symbol else None
+            if not (isinstance(address, str) and address.startswith("BUILTIN_")):
+                return True
+        pending.extend(ast_nodes.iter_child_nodes(node))
+    return False
+
+def short_circuit_operation(node, ctx):
+    """'AND' or 'OR' when node is a logical operation whose right operand can be skipped, else None."""
+    if not isinstance(node, ast_nodes.BinaryOperation):
+        return None
+    op = node.operator.upper()
+    if op in SHORT_CIRCUIT_OPERATORS:
+        return SHORT_CIRCUIT_OPERATORS[op]
+    if op in ('AND', 'OR') and ctx.short_circuit and not has_side_effects(node.right):
+        return op
+    return None
+
+def visit_short_circuit(node, ctx, operation):
+    # The left operand is the result when it decides it (false for AND, true for OR)
+    end_label = ctx.new_label("shortcircuit")
+    yield _visit(node.left, ctx)
+    ctx.emit("DUP", 1, f"Keep the left operand of {node.operator}")
+    if operation == 'OR':
+        ctx.emit("NOT")
+    ctx.emit("JZ", end_label, "The left operand decides the result, skip the right one")
+    ctx.emit("POP", 1, "The right operand is the result")
+    yield _visit(node.right, ctx)
+    ctx.emit_label(end_label)
+
+# Relational operators, each with the one that is true exactly when it is false
+COMPARISON_OPERATORS = {'=': '<>', '<>': '=', '<': '>=', '>=': '<', '>': '<=', '<=': '>'}
+COMPARISON_OPCODES = {'=': 'EQUAL', '<': 'INF', '<=': 'INFEQ', '>': 'SUP', '>=': 'SUPEQ'}
+
+def is_comparison(node):
+    return isinstance(node, ast_nodes.BinaryOperation) and node.operator in COMPARISON_OPERATORS
+
+def is_string_char_comparison(node):
+    """Whether node is string_var[index] = 'c', compared as ASCII codes."""
+    if node.operator != '=' or not isinstance(node.right, ast_nodes.Literal) or \
+        not isinstance(node.right.value, str) or len(node.right.value) != 1:
+        return False
+    if not isinstance(node.left, ast_nodes.ArrayAccess) or not isinstance(node.left.array, ast_nodes.Identifier):
+        return False
+    left_array_sym = node.left.array.symbol
+    return bool(left_array_sym and left_array_sym.sym_type and left_array_sym.sym_type.upper() == 'STRING')
+
+def comparison_kind(node):
+    """The type the operands of the comparison node are compared as: REAL, STRING, INTEGER or CHAR."""
+    if is_string_char_comparison(node):
+        return 'CHAR'
+    left_expr_type = th.determine_expression_type(node.left)
+    right_expr_type = th.determine_expression_type(node.right)
+    if left_expr_type == 'REAL' or right_expr_type == 'REAL':
+        return 'REAL'
+    if left_expr_type == 'STRING' and right_expr_type == 'STRING':
+        return 'STRING'
+    if left_expr_type in ('INTEGER', 'BOOLEAN') and right_expr_type in ('INTEGER', 'BOOLEAN'):
+        return 'INTEGER'
+    return left_expr_type
+
+def visit_comparison(node, ctx, op, as_condition=False):
+    """
+    Compares the operands of node with op, which is node's operator or its inverse.
+    With as_condition the value only has to be zero exactly when the comparison is
+    false, so an integer <> is a subtraction instead of EQUAL and NOT.
+    """
+    if is_string_char_comparison(node):
+        # Push char from string_var[index] (CHARAT gives ASCII) and the ASCII of the literal
+        yield _visit(node.left, ctx)
+        ctx.emit("PUSHI", ord(node.right.value), f"ASCII for char literal '{node.right.value}'")
+        kind = 'CHAR'
+    else:
+        yield _visit(node.left, ctx)
+        yield _visit(node.right, ctx)
+        kind = comparison_kind(node)
+        if kind == 'REAL':
+            # Implicit ITOF conversion if one is INT and other is REAL
+            left_expr_type = th.determine_expression_type(node.left)
+            right_expr_type = th.determine_expression_type(node.right)
+            if left_expr_type == 'INTEGER' and right_expr_type == 'REAL':
+                ctx.emit("SWAP"); ctx.emit("ITOF"); ctx.emit("SWAP")
+            elif left_expr_type == 'REAL' and right_expr_type == 'INTEGER':
+                ctx.emit("ITOF")
 
-@register_visitor("IfStatement")
-def visit_IfStatement(node):
-    visit(node.condition)
+    if op == '<>':
+        if as_condition and kind in ('INTEGER', 'CHAR'):
+            ctx.emit("SUB", comment="Zero only when the operands are equal")
+            return
+        ctx.emit("FEQUAL" if kind == 'REAL' else "EQUAL")
+        ctx.emit("NOT")
+    elif op == '=':
+        comment = {'STRING': "String comparison", 'CHAR': "Compare character ASCII codes"}.get(kind)
+        ctx.emit("FEQUAL" if kind == 'REAL' else "EQUAL", comment=comment)
+    else:
+        opcode = COMPARISON_OPCODES[op]
+        ctx.emit("F" + opcode if kind == 'REAL' else opcode)
+
+def visit_condition(node, ctx, target_label, comment, jump_if=False):
+    """
+    Generates a condition as jumps: jumps to target_label when its value is jump_if and
+    falls through otherwise. A not flips jump_if and a comparison is inverted at compile
+    time instead of computing its value and negating it, as JZ is the only conditional
+    jump. The operands of short-circuit operations become separate jumps, so the right
+    operand is only evaluated when it is needed.
+    """
+    hoisted = id(node) in ctx.invariants # computed before the loop, only its value is left
+    if not hoisted and isinstance(node, ast_nodes.UnaryOperation) and node.operator.upper() == 'NOT':
+        yield visit_condition(node.operand, ctx, target_label, comment, not jump_if)
+        return
+    if isinstance(node, ast_nodes.Literal) and type(node.value) is bool:
+        if node.value == jump_if:
+            ctx.emit("JUMP", target_label, comment)
+        return
+    operation = None if hoisted else short_circuit_operation(node, ctx)
+    if operation:
+        # the value of the left operand that decides the result (false for AND, true for OR)
+        deciding = operation == 'OR'
+        if deciding == jump_if:
+            yield visit_condition(node.left, ctx, target_label, comment, jump_if)
+            yield visit_condition(node.right, ctx, target_label, comment, jump_if)
+        else:
+            skip_label = ctx.new_label("skip")
+            yield visit_condition(node.left, ctx, skip_label, "Left operand decides, the condition is not met", deciding)
+            yield visit_condition(node.right, ctx, target_label, comment, jump_if)
+            ctx.emit_label(skip_label)
+    elif not hoisted and is_comparison(node):
+        # JZ jumps when the comparison is false, so the inverse one is used to jump when it is true
+        yield visit_comparison(node, ctx, COMPARISON_OPERATORS[node.operator] if jump_if else node.operator, True)
+        ctx.emit("JZ", target_label, comment)
+    else:
+        yield _visit(node, ctx)
+        if jump_if:
+            ctx.emit("NOT")
+        ctx.emit("JZ", target_label, comment)
+
+def negates_when_false(node, ctx):
+    """
+    Whether jumping when the condition node is false needs a NOT: a real or string <>
+    (or not =), which has no subtraction form, and a plain value under a not.
+    """
+    inverted = False
+    while id(node) not in ctx.invariants and isinstance(node, ast_nodes.UnaryOperation) and node.operator.upper() == 'NOT':
+        node = node.operand
+        inverted = not inverted
+    if id(node) in ctx.invariants:
+        return inverted
+    if is_comparison(node):
+        op = COMPARISON_OPERATORS[node.operator] if inverted else node.operator
+        return op == '<>' and comparison_kind(node) not in ('INTEGER', 'CHAR')
+    if isinstance(node, ast_nodes.Literal) and type(node.value) is bool or short_circuit_operation(node, ctx):
+        return False
+    return inverted
+
+def hoist_invariants(loop, ctx):
+    """
+    Computes the invariant expressions of the loop into temporaries, before it, where
+    the loop's code then loads them. Returns their keys, for release_hoisted.
+    """
+    hoisted = []
+    if not ctx.hoist_invariants:
+        return hoisted
+    for expression in invariant_expressions(loop):
+        if id(expression) in ctx.invariants:
+            continue # hoisted out of an enclosing loop already
+        yield _visit(expression, ctx)
+        offset = ctx.new_temp_offset()
+        ctx.emit("STOREL", offset, "Store loop-invariant value")
+        ctx.invariants[id(expression)] = offset
+        hoisted.append(id(expression))
+    return hoisted
+
+def release_hoisted(table, hoisted, ctx):
+    """Releases the temporaries of the hoisted keys of table (ctx.invariants or ctx.array_bases)."""
+    for key in reversed(hoisted):
+        ctx.release_temp_offset(table.pop(key))
+
+@register_visitor(ast_nodes.IfStatement)
+def visit_IfStatement(node, ctx):
     else_label = ctx.new_label("else")
     endif_label = ctx.new_label("endif")
-    if node.else_statement:
-        ctx.emit(f"JZ {else_label}", "If condition is false, jump to else")
-    else:
-        ctx.emit(f"JZ {endif_label}", "If condition is false (no else), jump to endif")
-    visit(node.then_statement)
-    if node.else_statement:
-        ctx.emit(f"JUMP {endif_label}", "Skip else block")
+    if node.else_statement and negates_when_false(node.condition, ctx):
+        # the else block comes first, so the condition jumps to the then block when it is true, without a NOT
+        then_label = ctx.new_label("then")
+        yield visit_condition(node.condition, ctx, then_label, "If condition is true, jump to then", True)
+        yield _visit(node.else_statement, ctx)
+        ctx.emit("JUMP", endif_label, "Skip then block")
+        ctx.emit_label(then_label)
+        yield _visit(node.then_statement, ctx)
+    elif node.else_statement:
+        yield visit_condition(node.condition, ctx, else_label, "If condition is false, jump to else")
+        yield _visit(node.then_statement, ctx)
+        ctx.emit("JUMP", endif_label, "Skip else block")
         ctx.emit_label(else_label)
-        visit(node.else_statement)
+        yield _visit(node.else_statement, ctx)
+    else:
+        yield visit_condition(node.condition, ctx, endif_label, "If condition is false (no else), jump to endif")
+        yield _visit(node.then_statement, ctx)
     ctx.emit_label(endif_label)
 
-@register_visitor("WhileStatement")
-def visit_WhileStatement(node):
+@register_visitor(ast_nodes.WhileStatement)
+def visit_WhileStatement(node, ctx):
     loop_start_label = ctx.new_label("whilestart")
     loop_end_label = ctx.new_label("whileend")
+    hoisted = yield hoist_invariants(node, ctx)
     ctx.emit_label(loop_start_label)
-    visit(node.condition)
-    ctx.emit(f"JZ {loop_end_label}", "If condition is false, exit while loop")
-    visit(node.statement)
-    ctx.emit(f"JUMP {loop_start_label}", "Repeat while loop")
+    yield visit_condition(node.condition, ctx, loop_end_label, "If condition is false, exit while loop")
+    yield _visit(node.statement, ctx)
+    ctx.emit("JUMP", loop_start_label, "Repeat while loop")
     ctx.emit_label(loop_end_label)
+    release_hoisted(ctx.invariants, hoisted, ctx)
 
-@register_visitor("ForStatement")
-def visit_ForStatement(node):
+@register_visitor(ast_nodes.ForStatement)
+def visit_ForStatement(node, ctx):
     control_var_name = node.control_variable.name
-    sym_control_var = ctx.current_scope.resolve(control_var_name)
+    sym_control_var = node.control_variable.symbol
     if not sym_control_var:
         raise ValueError(f"FOR loop control variable '{control_var_name}' not defined.")
     if sym_control_var.kind not in ['variable', 'parameter'] or sym_control_var.is_var_param:
@@ -320,108 +531,112 @@ def visit_ForStatement(node):
     control_var_offset = sym_control_var.address_or_offset
     loop_check_label = ctx.new_label("forcheck")
     loop_end_label = ctx.new_label("forend")
-    temp_end_val_storage_offset = new_temp_var_offset()
-    visit(node.end_expression)
-    ctx.emit(f"STOREL {temp_end_val_storage_offset}", f"Store evaluated end value of FOR loop for '{control_var_name}'")
-    visit(node.start_expression)
+    hoisted = yield hoist_invariants(node, ctx)
+    hoisted_bases = hoist_array_bases(node, ctx)
+    temp_end_val_storage_offset = ctx.new_temp_offset()
+    yield _visit(node.end_expression, ctx)
+    ctx.emit("STOREL", temp_end_val_storage_offset, f"Store evaluated end value of FOR loop for '{control_var_name}'")
+    yield _visit(node.start_expression, ctx)
     if is_global_control_var:
-        ctx.emit(f"STOREG {control_var_offset}", f"Initialize FOR global control var '{control_var_name}'")
+        ctx.emit("STOREG", control_var_offset, f"Initialize FOR global control var '{control_var_name}'")
     else:
-        ctx.emit(f"STOREL {control_var_offset}", f"Initialize FOR local control var '{control_var_name}'")
+        ctx.emit("STOREL", control_var_offset, f"Initialize FOR local control var '{control_var_name}'")
     ctx.emit_label(loop_check_label)
     if is_global_control_var:
-        ctx.emit(f"PUSHG {control_var_offset}", f"Load global control var '{control_var_name}' for check")
+        ctx.emit("PUSHG", control_var_offset, f"Load global control var '{control_var_name}' for check")
     else:
-        ctx.emit(f"PUSHL {control_var_offset}", f"Load local control var '{control_var_name}' for check")
-    ctx.emit(f"PUSHL {temp_end_val_storage_offset}", "Load stored end value for check")
+        ctx.emit("PUSHL", control_var_offset, f"Load local control var '{control_var_name}' for check")
+    ctx.emit("PUSHL", temp_end_val_storage_offset, "Load stored end value for check")
     if not node.downto:
-        ctx.emit("INFEQ", f"Check {control_var_name} <= end_value")
-        ctx.emit(f"JZ {loop_end_label}", f"If not ({control_var_name} <= end_value), exit loop")
+        ctx.emit("INFEQ", comment=f"Check {control_var_name} <= end_value")
+        ctx.emit("JZ", loop_end_label, f"If not ({control_var_name} <= end_value), exit loop")
     else:
-        ctx.emit("SUPEQ", f"Check {control_var_name} >= end_value")
-        ctx.emit(f"JZ {loop_end_label}", f"If not ({control_var_name} >= end_value), exit loop")
-    visit(node.statement)
+        ctx.emit("SUPEQ", comment=f"Check {control_var_name} >= end_value")
+        ctx.emit("JZ", loop_end_label, f"If not ({control_var_name} >= end_value), exit loop")
+    yield _visit(node.statement, ctx)
     if is_global_control_var:
-        ctx.emit(f"PUSHG {control_var_offset}", f"Load global control var '{control_var_name}' for update")
+        ctx.emit("PUSHG", control_var_offset, f"Load global control var '{control_var_name}' for update")
     else:
-        ctx.emit(f"PUSHL {control_var_offset}", f"Load local control var '{control_var_name}' for update")
-    ctx.emit("PUSHI 1")
+        ctx.emit("PUSHL", control_var_offset, f"Load local control var '{control_var_name}' for update")
+    ctx.emit("PUSHI", 1)
     if not node.downto:
-        ctx.emit("ADD", f"Increment {control_var_name}")
+        ctx.emit("ADD", comment=f"Increment {control_var_name}")
     else:
-        ctx.emit("SUB", f"Decrement {control_var_name}")
+        ctx.emit("SUB", comment=f"Decrement {control_var_name}")
     if is_global_control_var:
-        ctx.emit(f"STOREG {control_var_offset}", f"Store updated global control var '{control_var_name}'")
+        ctx.emit("STOREG", control_var_offset, f"Store updated global control var '{control_var_name}'")
     else:
-        ctx.emit(f"STOREL {control_var_offset}", f"Store updated local control var '{control_var_name}'")
-    ctx.emit(f"JUMP {loop_check_label}")
+        ctx.emit("STOREL", control_var_offset, f"Store updated local control var '{control_var_name}'")
+    ctx.emit("JUMP", loop_check_label)
     ctx.emit_label(loop_end_label)
+    ctx.release_temp_offset(temp_end_val_storage_offset)
+    release_hoisted(ctx.array_bases, hoisted_bases, ctx)
+    release_hoisted(ctx.invariants, hoisted, ctx)
 
-@register_visitor("Literal")
-def visit_Literal(node):
+@register_visitor(ast_nodes.Literal)
+def visit_Literal(node, ctx):
     value = node.value
     if isinstance(value, bool):
-        ctx.emit(f"PUSHI {1 if value else 0}")
+        ctx.emit("PUSHI", 1 if value else 0)
     elif isinstance(value, int):
-        ctx.emit(f"PUSHI {value}")
+        ctx.emit("PUSHI", value)
     elif isinstance(value, float):
-        ctx.emit(f"PUSHF {value}")
+        ctx.emit("PUSHF", value)
     elif isinstance(value, str):
-        escaped_value = value.replace('"', '\\"') # Basic escaping for quotes in string
-        ctx.emit(f'PUSHS "{escaped_value}"')
+        ctx.emit("PUSHS", value) # quotes are escaped when the code is rendered
     else:
         raise TypeError(f"Unsupported literal type: {type(value)} for value {value}")
 
-@register_visitor("Identifier")
-def visit_Identifier(node):
+@register_visitor(ast_nodes.Identifier)
+def visit_Identifier(node, ctx):
     var_name = node.name
-    sym = ctx.current_scope.resolve(var_name)
+    sym = node.symbol
     if not sym:
         raise ValueError(f"Undefined identifier '{var_name}' used as a value.")
 
     if sym.kind == 'variable':
         if sym.is_array: # Pushing base address of an array
             if sym.scope_level == 0:
-                ctx.emit("PUSHGP", f"Push GP for global array '{var_name}' base address")
-                ctx.emit(f"PUSHI {sym.address_or_offset}", f"Offset of global array '{var_name}'")
-                ctx.emit("PADD", f"Calculate base address of global array '{var_name}'")
+                ctx.emit("PUSHGP", comment=f"Push GP for global array '{var_name}' base address")
+                ctx.emit("PUSHI", sym.address_or_offset, f"Offset of global array '{var_name}'")
+                ctx.emit("PADD", comment=f"Calculate base address of global array '{var_name}'")
             else:
-                ctx.emit("PUSHFP", f"Push FP for local array '{var_name}' base address")
-                ctx.emit(f"PUSHI {sym.address_or_offset}", f"Offset of local array '{var_name}'")
-                ctx.emit("PADD", f"Calculate base address of local array '{var_name}'")
+                ctx.emit("PUSHFP", comment=f"Push FP for local array '{var_name}' base address")
+                ctx.emit("PUSHI", sym.address_or_offset, f"Offset of local array '{var_name}'")
+                ctx.emit("PADD", comment=f"Calculate base address of local array '{var_name}'")
         else: # Scalar variable
             if sym.scope_level == 0:
-                ctx.emit(f"PUSHG {sym.address_or_offset}", f"Push global '{var_name}'")
+                ctx.emit("PUSHG", sym.address_or_offset, f"Push global '{var_name}'")
             else:
-                ctx.emit(f"PUSHL {sym.address_or_offset}", f"Push local '{var_name}'")
+                ctx.emit("PUSHL", sym.address_or_offset, f"Push local '{var_name}'")
     elif sym.kind == 'parameter':
         if sym.is_var_param:
             # For VAR parameters, we push their address first.
-            ctx.emit(f"PUSHL {sym.address_or_offset}", f"Push address from VAR param '{var_name}'")
+            ctx.emit("PUSHL", sym.address_or_offset, f"Push address from VAR param '{var_name}'")
             # If it's a scalar VAR parameter (not an array whose base address is needed by ArrayAccess),
             # its value is typically needed when it appears in an expression. So, dereference it.
             if not sym.is_array:
-                ctx.emit(f"LOAD 0", f"Dereference scalar VAR param '{var_name}' to get its value")
+                ctx.emit("LOAD", 0, f"Dereference scalar VAR param '{var_name}' to get its value")
         else: # Value parameter
             if sym.is_array: # Value parameter that is an array
                 # Push the base address of the copied array on the stack frame
-                ctx.emit("PUSHFP", f"Push FP for value param array '{var_name}' base address")
-                ctx.emit(f"PUSHI {sym.address_or_offset}", f"Offset of value param array '{var_name}'")
-                ctx.emit("PADD", f"Calculate base address of value param array '{var_name}'")
+                ctx.emit("PUSHFP", comment=f"Push FP for value param array '{var_name}' base address")
+                ctx.emit("PUSHI", sym.address_or_offset, f"Offset of value param array '{var_name}'")
+                ctx.emit("PADD", comment=f"Calculate base address of value param array '{var_name}'")
             else: # Scalar value parameter
-                ctx.emit(f"PUSHL {sym.address_or_offset}", f"Push value of param '{var_name}'")
+                ctx.emit("PUSHL", sym.address_or_offset, f"Push value of param '{var_name}'")
     elif sym.kind == 'function': # Pushing function address (e.g. for passing as param, not direct call)
-        ctx.emit(f"PUSHA {sym.address_or_offset}", f"Push address of function '{var_name}'")
+        ctx.emit("PUSHA", ctx.routine_labels[sym], f"Push address of function '{var_name}'")
     else:
         raise ValueError(f"Cannot use identifier '{var_name}' of kind '{sym.kind}' as a value here.")
 
-@register_visitor("ArrayAccess")
-def visit_ArrayAccess(node):
+@register_visitor(ast_nodes.ArrayAccess)
+def visit_ArrayAccess(node, ctx):
     # Check if accessing a string variable for CHARAT
     is_string_access = False
     string_sym = None
     if isinstance(node.array, ast_nodes.Identifier):
-        string_sym = ctx.current_scope.resolve(node.array.name)
+        string_sym = node.array.symbol
         if string_sym and string_sym.sym_type and string_sym.sym_type.upper() == 'STRING':
             is_string_access = True
 
@@ -429,83 +644,71 @@ def visit_ArrayAccess(node):
         var_name = node.array.name
         # Push the string value (heap address)
         if string_sym.scope_level == 0:
-            ctx.emit(f"PUSHG {string_sym.address_or_offset}", f"Push global string '{var_name}'")
+            ctx.emit("PUSHG", string_sym.address_or_offset, f"Push global string '{var_name}'")
         else: # Local or param
             if string_sym.is_var_param: # VAR param string
-                ctx.emit(f"PUSHL {string_sym.address_or_offset}", f"Load address from VAR param string '{var_name}'")
-                ctx.emit("LOAD 0", f"Dereference VAR param to get string address for '{var_name}'")
+                ctx.emit("PUSHL", string_sym.address_or_offset, f"Load address from VAR param string '{var_name}'")
+                ctx.emit("LOAD", 0, f"Dereference VAR param to get string address for '{var_name}'")
             else: # Regular local string
-                ctx.emit(f"PUSHL {string_sym.address_or_offset}", f"Push local string '{var_name}'")
-        visit(node.index)
+                ctx.emit("PUSHL", string_sym.address_or_offset, f"Push local string '{var_name}'")
+        yield _visit(node.index, ctx)
         # Assuming Pascal 1-based indexing for strings, adjust to 0-based for CHARAT
-        ctx.emit("PUSHI 1", "Adjust for 1-based string indexing")
-        ctx.emit("SUB", "Convert to 0-based for VM")
-        ctx.emit("CHARAT", "Get character at index from string")
+        ctx.emit("PUSHI", 1, "Adjust for 1-based string indexing")
+        ctx.emit("SUB", comment="Convert to 0-based for VM")
+        ctx.emit("CHARAT", comment="Get character at index from string")
     else: # Regular array access
-        # 1. Push base address of the array
-        # visit(node.array) will push the base address if node.array is an Identifier of an array type
-        # or if it's a VAR param that is an array (it pushes the address stored in the VAR param).
-        visit(node.array) # Stack: [..., base_address]
-
-        # 2. Push index value
-        visit(node.index) # Stack: [..., base_address, user_index]
-
-        # 3. Adjust index if array is not 0-indexed
-        sym_array = None
-        if isinstance(node.array, ast_nodes.Identifier): # Get symbol to check lower_bound
-            sym_array = ctx.current_scope.resolve(node.array.name)
-        
-        if sym_array and sym_array.is_array and sym_array.array_lower_bound is not None and sym_array.array_lower_bound != 0:
-            ctx.emit(f"PUSHI {sym_array.array_lower_bound}", f"Push array lower bound {sym_array.array_lower_bound}")
-            ctx.emit("SUB", "Adjust index to be 0-based for VM")
-        # Stack: [..., base_address, adjusted_index]
-        
-        ctx.emit("LOADN", "Load value from array element")
+        slot = constant_element_slot(node)
+        if slot is not None:
+            is_global, offset = slot
+            ctx.emit("PUSHG" if is_global else "PUSHL", offset, f"Push array element {node.array.name}[{node.index.value}]")
+            return
+        if isinstance(node.array, ast_nodes.Identifier):
+            yield visit_array_element_address(node, ctx) # Stack: [..., base_address, index]
+        else:
+            yield _visit(node.array, ctx)
+            yield _visit(node.index, ctx)
+        ctx.emit("LOADN", comment="Load value from array element")
 
 
-@register_visitor("UnaryOperation")
-def visit_UnaryOperation(node):
-    visit(node.operand)
+@register_visitor(ast_nodes.UnaryOperation)
+def visit_UnaryOperation(node, ctx):
     op = node.operator.upper() # Standardize operator
+    if op == 'NOT' and is_comparison(node.operand) and id(node.operand) not in ctx.invariants:
+        # not (a < b) is a >= b
+        yield visit_comparison(node.operand, ctx, COMPARISON_OPERATORS[node.operand.operator])
+        return
+    yield _visit(node.operand, ctx)
     if op == 'NOT':
         ctx.emit("NOT")
     elif op == '-': # Negation
         # Check type of operand to decide if FNEG or integer negation
         operand_type = th.determine_expression_type(node.operand)
         if operand_type == 'REAL':
-            ctx.emit("PUSHF 0.0")
+            ctx.emit("PUSHF", 0.0)
             ctx.emit("SWAP")
-            ctx.emit("FSUB", "Floating point negation")
+            ctx.emit("FSUB", comment="Floating point negation")
         else: # Integer negation
-            ctx.emit("PUSHI 0")
+            ctx.emit("PUSHI", 0)
             ctx.emit("SWAP")
-            ctx.emit("SUB", "Integer negation")
+            ctx.emit("SUB", comment="Integer negation")
     elif op == '+': # Unary plus (no-op)
         pass
     else:
         raise ValueError(f"Unsupported unary operator: {node.operator}")
 
-@register_visitor("BinaryOperation")
-def visit_BinaryOperation(node):
-    # Special handling for string char comparison: char_var = 'a'
-    if node.operator == '=' and isinstance(node.right, ast_nodes.Literal) and \
-        isinstance(node.right.value, str) and len(node.right.value) == 1:
-        if isinstance(node.left, ast_nodes.ArrayAccess) and isinstance(node.left.array, ast_nodes.Identifier):
-            left_array_sym = ctx.current_scope.resolve(node.left.array.name)
-            if left_array_sym and left_array_sym.sym_type and left_array_sym.sym_type.upper() == 'STRING':
-                # This is string_var[index] = 'char_literal'
-                # Push char from string_var[index] (CHARAT gives ASCII)
-                visit(node.left) # This will use visit_ArrayAccess for string, leaving ASCII on stack
-                
-                # Push ASCII of the char literal
-                char_code = ord(node.right.value)
-                ctx.emit(f"PUSHI {char_code}", f"ASCII for char literal '{node.right.value}'")
-                
-                ctx.emit("EQUAL", "Compare character ASCII codes")
-                return 
+@register_visitor(ast_nodes.BinaryOperation)
+def visit_BinaryOperation(node, ctx):
+    if node.operator in COMPARISON_OPERATORS:
+        yield visit_comparison(node, ctx, node.operator)
+        return
+
+    operation = short_circuit_operation(node, ctx)
+    if operation:
+        yield visit_short_circuit(node, ctx, operation)
+        return
 
-    visit(node.left)
-    visit(node.right)
+    yield _visit(node.left, ctx)
+    yield _visit(node.right, ctx)
     
     original_op = node.operator
     op = original_op.upper()
@@ -528,23 +731,11 @@ def visit_BinaryOperation(node):
                 # Need to convert left_val. This requires stack manipulation.
                 # SWAP, ITOF, SWAP
                 ctx.emit("SWAP") # [right_val(real), left_val(int)]
-                ctx.emit("ITOF", "Convert left operand to float") # [right_val(real), left_val(float)]
+                ctx.emit("ITOF", comment="Convert left operand to float") # [right_val(real), left_val(float)]
                 ctx.emit("SWAP") # [left_val(float), right_val(real)]
             elif left_expr_type == 'REAL' and right_expr_type == 'INTEGER':
                 # Stack: [left_val(real), right_val(int)]
-                ctx.emit("ITOF", "Convert right operand to float") # [left_val(real), right_val(float)]
-
-    # Relational operators also need type-aware versions
-    is_float_comparison = False
-    if op in ['<', '<=', '>', '>=', '=', '<>']:
-        if left_expr_type == 'REAL' or right_expr_type == 'REAL':
-            is_float_comparison = True
-            # Similar ITOF logic as above if types are mixed
-            if left_expr_type == 'INTEGER' and right_expr_type == 'REAL':
-                ctx.emit("SWAP"); ctx.emit("ITOF"); ctx.emit("SWAP")
-            elif left_expr_type == 'REAL' and right_expr_type == 'INTEGER':
-                ctx.emit("ITOF")
-
+                ctx.emit("ITOF", comment="Convert right operand to float") # [left_val(real), right_val(float)]
 
     if op == '+': ctx.emit("FADD" if is_float_operation else "ADD")
     elif op == '-': ctx.emit("FSUB" if is_float_operation else "SUB")
@@ -552,34 +743,15 @@ def visit_BinaryOperation(node):
     elif op == '/': ctx.emit("FDIV") # Pascal '/' is always real division
     elif op == 'DIV': ctx.emit("DIV") # Integer division
     elif op == 'MOD': ctx.emit("MOD")
-    elif op == '=':
-        # String equality check (if not char comparison handled above)
-        if left_expr_type == 'STRING' and right_expr_type == 'STRING':
-            ctx.emit("EQUAL", "String comparison")
-        else:
-            ctx.emit("FEQUAL" if is_float_comparison else "EQUAL")
-    elif op == '<': ctx.emit("FINF" if is_float_comparison else "INF")
-    elif op == '<=': ctx.emit("FINFEQ" if is_float_comparison else "INFEQ")
-    elif op == '>': ctx.emit("FSUP" if is_float_comparison else "SUP")
-    elif op == '>=': ctx.emit("FSUPEQ" if is_float_comparison else "SUPEQ")
-    elif op == '<>':
-        if left_expr_type == 'STRING' and right_expr_type == 'STRING':
-            ctx.emit("EQUAL") # Or STRCMP
-        else:
-            ctx.emit("FEQUAL" if is_float_comparison else "EQUAL")
-        ctx.emit("NOT")
     elif op == 'AND': ctx.emit("AND")
     elif op == 'OR': ctx.emit("OR")
     else:
         raise ValueError(f"Unsupported binary operator: {original_op}")
 
-@register_visitor("FunctionCall")
-def visit_FunctionCall(node):
+@register_visitor(ast_nodes.FunctionCall)
+def visit_FunctionCall(node, ctx):
     func_name_original = node.name
-    func_name_lower = func_name_original.lower()
-    func_sym = ctx.current_scope.resolve(func_name_lower) # Try lowercase for builtins
-    if not func_sym:
-        func_sym = ctx.current_scope.resolve(func_name_original) # Try original case
+    func_sym = node.symbol
     if not func_sym:
         raise ValueError(f"Call to undefined function/procedure '{func_name_original}'.")
     if func_sym.kind not in ['function', 'procedure']:
@@ -598,54 +770,54 @@ def visit_FunctionCall(node):
             if not node.arguments: ctx.emit("WRITELN")
             else:
                 for arg_expr in node.arguments:
-                    visit(arg_expr)
+                    yield _visit(arg_expr, ctx)
                     arg_type = th.determine_expression_type(arg_expr)
                     if arg_type == 'STRING': ctx.emit("WRITES")
                     elif arg_type == 'REAL': ctx.emit("WRITEF")
                     elif arg_type == 'INTEGER': ctx.emit("WRITEI")
                     elif arg_type == 'BOOLEAN': ctx.emit("WRITEI") # 0 or 1
                     elif arg_type == 'CHAR': ctx.emit("WRITECHR") # Assuming WRITECHR for ASCII value
-                    else: ctx.emit("WRITEI", f"Defaulting to WRITEI for unknown type {arg_type}")
+                    else: ctx.emit("WRITEI", comment=f"Defaulting to WRITEI for unknown type {arg_type}")
                 ctx.emit("WRITELN")
             return
         elif builtin_name == "BUILTIN_LENGTH":
             arg = check_args(1, func_name_original)
             if isinstance(arg, ast_nodes.Literal) and isinstance(arg.value, str): # Constant folding
-                ctx.emit(f"PUSHI {len(arg.value)}", f"Folded Length('{arg.value}')")
+                ctx.emit("PUSHI", len(arg.value), f"Folded Length('{arg.value}')")
             else:
-                visit(arg); ctx.emit("STRLEN", f"VM STRLEN for {func_name_original}")
+                yield _visit(arg, ctx); ctx.emit("STRLEN", comment=f"VM STRLEN for {func_name_original}")
             return
         # ABS
         elif builtin_name == "BUILTIN_ABS":
             arg_node = check_args(1, func_name_original)
-            visit(arg_node) # Value on stack
+            yield _visit(arg_node, ctx) # Value on stack
             arg_type = th.determine_expression_type(arg_node)
             abs_end_label = ctx.new_label("absEnd")
             if arg_type == "INTEGER":
-                ctx.emit("DUP 1","ABS - Check if is negative"); ctx.emit("PUSHI 0"); ctx.emit("INF") # val, (val < 0)
-                ctx.emit(f"JZ {abs_end_label}" , "If not (val < 0), jump to end") # If not (val < 0), jump to end
-                ctx.emit("PUSHI 0","Making negative"); ctx.emit("SWAP"); ctx.emit("SUB") # Negate
+                ctx.emit("DUP", 1,"ABS - Check if is negative"); ctx.emit("PUSHI", 0); ctx.emit("INF") # val, (val < 0)
+                ctx.emit("JZ", abs_end_label , "If not (val < 0), jump to end") # If not (val < 0), jump to end
+                ctx.emit("PUSHI", 0,"Making negative"); ctx.emit("SWAP"); ctx.emit("SUB") # Negate
             elif arg_type == "REAL":
-                ctx.emit("DUP 1","ABS - Check if is negative"); ctx.emit("PUSHF 0.0"); ctx.emit("FINF")
-                ctx.emit(f"JZ {abs_end_label}" , "If not (val < 0), jump to end")
-                ctx.emit("PUSHF 0.0","Making negative"); ctx.emit("SWAP"); ctx.emit("FSUB")
+                ctx.emit("DUP", 1,"ABS - Check if is negative"); ctx.emit("PUSHF", 0.0); ctx.emit("FINF")
+                ctx.emit("JZ", abs_end_label , "If not (val < 0), jump to end")
+                ctx.emit("PUSHF", 0.0,"Making negative"); ctx.emit("SWAP"); ctx.emit("FSUB")
             else: raise TypeError(f"Unsupported type {arg_type} for ABS.")
             ctx.emit_label(abs_end_label)
             return
         # SQR
         elif builtin_name == "BUILTIN_SQR":
             arg_node = check_args(1, func_name_original)
-            visit(arg_node)
+            yield _visit(arg_node, ctx)
             arg_type = th.determine_expression_type(arg_node)
-            ctx.emit("DUP 1")
+            ctx.emit("DUP", 1)
             if arg_type == "INTEGER": ctx.emit("MUL")
             elif arg_type == "REAL": ctx.emit("FMUL")
             else: raise TypeError(f"Unsupported type {arg_type} for SQR.")
             return
         else:
-            ctx.emit(f"// Builtin {builtin_name} call not fully implemented in generator", "")
+            ctx.emit_comment(f"Builtin {builtin_name} call not fully implemented in generator")
             if node.arguments:
-                for arg_expr in node.arguments: visit(arg_expr)
+                for arg_expr in node.arguments: yield _visit(arg_expr, ctx)
             return
 
     # User-defined function/procedure
@@ -659,42 +831,57 @@ def visit_FunctionCall(node):
                 if not isinstance(arg_expr, ast_nodes.Identifier): # VAR param must be an l-value (identifier for now)
                     # Could also be ArrayAccess or FieldAccess if those are assignable
                     raise ValueError(f"VAR-parameter argument for '{param_info.name}' must be an assignable variable, not {type(arg_expr).__name__}.")
-                arg_sym = ctx.current_scope.resolve(arg_expr.name)
+                arg_sym = arg_expr.symbol
                 if not arg_sym:
                     raise ValueError(f"Undefined variable '{arg_expr.name}' for VAR param.")
                 if arg_sym.scope_level == 0: # Global var
-                    ctx.emit("PUSHGP", "Push global base for VAR param")
-                    ctx.emit(f"PUSHI {arg_sym.address_or_offset}", f"Offset of global var '{arg_expr.name}'")
-                    ctx.emit("PADD", f"Compute address of global var '{arg_expr.name}'")
+                    ctx.emit("PUSHGP", comment="Push global base for VAR param")
+                    ctx.emit("PUSHI", arg_sym.address_or_offset, f"Offset of global var '{arg_expr.name}'")
+                    ctx.emit("PADD", comment=f"Compute address of global var '{arg_expr.name}'")
                 else: # Local variable or another VAR param
                     if arg_sym.is_var_param: # Passing a VAR param to another VAR param
-                        ctx.emit(f"PUSHL {arg_sym.address_or_offset}", f"Pass address from VAR param '{arg_expr.name}'")
+                        ctx.emit("PUSHL", arg_sym.address_or_offset, f"Pass address from VAR param '{arg_expr.name}'")
                     else: # Regular local variable
-                        ctx.emit("PUSHFP", "Push FP for VAR param")
-                        ctx.emit(f"PUSHI {arg_sym.address_or_offset}", f"Offset of local var '{arg_expr.name}'")
-                        ctx.emit("PADD", f"Compute address of local var '{arg_expr.name}'")
+                        ctx.emit("PUSHFP", comment="Push FP for VAR param")
+                        ctx.emit("PUSHI", arg_sym.address_or_offset, f"Offset of local var '{arg_expr.name}'")
+                        ctx.emit("PADD", comment=f"Compute address of local var '{arg_expr.name}'")
             else: # Value parameter
-                visit(arg_expr)
-    ctx.emit(f"PUSHA {func_sym.address_or_offset}", f"Push address of {func_name_original}")
+                yield _visit(arg_expr, ctx)
+    ctx.emit("PUSHA", ctx.routine_labels[func_sym], f"Push address of {func_name_original}")
     ctx.emit("CALL")
 
 
-@register_visitor("IOCall") # Handles read, readln, write, writeln if they are distinct AST nodes
-def visit_IOCall(node):
+@register_visitor(ast_nodes.InlinedCall)
+def visit_InlinedCall(node, ctx):
+    # The temporaries only exist for this call: their frame slots are taken here and
+    # set on their Symbols, which nothing else refers to
+    offsets = []
+    for temporary in node.temporaries:
+        temporary.address_or_offset = ctx.new_temp_offset()
+        offsets.append(temporary.address_or_offset)
+    ctx.emit_comment(f"Inlined call to {node.name}")
+    yield _visit(node.body, ctx)
+    if node.result is not None:
+        ctx.emit("PUSHL", node.result.address_or_offset, f"Result of {node.name}")
+    for offset in reversed(offsets):
+        ctx.release_temp_offset(offset)
+
+@register_visitor(ast_nodes.IOCall) # Handles read, readln, write, writeln if they are distinct AST nodes
+def visit_IOCall(node, ctx):
     op = node.operation.lower()
     if op in ["write", "writeln"]:
         if op == "writeln" and not node.arguments:
             ctx.emit("WRITELN")
             return
         for arg_expr in node.arguments:
-            visit(arg_expr)
+            yield _visit(arg_expr, ctx)
             arg_type = th.determine_expression_type(arg_expr)
             if arg_type == 'STRING': ctx.emit("WRITES")
             elif arg_type == 'REAL': ctx.emit("WRITEF")
             elif arg_type == 'INTEGER': ctx.emit("WRITEI")
             elif arg_type == 'BOOLEAN': ctx.emit("WRITEI")
             elif arg_type == 'CHAR': ctx.emit("WRITECHR") # Assuming WRITECHR for ASCII value
-            else: ctx.emit("WRITEI", f"Defaulting WRITEI for unknown type {arg_type} in {op}")
+            else: ctx.emit("WRITEI", comment=f"Defaulting WRITEI for unknown type {arg_type} in {op}")
         if op == "writeln":
             ctx.emit("WRITELN")
 
@@ -706,55 +893,38 @@ def visit_IOCall(node):
 
             if isinstance(arg_var_node, ast_nodes.Identifier):
                 var_name = arg_var_node.name
-                sym = ctx.current_scope.resolve(var_name)
+                sym = arg_var_node.symbol
                 if not sym: raise ValueError(f"Undefined var '{var_name}' in {op}.")
                 
-                ctx.emit("READ", f"Read string input for '{var_name}'") # String address on TOS
+                ctx.emit("READ", comment=f"Read string input for '{var_name}'") # String address on TOS
                 
                 target_type = sym.sym_type.upper() if sym.sym_type else 'UNKNOWN'
                 if target_type == 'INTEGER': ctx.emit("ATOI")
                 elif target_type == 'REAL': ctx.emit("ATOF")
                 elif target_type == 'STRING': pass # Already a string address
                 elif target_type == 'CHAR': # Read a string, take first char, get ASCII
-                    ctx.emit("PUSHI 0"); ctx.emit("CHARAT") # Get ASCII of first char
+                    ctx.emit("PUSHI", 0); ctx.emit("CHARAT") # Get ASCII of first char
                 else: raise TypeError(f"Unsupported type {target_type} for {op} into '{var_name}'.")
 
                 # Value to store is now on TOS. Store it.
                 if sym.is_var_param:
-                    ctx.emit(f"PUSHL {sym.address_or_offset}", f"Load address from VAR param '{var_name}'")
-                    ctx.emit("SWAP"); ctx.emit("STORE 0", f"Store into VAR param '{var_name}'")
+                    ctx.emit("PUSHL", sym.address_or_offset, f"Load address from VAR param '{var_name}'")
+                    ctx.emit("SWAP"); ctx.emit("STORE", 0, f"Store into VAR param '{var_name}'")
                 elif sym.scope_level == 0:
-                    ctx.emit(f"STOREG {sym.address_or_offset}", f"Store to global '{var_name}'")
+                    ctx.emit("STOREG", sym.address_or_offset, f"Store to global '{var_name}'")
                 else:
-                    ctx.emit(f"STOREL {sym.address_or_offset}", f"Store to local '{var_name}'")
+                    ctx.emit("STOREL", sym.address_or_offset, f"Store to local '{var_name}'")
 
             elif isinstance(arg_var_node, ast_nodes.ArrayAccess):
-                # 1. Calculate base_address and adjusted_index for STOREN
-                # Base address
-                array_node = arg_var_node.array
-                if not isinstance(array_node, ast_nodes.Identifier):
-                    raise NotImplementedError(f"Reading into non-identifier array base in {op}")
-                array_name = array_node.name
-                sym_array = ctx.current_scope.resolve(array_name)
-                if not sym_array or not (sym_array.is_array or sym_array.is_var_param): # VAR param could be array
-                    raise ValueError(f"'{array_name}' not a defined array/VAR param for {op}.")
-
-                if sym_array.is_var_param: # VAR param that is an array
-                    ctx.emit(f"PUSHL {sym_array.address_or_offset}", f"Load address from VAR param array '{array_name}'")
-                elif sym_array.scope_level == 0:
-                    ctx.emit("PUSHGP"); ctx.emit(f"PUSHI {sym_array.address_or_offset}"); ctx.emit("PADD")
-                else:
-                    ctx.emit("PUSHFP"); ctx.emit(f"PUSHI {sym_array.address_or_offset}"); ctx.emit("PADD")
-                # Stack: [..., base_address]
-                
-                # Index
-                visit(arg_var_node.index) # Stack: [..., base_address, user_index]
-                if sym_array.is_array and sym_array.array_lower_bound is not None and sym_array.array_lower_bound != 0:
-                    ctx.emit(f"PUSHI {sym_array.array_lower_bound}"); ctx.emit("SUB")
-                # Stack: [..., base_address, adjusted_index]
+                # 1. Base address and adjusted index for STOREN
+                array_name = arg_var_node.array.name
+                sym_array = arg_var_node.array.symbol
+                slot = constant_element_slot(arg_var_node)
+                if slot is None:
+                    yield visit_array_element_address(arg_var_node, ctx) # Stack: [..., base_address, index]
 
                 # 2. Perform READ and convert
-                ctx.emit("READ", f"Read string input for {array_name}[index]") # Stack: [..., base_addr, adj_idx, str_addr]
+                ctx.emit("READ", comment=f"Read string input for {array_name}[index]") # Stack: [..., base_addr, adj_idx, str_addr]
                 
                 element_type = 'UNKNOWN'
                 if hasattr(sym_array, 'element_type') and sym_array.element_type:
@@ -763,11 +933,14 @@ def visit_IOCall(node):
                 if element_type == 'INTEGER': ctx.emit("ATOI")
                 elif element_type == 'REAL': ctx.emit("ATOF")
                 elif element_type == 'STRING': pass
-                elif element_type == 'CHAR': ctx.emit("PUSHI 0"); ctx.emit("CHARAT")
+                elif element_type == 'CHAR': ctx.emit("PUSHI", 0); ctx.emit("CHARAT")
                 else: raise TypeError(f"Unsupported element type {element_type} for {op} into {array_name}[].")
                 # Stack: [..., base_addr, adj_idx, value_to_store]
 
-                # 3. STOREN
-                ctx.emit("STOREN", f"Store read value into {array_name}[index]")
+                # 3. STOREN, or a direct store when the element is known
+                if slot is None:
+                    ctx.emit("STOREN", comment=f"Store read value into {array_name}[index]")
+                else:
+                    emit_element_store(slot, arg_var_node, ctx, "Store read value into")
             else:
                 raise ValueError(f"Argument to {op} must be an identifier or array element. Got {type(arg_var_node).__name__}.")
\ No newline at end of file
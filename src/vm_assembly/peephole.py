@@ -0,0 +1,212 @@
+"""
+Peephole optimizer over the generated instruction blocks.
+
+Each rule of the rule table rewrites a short run of consecutive instructions, matched
+by opcode ("LABEL" matches a label line). The pass applies the enabled rules over every
+block until none of them matches any more and counts how often each rule fired.
+Label lines are only matched where a rule asks for one, and comment lines are never
+matched, so no rewrite spans a jump target or a comment.
+
+remove_dead_code works on the whole program instead: it drops the instructions no
+path reaches and the labels nothing jumps to.
+"""
+from collections import Counter
+
+from .generation_context import LABEL_OPCODES, Instruction
+
+LABEL = "LABEL"
+
+# integer results are only folded while they stay in the VM's 32-bit range
+INTEGER_LIMIT = 2 ** 31
+
+class Rule:
+    __slots__ = ('name', 'pattern', 'rewrite', 'description')
+
+    def __init__(self, name, pattern, rewrite, description):
+        self.name = name
+        self.pattern = pattern
+        self.rewrite = rewrite
+        self.description = description
+
+# the rule table, in the order the rules are tried at each position
+rules = {}
+
+def rule(name, *pattern):
+    """
+    Registers rewrite as the rule `name` for runs of instructions whose opcodes match
+    pattern. rewrite receives the matched Instructions and returns their replacement
+    (a list) or None when the run cannot be rewritten.
+    """
+    def register(rewrite):
+        rules[name] = Rule(name, pattern, rewrite, rewrite.__doc__)
+        return rewrite
+    return register
+
+def opcode_of(instruction):
+    if instruction.opcode is None and instruction.label is not None:
+        return LABEL
+    return instruction.opcode
+
+def fits(value):
+    return -INTEGER_LIMIT <= value < INTEGER_LIMIT
+
+@rule("jump_to_next", "JUMP", LABEL)
+def jump_to_next(jump, label):
+    """JUMP L right before L: drops the jump."""
+    if jump.operand == label.label:
+        return [label]
+
+@rule("store_reload_global", "STOREG", "PUSHG")
+@rule("store_reload_local", "STOREL", "PUSHL")
+def store_reload(store, load):
+    """STOREG/STOREL k then PUSHG/PUSHL k: duplicates the value before storing it."""
+    if store.operand == load.operand:
+        return [Instruction("DUP", 1), store]
+
+@rule("negate", "PUSHI", "SWAP", "SUB")
+def negate(zero, swap, sub):
+    """PUSHI 0; SWAP; SUB (0 - x): multiplies by -1."""
+    if zero.operand == 0:
+        return [Instruction("PUSHI", -1, comment=sub.comment), Instruction("MUL")]
+
+FOLDABLE = {
+    "ADD": lambda a, b: a + b,
+    "SUB": lambda a, b: a - b,
+    "MUL": lambda a, b: a * b,
+}
+
+@rule("fold_add", "PUSHI", "PUSHI", "ADD")
+@rule("fold_sub", "PUSHI", "PUSHI", "SUB")
+@rule("fold_mul", "PUSHI", "PUSHI", "MUL")
+def fold_constants(left, right, operation):
+    """PUSHI a; PUSHI b; ADD/SUB/MUL: pushes the result."""
+    value = FOLDABLE[operation.opcode](left.operand, right.operand)
+    if fits(value):
+        return [Instruction("PUSHI", value, comment=f"Folded {left.operand} {operation.opcode} {right.operand}")]
+
+@rule("fold_int_to_float", "PUSHI", "ITOF")
+def fold_int_to_float(push, convert):
+    """PUSHI a; ITOF: pushes the real constant."""
+    return [Instruction("PUSHF", float(push.operand))]
+
+IDENTITY_OPERANDS = {"ADD": 0, "SUB": 0, "PADD": 0, "MUL": 1, "DIV": 1}
+
+@rule("identity_add", "PUSHI", "ADD")
+@rule("identity_sub", "PUSHI", "SUB")
+@rule("identity_padd", "PUSHI", "PADD")
+@rule("identity_mul", "PUSHI", "MUL")
+@rule("identity_div", "PUSHI", "DIV")
+def identity_operation(push, operation):
+    """x + 0, x - 0, address + 0, x * 1, x div 1: drops the operation."""
+    if push.operand == IDENTITY_OPERANDS[operation.opcode]:
+        return []
+
+COMMUTATIVE = ("ADD", "MUL", "FADD", "FMUL", "EQUAL", "FEQUAL", "AND", "OR")
+
+def swap_before_commutative(swap, operation):
+    """SWAP before a commutative operation: drops the swap."""
+    return [operation]
+
+for opcode in COMMUTATIVE:
+    rule(f"swap_{opcode.lower()}", "SWAP", opcode)(swap_before_commutative)
+
+@rule("swap_swap", "SWAP", "SWAP")
+def swap_swap(first, second):
+    """SWAP; SWAP: drops both."""
+    return []
+
+@rule("address_reuse_global", "PUSHGP", "PUSHI", "PADD", "PUSHGP", "PUSHI", "PADD")
+@rule("address_reuse_local", "PUSHFP", "PUSHI", "PADD", "PUSHFP", "PUSHI", "PADD")
+def address_reuse(base, offset, add, base_again, offset_again, add_again):
+    """The same address computed twice in a row: duplicates the first one."""
+    if offset.operand == offset_again.operand:
+        return [base, offset, add, Instruction("DUP", 1, comment=add_again.comment)]
+
+def rules_by_first_opcode(enabled):
+    table = {}
+    for name in enabled:
+        table.setdefault(rules[name].pattern[0], []).append(rules[name])
+    return table
+
+def optimize_instructions(instructions, table, hits):
+    """One pass over a block's instructions; returns the rewritten list and whether anything changed."""
+    optimized = []
+    changed = False
+    position = 0
+    count = len(instructions)
+    while position < count:
+        instruction = instructions[position]
+        for candidate in table.get(opcode_of(instruction), ()):
+            end = position + len(candidate.pattern)
+            if end > count:
+                continue
+            window = instructions[position:end]
+            if any(opcode_of(window[i]) != candidate.pattern[i] for i in range(1, len(window))):
+                continue
+            replacement = candidate.rewrite(*window)
+            if replacement is not None:
+                optimized.extend(replacement)
+                hits[candidate.name] += 1
+                position = end
+                changed = True
+                break
+        else:
+            optimized.append(instruction)
+            position += 1
+    return optimized, changed
+
+def optimize(program_blocks, enabled=None):
+    """
+    Rewrites every block with the enabled rules (all of them by default) until none
+    applies. The blocks are changed in place; returns the number of hits of each rule.
+    """
+    table = rules_by_first_opcode(rules if enabled is None else enabled)
+    hits = Counter()
+    for block in program_blocks:
+        changed = True
+        while changed:
+            block.instructions, changed = optimize_instructions(block.instructions, table, hits)
+    return hits
+
+# instructions after which the next one only runs if it is a jump target
+UNCONDITIONAL = ("JUMP", "RETURN", "STOP")
+
+def remove_dead_code(program_blocks):
+    """
+    Removes the instructions between a JUMP, RETURN or STOP and the next label, which
+    no path reaches, and the label lines no JUMP, JZ or PUSHA refers to, until neither
+    is left. The code runs on from one block into the next, so reachability carries
+    across blocks. Returns the number of 'unreachable' instructions and 'unused_label'
+    lines removed.
+    """
+    removed = Counter()
+    changed = True
+    while changed:
+        changed = False
+        targets = {instruction.operand for block in program_blocks for instruction in block.instructions
+                   if instruction.opcode in LABEL_OPCODES}
+        reachable = True
+        for block in program_blocks:
+            kept = []
+            for instruction in block.instructions:
+                if instruction.opcode is None:
+                    if instruction.label is None: # comments are kept
+                        kept.append(instruction)
+                    elif instruction.label in targets:
+                        reachable = True
+                        kept.append(instruction)
+                    else:
+                        removed['unused_label'] += 1
+                        changed = True
+                elif reachable:
+                    kept.append(instruction)
+                    reachable = instruction.opcode not in UNCONDITIONAL
+                else:
+                    removed['unreachable'] += 1
+                    changed = True
+            block.instructions = kept
+    return removed
+
+def instruction_count(program_blocks):
+    """Number of VM instructions (labels and comments left out) in the blocks."""
+    return sum(1 for block in program_blocks for instruction in block.instructions if instruction.opcode is not None)
@@ -0,0 +1,199 @@
+"""
+A small simulator of the EWVM subset the generator emits, running the instruction
+blocks directly. It is used by the tests and the benchmarks to check that an
+optimization keeps a program's output and to count the instructions it executes.
+
+Memory is one array of values with a stack pointer: globals sit at gp (0), the
+locals of a routine from its fp up, and addresses are plain indices. Cells above
+sp keep their values and can be stored to, as in the VM's growable stack. CALL and
+RETURN only save and restore pc and fp, so the generated routines drop their frame
+and arguments before RETURN, leaving a function's result on the stack.
+"""
+
+class VMError(Exception):
+    pass
+
+def flatten(program_blocks):
+    """Returns the program's instructions (labels and comments left out) and the index of each label."""
+    code = []
+    labels = {}
+    for block in program_blocks:
+        for instruction in block.instructions:
+            if instruction.opcode is not None:
+                code.append(instruction)
+            elif instruction.label is not None:
+                labels[instruction.label] = len(code)
+    return code, labels
+
+def integer_division(a, b):
+    """DIV and MOD of the VM: the quotient is truncated toward zero, the remainder has the dividend's sign."""
+    if b == 0:
+        raise VMError("Division by zero")
+    quotient = abs(a) // abs(b)
+    if (a < 0) != (b < 0):
+        quotient = -quotient
+    return quotient, a - b * quotient
+
+def run(program_blocks, input_lines=(), max_steps=10_000_000):
+    """
+    Runs a generated program with the given lines as its input. Returns the text it
+    wrote and the number of instructions it executed.
+    """
+    code, labels = flatten(program_blocks)
+    inputs = iter(input_lines)
+    output = []
+    memory = []
+    calls = []
+    sp = fp = pc = 0
+    steps = 0
+
+    def store(address, value):
+        if address >= len(memory):
+            memory.extend([0] * (address + 1 - len(memory)))
+        memory[address] = value
+
+    while True:
+        if pc >= len(code):
+            raise VMError("Ran past the end of the code")
+        steps += 1
+        if steps > max_steps:
+            raise VMError(f"More than {max_steps} steps")
+        instruction = code[pc]
+        opcode, operand = instruction.opcode, instruction.operand
+        pc += 1
+        # instructions that only push a value
+        if opcode in ("PUSHI", "PUSHF", "PUSHS"):
+            value = operand
+        elif opcode == "PUSHG":
+            value = memory[operand]
+        elif opcode == "PUSHL":
+            value = memory[fp + operand]
+        elif opcode == "PUSHGP":
+            value = 0
+        elif opcode == "PUSHFP":
+            value = fp
+        elif opcode == "PUSHA":
+            value = labels[operand]
+        elif opcode in BINARY_OPERATIONS:
+            sp -= 2
+            value = BINARY_OPERATIONS[opcode](memory[sp], memory[sp + 1])
+        elif opcode in UNARY_OPERATIONS:
+            sp -= 1
+            value = UNARY_OPERATIONS[opcode](memory[sp])
+        elif opcode == "LOAD":
+            sp -= 1
+            value = memory[memory[sp] + operand]
+        elif opcode == "LOADN":
+            sp -= 2
+            value = memory[memory[sp] + memory[sp + 1]]
+        elif opcode == "READ":
+            try:
+                value = next(inputs)
+            except StopIteration:
+                raise VMError("Read past the end of the input")
+        else:
+            # instructions that push nothing (or several values)
+            if opcode == "STOREG":
+                sp -= 1
+                store(operand, memory[sp])
+            elif opcode == "STOREL":
+                sp -= 1
+                store(fp + operand, memory[sp])
+            elif opcode == "STORE":
+                sp -= 2
+                store(memory[sp] + operand, memory[sp + 1])
+            elif opcode == "STOREN":
+                sp -= 3
+                store(memory[sp] + memory[sp + 1], memory[sp + 2])
+            elif opcode == "PUSHN":
+                for _ in range(operand):
+                    store(sp, 0)
+                    sp += 1
+            elif opcode == "DUP":
+                for value in memory[sp - operand:sp]:
+                    store(sp, value)
+                    sp += 1
+            elif opcode == "POP":
+                sp -= operand
+            elif opcode == "SWAP":
+                memory[sp - 1], memory[sp - 2] = memory[sp - 2], memory[sp - 1]
+            elif opcode == "JUMP":
+                pc = labels[operand]
+            elif opcode == "JZ":
+                sp -= 1
+                if memory[sp] == 0:
+                    pc = labels[operand]
+            elif opcode == "CALL":
+                sp -= 1
+                calls.append((pc, fp))
+                pc = memory[sp]
+                fp = sp
+            elif opcode == "RETURN":
+                pc, fp = calls.pop()
+            elif opcode == "START":
+                fp = sp
+            elif opcode == "STOP":
+                return "".join(output), steps
+            elif opcode in WRITE_FORMATS:
+                sp -= 1
+                output.append(WRITE_FORMATS[opcode](memory[sp]))
+            elif opcode == "WRITELN":
+                output.append("\n")
+            else:
+                raise VMError(f"Unsupported instruction {opcode}")
+            continue
+        store(sp, value)
+        sp += 1
+
+def _div(a, b):
+    return integer_division(a, b)[0]
+
+def _mod(a, b):
+    return integer_division(a, b)[1]
+
+def _fdiv(a, b):
+    if b == 0:
+        raise VMError("Division by zero")
+    return a / b
+
+BINARY_OPERATIONS = {
+    "ADD": lambda a, b: a + b,
+    "SUB": lambda a, b: a - b,
+    "MUL": lambda a, b: a * b,
+    "DIV": _div,
+    "MOD": _mod,
+    "PADD": lambda a, b: a + b,
+    "FADD": lambda a, b: a + b,
+    "FSUB": lambda a, b: a - b,
+    "FMUL": lambda a, b: a * b,
+    "FDIV": _fdiv,
+    "EQUAL": lambda a, b: int(a == b),
+    "FEQUAL": lambda a, b: int(a == b),
+    "INF": lambda a, b: int(a < b),
+    "INFEQ": lambda a, b: int(a <= b),
+    "SUP": lambda a, b: int(a > b),
+    "SUPEQ": lambda a, b: int(a >= b),
+    "FINF": lambda a, b: int(a < b),
+    "FINFEQ": lambda a, b: int(a <= b),
+    "FSUP": lambda a, b: int(a > b),
+    "FSUPEQ": lambda a, b: int(a >= b),
+    "AND": lambda a, b: int(bool(a) and bool(b)),
+    "OR": lambda a, b: int(bool(a) or bool(b)),
+    "CHARAT": lambda string, index: ord(string[index]),
+}
+
+UNARY_OPERATIONS = {
+    "NOT": lambda a: int(a == 0),
+    "ITOF": float,
+    "FTOI": int,
+    "ATOI": int,
+    "ATOF": float,
+    "STRLEN": len,
+}
+
+WRITE_FORMATS = {
+    "WRITEI": lambda value: str(int(value)),
+    "WRITEF": lambda value: repr(float(value)),
+    "WRITES": str,
+    "WRITECHR": chr,
+}
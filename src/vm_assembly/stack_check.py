@@ -0,0 +1,109 @@
+"""
+Static check of the stack depth of the generated code.
+
+The depth of the stack is followed along every path of the code, from the start of
+the program and from the entry of each routine (a PUSHA target), relative to the
+depth where that code starts. Every label must be reached with the same depth on
+all its paths. At the head of a loop a different depth means each iteration leaves
+values behind (or takes more than it pushed), so the stack grows or shrinks with
+the number of iterations instead of staying the same.
+
+A CALL pops the routine's address and leaves what the routine's code leaves on the
+stack when it returns, which the check works out from the routine itself.
+"""
+from .simulator import BINARY_OPERATIONS, UNARY_OPERATIONS, WRITE_FORMATS, flatten
+
+# the change in depth of the instructions whose effect does not depend on the operand
+FIXED_EFFECTS = {
+    "PUSHI": 1, "PUSHF": 1, "PUSHS": 1, "PUSHG": 1, "PUSHL": 1, "PUSHGP": 1, "PUSHFP": 1, "PUSHA": 1,
+    "READ": 1, "LOAD": 0, "LOADN": -1,
+    "STOREG": -1, "STOREL": -1, "STORE": -2, "STOREN": -3,
+    "SWAP": 0, "JUMP": 0, "JZ": -1, "START": 0, "STOP": 0, "RETURN": 0, "WRITELN": 0,
+}
+FIXED_EFFECTS.update(dict.fromkeys(BINARY_OPERATIONS, -1))
+FIXED_EFFECTS.update(dict.fromkeys(UNARY_OPERATIONS, 0))
+FIXED_EFFECTS.update(dict.fromkeys(WRITE_FORMATS, -1))
+
+class StackImbalance:
+    """A label reached with two different stack depths."""
+    __slots__ = ('label', 'depth', 'other_depth')
+
+    def __init__(self, label, depth, other_depth):
+        self.label = label
+        self.depth = depth
+        self.other_depth = other_depth
+
+    def __repr__(self):
+        return f"StackImbalance({self.label!r}, {self.depth}, {self.other_depth})"
+
+    def __str__(self):
+        return f"Label '{self.label}' is reached with stack depths {self.depth} and {self.other_depth}"
+
+def stack_effect(code, index, labels, routine_effects):
+    instruction = code[index]
+    opcode = instruction.opcode
+    if opcode in FIXED_EFFECTS:
+        return FIXED_EFFECTS[opcode]
+    if opcode in ("PUSHN", "DUP"):
+        return instruction.operand
+    if opcode == "POP":
+        return -instruction.operand
+    if opcode == "CALL":
+        # the address comes from the PUSHA right before the call
+        previous = code[index - 1] if index else None
+        if previous is not None and previous.opcode == "PUSHA":
+            return -1 + routine_effects.get(labels[previous.operand], 0)
+        return -1
+    raise ValueError(f"Unknown stack effect of {opcode}")
+
+def follow(code, labels, start, routine_effects):
+    """
+    Follows every path from start. Returns the depths the code can end with (at a RETURN
+    or STOP) and the indexes reached with two depths, with both of them.
+    """
+    depths = {start: 0}
+    pending = [start]
+    exits = set()
+    mismatches = []
+    while pending:
+        index = pending.pop()
+        instruction = code[index]
+        depth = depths[index] + stack_effect(code, index, labels, routine_effects)
+        if instruction.opcode in ("RETURN", "STOP"):
+            exits.add(depth)
+            continue
+        if instruction.opcode == "JUMP":
+            successors = (labels[instruction.operand],)
+        elif instruction.opcode == "JZ":
+            successors = (index + 1, labels[instruction.operand])
+        else:
+            successors = (index + 1,)
+        for successor in successors:
+            if successor not in depths:
+                depths[successor] = depth
+                pending.append(successor)
+            elif depths[successor] != depth:
+                mismatches.append((successor, depths[successor], depth))
+    return exits, mismatches
+
+def check_stack(program_blocks):
+    """Returns a StackImbalance for every label of the program reached with different stack depths."""
+    code, labels = flatten(program_blocks)
+    entries = sorted({labels[instruction.operand] for instruction in code if instruction.opcode == "PUSHA"})
+    # what each routine leaves on the stack, worked out again until it settles (routines call each other)
+    routine_effects = {}
+    for _ in range(len(entries) + 1):
+        previous = dict(routine_effects)
+        for entry in entries:
+            exits, _ = follow(code, labels, entry, routine_effects)
+            routine_effects[entry] = max(exits, default=0)
+        if routine_effects == previous:
+            break
+
+    names = {index: name for name, index in labels.items()}
+    imbalances = []
+    for start in [0] + entries:
+        _, mismatches = follow(code, labels, start, routine_effects)
+        for index, depth, other_depth in mismatches:
+            imbalances.append(StackImbalance(names.get(index, f"@{index}"), depth, other_depth))
+    return imbalances
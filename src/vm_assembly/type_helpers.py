@@ -1,5 +1,5 @@
 import ast_nodes
-from . import generation_context as generation_context # For current_scope in determine_expression_type
+from walker import trampoline
 
 def process_array_type(var_type_node):
     """Processes an AST node representing an array type."""
@@ -58,7 +58,59 @@ def determine_expression_type(expr_node):
     """
     Tries to determine the type of an expression node.
     Returns 'INTEGER', 'REAL', 'STRING', 'BOOLEAN', or 'UNKNOWN'.
+    The type cached on the node by the semantic check is used when there is one.
     """
+    expr_type = getattr(expr_node, 'expr_type', None)
+    if expr_type is not None:
+        return expr_type
+    return trampoline(_expression_type(expr_node))
+
+def _expression_type(expr_node):
+    # operand types are requested by yielding, so long operator chains are typed iteratively
+    expr_type = getattr(expr_node, 'expr_type', None)
+    if expr_type is not None:
+        return expr_type
+    if isinstance(expr_node, ast_nodes.BinaryOperation):
+        if expr_node.operator == '/':
+            expr_type = 'REAL'
+        else:
+            left_type = yield _expression_type(expr_node.left)
+            right_type = yield _expression_type(expr_node.right)
+            expr_type = binary_operation_type(expr_node.operator, left_type, right_type)
+    elif isinstance(expr_node, ast_nodes.UnaryOperation):
+        operand_type = yield _expression_type(expr_node.operand)
+        expr_type = unary_operation_type(expr_node.operator, operand_type)
+    else:
+        expr_type = leaf_expression_type(expr_node)
+    if isinstance(expr_node, ast_nodes.Expression):
+        # nodes the semantic check could not type (e.g. string indexing) are typed once here
+        expr_node.expr_type = expr_type
+    return expr_type
+
+def binary_operation_type(operator, left_type, right_type):
+    """Result type of a binary operation given the types of its operands."""
+    if operator == '/':
+        return 'REAL'
+    # More sophisticated type inference could be added here
+    # For now, try to infer from operands or default
+    if left_type == 'REAL' or right_type == 'REAL':
+        return 'REAL'
+    if operator.upper() in ['<', '>', '<=', '>=', '=', '<>', 'AND', 'OR', 'ANDTHEN', 'ORELSE', 'NOT']: # Relational/Logical ops return BOOLEAN
+        return 'BOOLEAN'
+    if left_type == 'INTEGER' and right_type == 'INTEGER':
+         # For ops like +, -, *, DIV, MOD if both are int, result is int
+        if operator.upper() in ['+', '-', '*', 'DIV', 'MOD']:
+            return 'INTEGER'
+    return 'INTEGER' # Default for other binary ops, or 'UNKNOWN'
+
+def unary_operation_type(operator, operand_type):
+    """Result type of a unary operation given the type of its operand."""
+    if operator.upper() == 'NOT':
+        return 'BOOLEAN'
+    return operand_type # Type is same as operand for unary +/-
+
+def leaf_expression_type(expr_node):
+    """Type of an expression node that has no operand subexpressions to type first."""
     if isinstance(expr_node, ast_nodes.Literal):
         if isinstance(expr_node.value, str):
             return 'STRING'
@@ -69,45 +121,19 @@ def determine_expression_type(expr_node):
         elif isinstance(expr_node.value, bool):
             return 'BOOLEAN'
     elif isinstance(expr_node, ast_nodes.Identifier):
-        sym = generation_context.current_scope.resolve(expr_node.name)
+        sym = expr_node.symbol # resolved by the semantic check
         if sym:
             return sym.sym_type.upper() if sym.sym_type else 'UNKNOWN'
     elif isinstance(expr_node, ast_nodes.FunctionCall):
-        # Resolve function name (handle potential case differences for builtins)
-        func_name_original = expr_node.name
-        func_name_lower = func_name_original.lower()
-        func_sym = generation_context.current_scope.resolve(func_name_lower)
-        if not func_sym:
-            func_sym = generation_context.current_scope.resolve(func_name_original)
-
+        func_sym = expr_node.symbol
         if func_sym and hasattr(func_sym, 'return_type'):
             return func_sym.return_type.upper() if func_sym.return_type else 'UNKNOWN'
-    elif isinstance(expr_node, ast_nodes.BinaryOperation):
-        if expr_node.operator == '/':
-            return 'REAL'
-        # More sophisticated type inference could be added here
-        # For now, try to infer from operands or default
-        left_type = determine_expression_type(expr_node.left)
-        right_type = determine_expression_type(expr_node.right)
-        if left_type == 'REAL' or right_type == 'REAL':
-            return 'REAL'
-        if expr_node.operator in ['<', '>', '<=', '>=', '=', '<>', 'AND', 'OR', 'NOT']: # Relational/Logical ops return BOOLEAN
-            return 'BOOLEAN'
-        if left_type == 'INTEGER' and right_type == 'INTEGER':
-             # For ops like +, -, *, DIV, MOD if both are int, result is int
-            if expr_node.operator.upper() in ['+', '-', '*', 'DIV', 'MOD']:
-                return 'INTEGER'
-        return 'INTEGER' # Default for other binary ops, or 'UNKNOWN'
-    elif isinstance(expr_node, ast_nodes.UnaryOperation):
-        if expr_node.operator.upper() == 'NOT':
-            return 'BOOLEAN'
-        return determine_expression_type(expr_node.operand) # Type is same as operand for unary +/-
     elif isinstance(expr_node, ast_nodes.ArrayAccess):
         # Determine type from array's element type
         if isinstance(expr_node.array, ast_nodes.Identifier):
-            array_sym = generation_context.current_scope.resolve(expr_node.array.name)
+            array_sym = expr_node.array.symbol
             if array_sym and array_sym.is_array and hasattr(array_sym, 'element_type'):
                 return str(array_sym.element_type).upper() if array_sym.element_type else 'UNKNOWN'
             elif array_sym and array_sym.sym_type and array_sym.sym_type.upper() == 'STRING': # String char access
                 return 'CHAR' # Or 'STRING' if single char is treated as string
-    return 'UNKNOWN'
\ No newline at end of file
+    return 'UNKNOWN'
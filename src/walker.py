@@ -0,0 +1,75 @@
+from types import GeneratorType
+
+def trampoline(generator):
+    """
+    Runs a generator-based tree pass on an explicit stack instead of the Python call stack.
+
+    A pass written as a generator "calls" itself on a child by yielding the child's
+    generator, `result = yield handler(child)`, instead of calling it recursively; the
+    child's return value is sent back into the parent. Yielding anything that is not a
+    generator sends it straight back, so handlers with no children can stay plain
+    functions. An exception raised by a child is thrown into its parent, exactly as if
+    the call had been direct, so deep trees never hit the recursion limit.
+    """
+    if type(generator) is not GeneratorType: # a plain handler already returned its result
+        return generator
+    stack = [generator]
+    value = None
+    error = None
+    while stack:
+        top = stack[-1]
+        try:
+            if error is None:
+                request = top.send(value)
+            else:
+                request = top.throw(error)
+                error = None
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        except BaseException as e:
+            stack.pop()
+            if not stack:
+                raise
+            error = e
+            continue
+
+        if type(request) is GeneratorType:
+            stack.append(request)
+            value = None
+        else:
+            value = request
+    return value
+
+class Dispatcher:
+    """
+    Dispatch table of one tree pass, mapping node classes to handler functions.
+
+    Handlers are registered by class when the pass's module is imported, so picking
+    the handler of a node is a single dict lookup on type(node). A class without its
+    own handler uses the one of its nearest registered base class, or the fallback;
+    the result is stored in the table, so that lookup is only done once per class.
+    """
+
+    def __init__(self, fallback):
+        self.handlers = {}
+        self.fallback = fallback
+
+    def register(self, *node_classes):
+        def decorator(handler):
+            for node_class in node_classes:
+                self.handlers[node_class] = handler
+            return handler
+        return decorator
+
+    def handler_for(self, node_class):
+        handler = self.handlers.get(node_class)
+        if handler is None:
+            handler = next((self.handlers[base] for base in node_class.__mro__[1:] if base in self.handlers), self.fallback)
+            self.handlers[node_class] = handler
+        return handler
+
+    def __call__(self, node, *args):
+        handler = self.handlers.get(type(node)) or self.handler_for(type(node))
+        return handler(node, *args)